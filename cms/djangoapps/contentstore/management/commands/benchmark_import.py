@@ -0,0 +1,153 @@
+"""
+Benchmark the import of a course from XML, one static file after the other
+and with static import workers.
+
+Imports the given course directory, or a generated sample course, into new
+courses with random runs, reports the time spent in each phase of the
+imports, then deletes the courses and their assets.
+
+Example usage:
+    $ ./manage.py cms benchmark_import --units=1000 --static-files=500 --workers=8 --settings=devstack
+    $ ./manage.py cms benchmark_import --course-dir=/edx/src/DemoX --settings=devstack
+"""
+
+
+import os
+import shutil
+import tempfile
+from textwrap import dedent
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from six.moves import range
+
+from contentstore.utils import delete_course
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_importer import CourseImportManager
+
+# The shape of the generated sample course
+VERTICALS_PER_SEQUENTIAL = 5
+SEQUENTIALS_PER_CHAPTER = 10
+
+
+def generate_course(course_dir, units, static_files, static_file_size):
+    """
+    Writes a sample course to the given directory, with the given number of
+    units, each holding an HTML and a problem block, and the given number of
+    static files of the given size, in bytes.
+    """
+    os.makedirs(os.path.join(course_dir, 'course'))
+    os.makedirs(os.path.join(course_dir, 'static'))
+    with open(os.path.join(course_dir, 'course.xml'), 'w') as course_file:
+        course_file.write('<course url_name="sample" org="benchmark" course="import"/>')
+
+    chapters = []
+    for unit in range(units):
+        if unit % (VERTICALS_PER_SEQUENTIAL * SEQUENTIALS_PER_CHAPTER) == 0:
+            chapters.append([])
+        if unit % VERTICALS_PER_SEQUENTIAL == 0:
+            chapters[-1].append([])
+        chapters[-1][-1].append((
+            u'<vertical url_name="unit_{unit}" display_name="Unit {unit}">'
+            u'<html url_name="html_{unit}" display_name="Text {unit}">'
+            u'<p><img src="/static/file_{file}.bin"/></p></html>'
+            u'<problem url_name="problem_{unit}" display_name="Problem {unit}">'
+            u'<stringresponse answer="{unit}"><textline/></stringresponse></problem>'
+            u'</vertical>'
+        ).format(unit=unit, file=unit % static_files if static_files else 0))
+
+    with open(os.path.join(course_dir, 'course', 'sample.xml'), 'w') as course_file:
+        course_file.write(u'<course display_name="Import benchmark">')
+        for chapter_index, chapter in enumerate(chapters):
+            course_file.write(u'<chapter url_name="chapter_{0}" display_name="Chapter {0}">'.format(chapter_index))
+            for sequential_index, sequential in enumerate(chapter):
+                course_file.write(u'<sequential url_name="sequential_{0}_{1}" display_name="Sequential {1}">'.format(
+                    chapter_index, sequential_index,
+                ))
+                course_file.write(u''.join(sequential))
+                course_file.write(u'</sequential>')
+            course_file.write(u'</chapter>')
+        course_file.write(u'</course>')
+
+    for index in range(static_files):
+        with open(os.path.join(course_dir, 'static', 'file_{}.bin'.format(index)), 'wb') as static_file:
+            static_file.write(os.urandom(static_file_size))
+
+
+class Command(BaseCommand):
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course-dir',
+                            help=u'the directory of the course to import, instead of a generated sample course')
+        parser.add_argument('--units',
+                            default=500,
+                            type=int,
+                            help=u'the number of units of the generated sample course')
+        parser.add_argument('--static-files',
+                            default=200,
+                            type=int,
+                            help=u'the number of static files of the generated sample course')
+        parser.add_argument('--static-file-kb',
+                            default=100,
+                            type=int,
+                            help=u'the size of the static files of the generated sample course, in kilobytes')
+        parser.add_argument('--workers',
+                            default=8,
+                            type=int,
+                            help=u'the number of static import workers of the pipelined import')
+
+    def handle(self, *args, **options):
+        for option in ('units', 'workers'):
+            if options[option] < 1:
+                raise CommandError(u'--{} must be a positive number'.format(option.replace('_', '-')))
+
+        temp_dir = None
+        course_dir = options['course_dir']
+        if course_dir:
+            if not os.path.isfile(os.path.join(course_dir, 'course.xml')):
+                raise CommandError(u'{} is not a course directory'.format(course_dir))
+        else:
+            temp_dir = tempfile.mkdtemp()
+            course_dir = os.path.join(temp_dir, 'course')
+            generate_course(
+                course_dir, options['units'], options['static_files'], options['static_file_kb'] * 1024,
+            )
+
+        try:
+            for label, workers in ((u'Serial import', 0), (u'Pipelined import', options['workers'])):
+                if workers:
+                    label = u'{} ({} workers)'.format(label, workers)
+                phase_timings = self._import_course(course_dir, workers)
+                self.stdout.write(u'{}:'.format(label))
+                for phase, duration in phase_timings.items():
+                    self.stdout.write(u'    {:<16}{:8.2f} s'.format(phase, duration))
+                self.stdout.write(u'    {:<16}{:8.2f} s'.format(u'total', sum(phase_timings.values())))
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir)
+
+    def _import_course(self, course_dir, static_import_workers):
+        """
+        Imports the course in the given directory into a new course with a random run,
+        with the given number of static import workers, then deletes it.
+
+        Returns the timings of the phases of the import.
+        """
+        store = modulestore()
+        course_key = store.make_course_key(u'benchmark', u'import', uuid4().hex)
+        course_dir = os.path.abspath(course_dir)
+        import_manager = CourseImportManager(
+            store, ModuleStoreEnum.UserID.mgmt_command, os.path.dirname(course_dir), [os.path.basename(course_dir)],
+            load_error_modules=False, static_content_store=contentstore(), target_id=course_key,
+            create_if_not_present=True, static_import_workers=static_import_workers,
+        )
+        try:
+            list(import_manager.run_imports())
+        finally:
+            if store.has_course(course_key):
+                delete_course(course_key, ModuleStoreEnum.UserID.mgmt_command)
+            contentstore().delete_all_course_assets(course_key)
+        return import_manager.phase_timings
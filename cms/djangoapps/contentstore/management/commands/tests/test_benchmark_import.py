@@ -0,0 +1,32 @@
+"""
+Tests for the benchmark_import management command.
+"""
+
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from six import StringIO
+
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+class TestBenchmarkImport(ModuleStoreTestCase):
+    """
+    Tests for the benchmark_import management command.
+    """
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_import', units=6, static_files=3, static_file_kb=1, workers=2, stdout=out)
+        output = out.getvalue()
+        self.assertIn(u'Serial import:', output)
+        self.assertIn(u'Pipelined import (2 workers):', output)
+        self.assertIn(u'static_wait', output)
+        self.assertIn(u'bulk_write', output)
+
+        # The imported courses are deleted
+        self.assertEqual([course.id for course in modulestore().get_courses() if course.id.org == u'benchmark'], [])
+
+    def test_invalid_course_dir(self):
+        with self.assertRaisesMessage(CommandError, u'is not a course directory'):
+            call_command('benchmark_import', course_dir=u'/no/such/directory')
@@ -21,7 +21,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import check_exact_number_of_calls, check_number_of_calls
-from xmodule.modulestore.xml_importer import import_course_from_xml
+from xmodule.modulestore.xml_importer import CourseImportManager, import_course_from_xml
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
 TEST_DATA_CONTENTSTORE['DOC_STORE_CONFIG']['db'] = 'test_xcontent_%s' % uuid4().hex
@@ -138,6 +138,27 @@ class ContentStoreImportTest(ModuleStoreTestCase):
         print(u"static_asset_path = {0}".format(course.static_asset_path))
         self.assertEqual(course.static_asset_path, 'test_import_course')
 
+    def test_pipelined_static_import(self):
+        """
+        Static files are imported by the static import workers along with the blocks
+        """
+        module_store = modulestore()
+        course_id = module_store.make_course_key('edX', 'toy', 'pipelined')
+        import_manager = CourseImportManager(
+            module_store, self.user.id, TEST_DATA_DIR, ['toy'],
+            static_content_store=contentstore(), target_id=course_id, create_if_not_present=True,
+            static_import_workers=2,
+        )
+        courses = list(import_manager.run_imports())
+        self.assertEqual(courses[0].id, course_id)
+        self.assertIsNotNone(contentstore().find(course_id.make_asset_key('asset', 'sample_static.html')))
+        __, count = contentstore().get_all_content_for_course(course_id)
+        self.assertGreater(count, 1)
+        self.assertEqual(
+            list(import_manager.phase_timings),
+            ['parse', 'courselike', 'static', 'asset_metadata', 'children', 'static_wait', 'bulk_write', 'drafts'],
+        )
+
     def test_asset_import_nostatic(self):
         '''
         This test validates that an image asset is NOT imported when do_import_static=False
@@ -148,6 +148,19 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total number of blocks of the collected block structures kept
+    # in memory by each process, 0 to disable the in-process cache.
+    IN_PROCESS_CACHE_MAX_BLOCKS=0,
+
+    # Seconds after which the lock taken while collecting a block structure
+    # expires, and seconds that other requests wait for that collection to
+    # finish before collecting it themselves. The lock timeout should exceed
+    # the slowest collection, an expired lock lets another process collect
+    # concurrently. Only used when the single_flight_collection waffle switch
+    # is enabled.
+    COLLECT_LOCK_TIMEOUT=300,
+    COLLECT_WAIT_TIMEOUT=10,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -804,6 +817,17 @@ CONTENTSTORE = {
     'DOC_STORE_CONFIG': DOC_STORE_CONFIG
 }
 
+# Size of the chunks in which the StaticContentServer middleware streams the assets
+# read from the contentstore, so that the whole asset is never buffered in the worker.
+CONTENTSERVER_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Per-node disk cache of the course assets too large for the "course_assets" cache,
+# with least recently used eviction over MAX_SIZE bytes. Disabled when DIRECTORY is None.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 MODULESTORE_BRANCH = 'draft-preferred'
 
 MODULESTORE = {
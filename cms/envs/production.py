@@ -219,6 +219,9 @@ if 'staticfiles' in CACHES and 'KEY_PREFIX' in CACHES['staticfiles']:
 # managed by the yaml file contents
 STATICFILES_STORAGE = os.environ.get('STATICFILES_STORAGE', ENV_TOKENS.get('STATICFILES_STORAGE', STATICFILES_STORAGE))
 
+CONTENTSERVER_STREAM_CHUNK_SIZE = ENV_TOKENS.get('CONTENTSERVER_STREAM_CHUNK_SIZE', CONTENTSERVER_STREAM_CHUNK_SIZE)
+COURSE_ASSETS_DISK_CACHE.update(ENV_TOKENS.get('COURSE_ASSETS_DISK_CACHE', {}))
+
 # Load all AWS_ prefixed variables to allow an S3Boto3Storage to be configured
 _locals = locals()
 for key, value in ENV_TOKENS.items():
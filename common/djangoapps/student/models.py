@@ -214,6 +214,28 @@ def anonymous_id_for_user(user, course_id, save=True):
     return digest
 
 
+def anonymous_ids_for_users(users, course_id):
+    """
+    Return a dict of user id -> anonymous id for the given users in a course.
+
+    Same as calling `anonymous_id_for_user` for each user, but the missing
+    AnonymousUserId objects are saved with a constant number of queries.
+    """
+    anonymous_ids = {user.id: anonymous_id_for_user(user, course_id, save=False) for user in users}
+    if not anonymous_ids:
+        return anonymous_ids
+
+    existing_ids = set(AnonymousUserId.objects.filter(
+        anonymous_user_id__in=list(anonymous_ids.values()),
+    ).values_list('anonymous_user_id', flat=True))
+    AnonymousUserId.objects.bulk_create([
+        AnonymousUserId(user_id=user_id, course_id=course_id, anonymous_user_id=anonymous_id)
+        for user_id, anonymous_id in anonymous_ids.items()
+        if anonymous_id not in existing_ids
+    ], ignore_conflicts=True)
+    return anonymous_ids
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -3,17 +3,25 @@ MongoDB/GridFS-level code for the contentstore.
 """
 
 
+import datetime
+import hashlib
 import json
 import os
+import tempfile
+from collections import Counter
+from io import BytesIO
 
 import gridfs
 import pymongo
 import six
 from bson.son import SON
 from fs.osfs import OSFS
-from gridfs.errors import NoFile, FileExists
+from gridfs.errors import NoFile
+from gridfs.grid_file import GridOut
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
 from xmodule.exceptions import NotFoundError
@@ -23,11 +31,20 @@ from xmodule.util.misc import escape_invalid_characters
 
 from .content import ContentStore, StaticContent, StaticContentStream
 
+# The size above which the data of iterated assets is buffered on disk while it's hashed
+SPOOLED_DATA_MAX_SIZE = 10 * 1024 * 1024
+
 
 class MongoContentStore(ContentStore):
     """
     MongoDB-backed ContentStore.
     """
+    # The number of fs.files or fs.chunks documents copied at a time by copy_all_course_assets
+    COPY_BATCH_SIZE = 100
+
+    # The fs.files attributes which describe the storage of the assets, rather than the assets
+    storage_attrs = ['_id', 'md5', 'uploadDate', 'length', 'chunkSize']
+
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
@@ -132,7 +149,7 @@ class MongoContentStore(ContentStore):
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
+                fp = self._get_file(content_id)
                 # Need to replace dict IDs with SON for chunk lookup to work under Python 3
                 # because field order can be different and mongo cares about the order
                 if isinstance(fp._id, dict):
@@ -151,7 +168,7 @@ class MongoContentStore(ContentStore):
                     content_digest=getattr(fp, 'md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
+                with self._get_file(content_id) as fp:
                     # Need to replace dict IDs with SON for chunk lookup to work under Python 3
                     # because field order can be different and mongo cares about the order
                     if isinstance(fp._id, dict):
@@ -175,6 +192,14 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    def _get_file(self, content_id):
+        """
+        Returns the GridOut of the asset with the given id.
+
+        Raises NoFile if no such asset exists.
+        """
+        return self.fs.get(content_id)
+
     def export(self, location, output_directory):
         content = self.find(location)
 
@@ -218,7 +243,7 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in six.iteritems(asset):
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in self.storage_attrs and attr != 'asset_key':
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
@@ -246,10 +271,8 @@ class MongoContentStore(ContentStore):
             ])
             items = self.fs_files.find(query)
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self.delete(self.make_id_son(asset))
                 assets_to_delete += 1
-
-            self.fs_files.remove(query)
         return assets_to_delete
 
     @autoretry_read()
@@ -405,59 +428,86 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation copies the GridFS documents as they are, in batches of
+        COPY_BATCH_SIZE files: the chunks are bulk inserted under the destination ids
+        without being reassembled, so the md5 and length of each asset are kept.
+        Destination assets with the same names are replaced.
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
+        batch = []
         for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, six.string_types):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
-            # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-            # because field order can be different and mongo cares about the order
-            if isinstance(source_content._id, dict):
-                source_content._file['_id'] = asset_key.copy()
-            asset_key['org'] = dest_course_key.org
-            asset_key['course'] = dest_course_key.course
-            if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
-                if 'run' in asset_key:
-                    del asset_key['run']
-                asset_id = asset_key
-            else:  # add the run, since it's the last field, we're golden
-                asset_key['run'] = dest_course_key.run
-                asset_id = six.text_type(
-                    dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
-                )
-            try:
-                self.create_asset(source_content, asset_id, asset, asset_key)
-            except FileExists:
-                self.fs.delete(file_id=asset_id)
-                self.create_asset(source_content, asset_id, asset, asset_key)
-
-    def create_asset(self, source_content, asset_id, asset, asset_key):
-        """
-        Creates a new asset
-        :param source_content:
-        :param asset_id:
-        :param asset:
-        :param asset_key:
-        :return:
-        """
-        self.fs.put(
-            source_content.read(),
-            _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-            displayname=asset['displayname'], content_son=asset_key,
-            # thumbnail is not technically correct but will be functionally correct as the code
-            # only looks at the name which is not course relative.
-            thumbnail_location=asset['thumbnail_location'],
-            import_path=asset['import_path'],
-            # getattr b/c caching may mean some pickled instances don't have attr
-            locked=asset.get('locked', False)
+            batch.append(asset)
+            if len(batch) == self.COPY_BATCH_SIZE:
+                self._copy_assets(batch, dest_course_key)
+                batch = []
+        if batch:
+            self._copy_assets(batch, dest_course_key)
+
+    def _copy_assets(self, assets, dest_course_key):
+        """
+        Copies the given fs.files documents and their chunks to the given course.
+        """
+        source_ids = []
+        dest_ids = {}
+        dest_assets = []
+        for asset in assets:
+            source_ids.append(asset['_id'])
+            if isinstance(asset['_id'], dict):
+                # Chunks may reference the ordered SON rather than the _id as read
+                source_ids.append(self.make_id_son(dict(asset)))
+            dest_asset = self._make_copied_asset(asset, dest_course_key)
+            dest_ids[_hashable_id(asset['_id'])] = dest_asset['_id']
+            dest_assets.append(dest_asset)
+
+        self._delete_copy_destinations(dest_assets)
+
+        # Like GridFS, write the chunks before the files, so that no file is ever visible without its data
+        chunks = []
+        for chunk in self.chunks.find({'files_id': {'$in': source_ids}}, projection={'_id': False}):
+            chunk['files_id'] = dest_ids[_hashable_id(chunk['files_id'])]
+            chunks.append(chunk)
+            if len(chunks) == self.COPY_BATCH_SIZE:
+                self.chunks.insert_many(chunks, ordered=False)
+                chunks = []
+        if chunks:
+            self.chunks.insert_many(chunks, ordered=False)
+        self.fs_files.insert_many(dest_assets)
+
+    def _make_copied_asset(self, asset, dest_course_key):
+        """
+        Returns the fs.files document of the copy of the given asset in the given course.
+        """
+        asset_key = self.make_id_son(dict(asset))
+        if isinstance(asset_key, six.string_types):
+            __, asset_key = self.asset_db_key(AssetKey.from_string(asset_key))
+        asset_key['org'] = dest_course_key.org
+        asset_key['course'] = dest_course_key.course
+        dest_location = dest_course_key.make_asset_key(asset_key['category'], asset_key['name'])
+        if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
+            if 'run' in asset_key:
+                del asset_key['run']
+            asset_id = asset_key
+        else:  # add the run, since it's the last field, we're golden
+            asset_key['run'] = dest_course_key.run
+            asset_id = six.text_type(dest_location.for_branch(None))
+
+        # thumbnail_location is copied as is, which is not technically correct but will be functionally
+        # correct as the code only looks at the name which is not course relative.
+        return dict(
+            asset, _id=asset_id, filename=six.text_type(dest_location), content_son=asset_key,
+            uploadDate=datetime.datetime.utcnow(),
         )
 
+    def _delete_copy_destinations(self, dest_assets):
+        """
+        Deletes the existing assets which the given copied fs.files documents replace.
+        """
+        existing_assets = self.fs_files.find(
+            {'_id': {'$in': [dest_asset['_id'] for dest_asset in dest_assets]}}, projection={'_id': True},
+        )
+        for asset in existing_assets:
+            self.delete(self.make_id_son(asset))
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
@@ -468,7 +518,7 @@ class MongoContentStore(ContentStore):
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self.delete(asset_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -603,6 +653,165 @@ class MongoContentStore(ContentStore):
         )
 
 
+class DeduplicatingMongoContentStore(MongoContentStore):
+    """
+    MongoDB-backed ContentStore which stores the data of identical assets only once.
+
+    The data of the assets is stored in a separate GridFS bucket as blobs, which
+    are identified by the sha256 digest of their data and reference counted. The
+    fs.files documents of the assets stay where MongoContentStore keeps them, with
+    the same attributes, but have no chunks of their own: they reference their
+    blob instead. Copying a course's assets therefore only copies these documents.
+
+    Assets stored by MongoContentStore are still served, copied and deleted as
+    they are, so this mode can be enabled on an existing contentstore.
+    """
+    storage_attrs = MongoContentStore.storage_attrs + ['blob_id', 'blob_file_id']
+
+    def __init__(self, host, db, bucket='fs', **kwargs):
+        super(DeduplicatingMongoContentStore, self).__init__(host, db, bucket=bucket, **kwargs)
+        mongo_db = self.fs_files.database
+        blob_bucket = bucket + '_blobs'
+        self.blobs = gridfs.GridFS(mongo_db, blob_bucket)
+        self.blobs_root = mongo_db[blob_bucket]  # the collection of which GridFS uses .files and .chunks
+        # The reference counts of the blobs, by digest, along with their GridFS attributes
+        self.blob_refs = mongo_db[blob_bucket + '.refs']
+
+    def _drop_database(self, database=True, collections=True, connections=True):
+        if not database:
+            if collections:
+                self.blobs_root.files.drop()
+                self.blobs_root.chunks.drop()
+                self.blob_refs.drop()
+            else:
+                self.blobs_root.files.remove({})
+                self.blobs_root.chunks.remove({})
+                self.blob_refs.remove({})
+        super(DeduplicatingMongoContentStore, self)._drop_database(database, collections, connections)
+
+    def save(self, content):
+        content_id, content_son = self.asset_db_key(content.location)
+        data_file, digest = _spool_data(content.data)
+        with data_file:
+            blob = self._acquire_blob(digest, data_file)
+
+        # Delete after acquiring the blob, so that saving the same data again doesn't store it again
+        self.delete(content_id)
+
+        thumbnail_location = (
+            content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
+        )
+        self.fs_files.insert_one({
+            '_id': content_id,
+            'filename': six.text_type(content.location),
+            'contentType': content.content_type,
+            'displayname': content.name,
+            'content_son': content_son,
+            'thumbnail_location': thumbnail_location,
+            'import_path': content.import_path,
+            # getattr b/c caching may mean some pickled instances don't have attr
+            'locked': getattr(content, 'locked', False),
+            'uploadDate': datetime.datetime.utcnow(),
+            'length': blob['length'],
+            'chunkSize': blob['chunkSize'],
+            'md5': blob['md5'],
+            'blob_id': digest,
+            'blob_file_id': blob['file_id'],
+        })
+        return content
+
+    def delete(self, location_or_id):
+        """
+        Delete an asset, and its blob if no other asset references it.
+        """
+        if isinstance(location_or_id, AssetKey):
+            location_or_id, _ = self.asset_db_key(location_or_id)
+        asset = self.fs_files.find_one_and_delete({'_id': location_or_id})
+        if asset is not None and 'blob_id' in asset:
+            self._release_blob(asset['blob_id'])
+        else:
+            # Deletes the chunks of an asset stored by MongoContentStore
+            self.fs.delete(location_or_id)
+
+    def _get_file(self, content_id):
+        asset = self.fs_files.find_one({'_id': content_id})
+        if asset is None:
+            raise NoFile(content_id)
+        if 'blob_id' not in asset:
+            return super(DeduplicatingMongoContentStore, self)._get_file(content_id)
+        # The attributes of the asset, with the data of its blob
+        return GridOut(self.blobs_root, file_document=dict(asset, _id=asset['blob_file_id']))
+
+    def set_attrs(self, location, attr_dict):
+        for attr in six.iterkeys(attr_dict):
+            if attr in ['blob_id', 'blob_file_id']:
+                raise AttributeError("{} is a protected attribute.".format(attr))
+        super(DeduplicatingMongoContentStore, self).set_attrs(location, attr_dict)
+
+    def _copy_assets(self, assets, dest_course_key):
+        """
+        Copies the given fs.files documents to the given course, referencing the
+        same blobs. The assets stored by MongoContentStore are copied with their chunks.
+        """
+        stored_assets = [asset for asset in assets if 'blob_id' not in asset]
+        if stored_assets:
+            super(DeduplicatingMongoContentStore, self)._copy_assets(stored_assets, dest_course_key)
+
+        dest_assets = [
+            self._make_copied_asset(asset, dest_course_key) for asset in assets if 'blob_id' in asset
+        ]
+        if dest_assets:
+            # Reference the blobs before deleting the replaced assets, which may reference the same ones
+            self.blob_refs.bulk_write([
+                UpdateOne({'_id': digest}, {'$inc': {'refcount': count}})
+                for digest, count in six.iteritems(Counter(dest_asset['blob_id'] for dest_asset in dest_assets))
+            ])
+            self._delete_copy_destinations(dest_assets)
+            self.fs_files.insert_many(dest_assets)
+
+    def _acquire_blob(self, digest, data_file):
+        """
+        References the blob with the given digest, storing it from the given
+        data file if it doesn't exist yet, and returns its reference document.
+        """
+        blob = self.blob_refs.find_one_and_update(
+            {'_id': digest}, {'$inc': {'refcount': 1}}, return_document=ReturnDocument.AFTER,
+        )
+        if blob is not None:
+            return blob
+
+        data_file.seek(0)
+        file_id = self.blobs.put(data_file)
+        blob_file = self.blobs_root.files.find_one({'_id': file_id})
+        blob = {
+            '_id': digest,
+            'file_id': file_id,
+            'length': blob_file['length'],
+            'chunkSize': blob_file['chunkSize'],
+            'md5': blob_file.get('md5'),
+            'refcount': 1,
+        }
+        try:
+            self.blob_refs.insert_one(blob)
+        except DuplicateKeyError:
+            # The same data was stored concurrently: reference that blob instead
+            self.blobs.delete(file_id)
+            return self._acquire_blob(digest, data_file)
+        return blob
+
+    def _release_blob(self, digest):
+        """
+        Dereferences the blob with the given digest, deleting it if it's no longer referenced.
+        """
+        blob = self.blob_refs.find_one_and_update(
+            {'_id': digest}, {'$inc': {'refcount': -1}}, return_document=ReturnDocument.AFTER,
+        )
+        # The blob may have been referenced again meanwhile, in which case it's kept
+        if blob is not None and blob['refcount'] <= 0:
+            if self.blob_refs.delete_one({'_id': digest, 'refcount': {'$lte': 0}}).deleted_count:
+                self.blobs.delete(blob['file_id'])
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
@@ -624,3 +833,31 @@ def query_for_course(course_key, category=None):
     else:
         dbkey['{}.run'.format(prefix)] = course_key.run
     return dbkey
+
+
+def _hashable_id(file_id):
+    """
+    Returns a hashable version of the given fs.files _id, which is independent of
+    the order of the fields of SON ids.
+    """
+    if isinstance(file_id, dict):
+        return tuple(sorted(six.iteritems(file_id)))
+    return file_id
+
+
+def _spool_data(data):
+    """
+    Returns a file with the given asset data, which can be bytes, text or an
+    iterable of bytes, along with the sha256 hex digest of the data.
+    """
+    if hasattr(data, '__iter__') and not isinstance(data, (six.binary_type, six.string_types)):
+        sha256 = hashlib.sha256()
+        data_file = tempfile.SpooledTemporaryFile(max_size=SPOOLED_DATA_MAX_SIZE)
+        for chunk in data:
+            sha256.update(chunk)
+            data_file.write(chunk)
+        return data_file, sha256.hexdigest()
+
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return BytesIO(data), hashlib.sha256(data).hexdigest()
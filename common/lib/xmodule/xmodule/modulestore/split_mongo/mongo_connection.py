@@ -34,6 +34,9 @@ except ImportError:
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
+# The code of the errors of writes which violate a unique index
+DUPLICATE_KEY_ERROR_CODE = 11000
+
 
 def get_cache(alias):
     """
@@ -271,6 +274,9 @@ class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
+    # The number of definitions inserted at a time by insert_definitions
+    DEFINITIONS_BATCH_SIZE = 1000
+
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
         asset_collection=None, retry_wait_time=0.1, **kwargs
@@ -568,6 +574,27 @@ class MongoConnection(object):
             tagger.tag(block_type=definition['block_type'])
             self.definitions.insert_one(definition)
 
+    def insert_definitions(self, definitions, course_context=None):
+        """
+        Create the given definitions in the db, in batches. Definitions which
+        are already in the db are skipped, as the store is append only.
+        """
+        with TIMER.timer("insert_definitions", course_context) as tagger:
+            tagger.measure('definitions', len(definitions))
+            for block_type in sorted({definition['block_type'] for definition in definitions}):
+                tagger.tag(block_type=block_type)
+            for start in range(0, len(definitions), self.DEFINITIONS_BATCH_SIZE):
+                try:
+                    self.definitions.insert_many(
+                        definitions[start:start + self.DEFINITIONS_BATCH_SIZE], ordered=False,
+                    )
+                except pymongo.errors.BulkWriteError as error:
+                    # Only ignore the errors from definitions which are already in the db
+                    if any(write_error['code'] != DUPLICATE_KEY_ERROR_CODE
+                           for write_error in error.details['writeErrors']):
+                        raise
+                    log.debug("Attempted to insert duplicate definitions")
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -274,16 +274,16 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in six.viewkeys(bulk_write_record.definitions) - bulk_write_record.definitions_in_db:
+        new_definitions = [
+            definition for _id, definition in six.iteritems(bulk_write_record.definitions)
+            if _id not in bulk_write_record.definitions_in_db
+        ]
+        if new_definitions:
             dirty = True
 
-            try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id], bulk_write_record.course_key)
-            except DuplicateKeyError:
-                # We may not have looked up this definition inside this bulk operation, and thus
-                # didn't realize that it was already in the database. That's OK, the store is
-                # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
+            # Some definitions may already be in the database, if we didn't look them up inside
+            # this bulk operation. That's OK, the store is append only, so they are skipped.
+            self.db_connection.insert_definitions(new_definitions, bulk_write_record.course_key)
 
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
@@ -12,11 +12,13 @@ from uuid import uuid4
 
 import ddt
 import path
+import six
+from mock import patch
 from opaque_keys.edx.keys import AssetKey
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 
 from xmodule.contentstore.content import StaticContent
-from xmodule.contentstore.mongo import MongoContentStore
+from xmodule.contentstore.mongo import DeduplicatingMongoContentStore, MongoContentStore
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
 from xmodule.tests import DATA_DIR
@@ -34,6 +36,8 @@ class TestContentstore(unittest.TestCase):
     Test the methods in contentstore.mongo using deprecated and non-deprecated keys
     """
 
+    contentstore_class = MongoContentStore
+
     # don't use these 2 class vars as they restore behavior once the tests are done
     asset_deprecated = None
     ssck_deprecated = None
@@ -59,7 +63,7 @@ class TestContentstore(unittest.TestCase):
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore = self.contentstore_class(HOST, DB, port=PORT)
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -199,6 +203,28 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_in_batches(self, deprecated):
+        """
+        copy_all_course_assets copies the data and metadata of the assets in batches
+        """
+        self.set_up_assets(deprecated)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        with patch.object(MongoContentStore, 'COPY_BATCH_SIZE', 2):
+            self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            dest_key = dest_course.make_asset_key('asset', filename)
+            copied = self.contentstore.find(dest_key)
+            self.assertEqual(copied.data, source.data)
+            self.assertEqual(copied.content_digest, source.content_digest)
+            self.assertEqual(copied.location, dest_key)
+            self.assertEqual(self.contentstore.get_attr(dest_key, 'filename'), six.text_type(dest_key))
+
+        # The source assets are untouched
+        __, count = self.contentstore.get_all_content_for_course(self.course1_key)
+        self.assertEqual(count, len(self.course1_files))
+
     @ddt.data(True, False)
     def test_copy_assets_with_duplicates(self, deprecated):
         """
@@ -223,3 +249,87 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         self.assertEqual(count, len(self.course2_files))
+
+
+@ddt.ddt
+class TestDeduplicatingContentstore(TestContentstore):
+    """
+    Test the methods in contentstore.mongo with the deduplicating contentstore
+    """
+    contentstore_class = DeduplicatingMongoContentStore
+
+    def assert_blob_refcounts(self, expected_refcounts):
+        """
+        Verifies the reference counts of the stored blobs, by the names of the assets.
+        """
+        digests = {}
+        for asset in self.contentstore.fs_files.find():
+            digests[asset['displayname']] = asset['blob_id']
+        refcounts = {blob['_id']: blob['refcount'] for blob in self.contentstore.blob_refs.find()}
+        self.assertEqual(refcounts, {digests[name]: count for name, count in six.iteritems(expected_refcounts)})
+        self.assertEqual(self.contentstore.blobs_root.files.count_documents({}), len(expected_refcounts))
+
+    @ddt.data(True, False)
+    def test_identical_assets_are_stored_once(self, deprecated):
+        self.set_up_assets(deprecated)
+        self.assert_blob_refcounts({
+            'contains.sh': 1, 'picture1.jpg': 2, 'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+        self.assertEqual(self.contentstore.chunks.count_documents({}), 0)
+
+        asset_key = self.course2_key.make_asset_key('asset', 'picture1.jpg')
+        content = self.contentstore.find(asset_key)
+        with open("{}/static/picture1.jpg".format(DATA_DIR), "rb") as f:
+            self.assertEqual(content.data, f.read())
+        self.assertIsNotNone(content.content_digest)
+        self.assertEqual(b''.join(self.contentstore.find(asset_key, as_stream=True).stream_data()), content.data)
+
+    @ddt.data(True, False)
+    def test_copy_references_blobs(self, deprecated):
+        self.set_up_assets(deprecated)
+        self.contentstore.copy_all_course_assets(self.course1_key, self.course2_key)
+        self.assert_blob_refcounts({
+            'contains.sh': 2, 'picture1.jpg': 2, 'picture2.jpg': 2, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.assert_blob_refcounts({
+            'contains.sh': 1, 'picture1.jpg': 1, 'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+        asset_key = self.course2_key.make_asset_key('asset', 'picture2.jpg')
+        self.assertEqual(self.contentstore.find(asset_key).name, 'picture2.jpg')
+
+    @ddt.data(True, False)
+    def test_save_replaces_blob(self, deprecated):
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', 'contains.sh')
+        self.contentstore.save(StaticContent(asset_key, 'contains.sh', 'text/x-sh', b'new data'))
+        self.assertEqual(self.contentstore.find(asset_key).data, b'new data')
+        self.assertEqual(self.contentstore.blob_refs.count_documents({}), 5)
+
+        self.contentstore.save(StaticContent(asset_key, 'contains.sh', 'text/x-sh', iter([b'new ', b'data'])))
+        self.assertEqual(self.contentstore.blob_refs.count_documents({}), 5)
+
+    @ddt.data(True, False)
+    def test_remove_redundant_content(self, deprecated):
+        self.set_up_assets(deprecated)
+        self.save_asset('picture1.jpg', self.course1_key.make_asset_key('asset', '._picture1.jpg'), 'picture1', False)
+        self.assertEqual(self.contentstore.remove_redundant_content_for_courses(), 1)
+        self.assert_blob_refcounts({
+            'contains.sh': 1, 'picture1.jpg': 2, 'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+
+    @ddt.data(True, False)
+    def test_assets_stored_without_deduplication(self, deprecated):
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', 'picture3.jpg')
+        MongoContentStore.save(self.contentstore, StaticContent(asset_key, 'picture3.jpg', 'image/jpeg', b'data'))
+        self.assertEqual(self.contentstore.find(asset_key).data, b'data')
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.find(dest_course.make_asset_key('asset', 'picture3.jpg')).data, b'data')
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.assertEqual(self.contentstore.chunks.count_documents({}), 0)
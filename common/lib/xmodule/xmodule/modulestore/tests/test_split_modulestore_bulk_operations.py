@@ -189,7 +189,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
         self.assertConnCalls(
-            call.insert_definition(self.definition, self.course_key),
+            call.insert_definitions([self.definition], self.course_key),
             call.update_course_index(
                 {'versions': {self.course_key.branch: self.definition['_id']}},
                 from_index=original_index,
@@ -210,8 +210,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         six.assertCountEqual(
             self,
             [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key),
+                call.insert_definitions([self.definition, other_definition], self.course_key),
                 call.update_course_index(
                     {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
                     from_index=original_index,
@@ -228,7 +227,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key, self.definition)
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertConnCalls(call.insert_definition(self.definition, self.course_key))
+        self.assertConnCalls(call.insert_definitions([self.definition], self.course_key))
 
     def test_write_multiple_definitions_on_close(self):
         self.conn.get_course_index.return_value = None
@@ -241,10 +240,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk._end_bulk_operation(self.course_key)
         six.assertCountEqual(
             self,
-            [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key)
-            ],
+            [call.insert_definitions([self.definition, other_definition], self.course_key)],
             self.conn.mock_calls
         )
 
@@ -484,7 +480,7 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
         self.bulk._begin_bulk_operation(self.course_key)
         self.bulk.get_definitions(self.course_key, test_ids)
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertFalse(self.conn.insert_definition.called)
+        self.assertFalse(self.conn.insert_definitions.called)
 
     def test_no_bulk_find_structures_derived_from(self):
         ids = [Mock(name='id')]
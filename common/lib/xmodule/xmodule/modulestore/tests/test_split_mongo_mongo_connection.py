@@ -3,12 +3,12 @@
 
 import unittest
 
-from mock import patch
-from pymongo.errors import ConnectionFailure
+from mock import call, patch
+from pymongo.errors import BulkWriteError, ConnectionFailure
 
 from pymongo.errors import ConnectionFailure
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, Tagger
 
 
 class TestHeartbeatFailureException(unittest.TestCase):
@@ -24,3 +24,43 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+@patch('pymongo.MongoClient')
+@patch('pymongo.database.Database')
+@patch('mongodb_proxy.MongoProxy')
+class TestInsertDefinitions(unittest.TestCase):
+    """ Test the batched insertion of definitions """
+
+    def test_insert_in_batches(self, *calls):
+        # pylint: disable=W0613
+        connection = MongoConnection('useless', 'useless', 'useless')
+        definitions = [{'_id': index, 'block_type': 'html'} for index in range(5)]
+        with patch.object(MongoConnection, 'DEFINITIONS_BATCH_SIZE', 2):
+            connection.insert_definitions(definitions)
+        self.assertEqual(
+            [call_args[0][0] for call_args in connection.definitions.insert_many.call_args_list],
+            [definitions[0:2], definitions[2:4], definitions[4:5]],
+        )
+
+    def test_block_types_are_tagged(self, *calls):
+        # pylint: disable=W0613
+        connection = MongoConnection('useless', 'useless', 'useless')
+        definitions = [
+            {'_id': 1, 'block_type': 'problem'},
+            {'_id': 2, 'block_type': 'html'},
+            {'_id': 3, 'block_type': 'html'},
+        ]
+        with patch.object(Tagger, 'tag') as mock_tag:
+            connection.insert_definitions(definitions)
+        self.assertEqual(mock_tag.call_args_list, [call(block_type='html'), call(block_type='problem')])
+
+    def test_duplicate_definitions_are_skipped(self, *calls):
+        # pylint: disable=W0613
+        connection = MongoConnection('useless', 'useless', 'useless')
+        connection.definitions.insert_many.side_effect = BulkWriteError({'writeErrors': [{'code': 11000}]})
+        connection.insert_definitions([{'_id': 1, 'block_type': 'html'}])
+
+        connection.definitions.insert_many.side_effect = BulkWriteError({'writeErrors': [{'code': 121}]})
+        with self.assertRaises(BulkWriteError):
+            connection.insert_definitions([{'_id': 1, 'block_type': 'html'}])
@@ -28,7 +28,11 @@ import logging
 import mimetypes
 import os
 import re
+import time
 from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import six
 import xblock
@@ -104,6 +108,31 @@ class StaticContentImporter:
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        for file_path in self._get_static_content_files(static_dir, verbose):
+            imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+
+        return remap_dict
+
+    def submit_static_content_directory(self, executor, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+        """
+        Submits the import of each file of the static content directory to the given
+        concurrent.futures executor, and returns the futures of the imports.
+        """
+        static_dir = self.course_data_path / content_subdir
+        return [
+            executor.submit(self.import_static_file, file_path, base_dir=static_dir)
+            for file_path in self._get_static_content_files(static_dir, verbose)
+        ]
+
+    def _get_static_content_files(self, static_dir, verbose=False):
+        """
+        Yields the paths of the files to import from the given static content directory.
+        """
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -117,14 +146,7 @@ class StaticContentImporter:
                 if verbose:
                     log.debug('importing static content %s...', file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
-
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
-
-        return remap_dict
+                yield file_path
 
     def import_static_file(self, full_file_path, base_dir):
         filename = os.path.basename(full_file_path)
@@ -222,6 +244,12 @@ class ImportManager(object):
             create this file to implement custom logic in their course.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_import_workers: If greater than 0, the static files are imported by this number of threads,
+            while the blocks are imported into the store. Otherwise, they are imported one after the other,
+            before the blocks.
+
+    The time spent in each phase of the import, in seconds, is recorded in phase_timings.
     """
     store_class = XMLModuleStore
 
@@ -234,6 +262,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_import_workers=0,
     ):
         self.store = store
         self.user_id = user_id
@@ -249,17 +278,49 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_modules=load_error_modules,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.static_import_workers = static_import_workers
+        self.phase_timings = OrderedDict()
+        with self._timed('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_modules=load_error_modules,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    def _record_timing(self, phase, start_time):
+        """
+        Adds the time elapsed since start_time to the timing of the given import phase.
+        """
+        self.phase_timings[phase] = self.phase_timings.get(phase, 0) + time.time() - start_time
+
+    @contextmanager
+    def _timed(self, phase):
+        """
+        A context manager that adds the time spent in it to the timing of the given import phase.
+        """
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self._record_timing(phase, start_time)
+
+    @contextmanager
+    def _static_import_executor(self):
+        """
+        A context manager that returns the executor of the static file imports, or None
+        when they are imported one after the other.
+        """
+        if not self.static_import_workers:
+            yield None
+            return
+        with ThreadPoolExecutor(max_workers=self.static_import_workers) as executor:
+            yield executor
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -269,26 +330,42 @@ class ImportManager(object):
         if self.target_id:
             assert len(self.xml_module_store.modules) == 1
 
-    def import_static(self, data_path, dest_id):
+    def import_static(self, data_path, dest_id, executor=None):
         """
         Import all static items into the content store.
+
+        If an executor is given, the static content directories are imported by it,
+        and the futures of the imports are returned.
         """
+        static_imports = []
         if self.static_content_store is None:
             log.warning("Static content store is None. Skipping static content import...")
-            return
+            return static_imports
 
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
             target_id=dest_id
         )
+
+        def import_static_content_directory(content_subdir):
+            """
+            Imports the given static content directory, with the executor if any.
+            """
+            if executor is None:
+                static_content_importer.import_static_content_directory(
+                    content_subdir=content_subdir, verbose=self.verbose
+                )
+            else:
+                static_imports.extend(static_content_importer.submit_static_content_directory(
+                    executor, content_subdir=content_subdir, verbose=self.verbose
+                ))
+
         if self.do_import_static:
             if self.verbose:
                 log.debug("Importing static content and python library")
             # first pass to find everything in the static content directory
-            static_content_importer.import_static_content_directory(
-                content_subdir=self.static_content_subdir, verbose=self.verbose
-            )
+            import_static_content_directory(self.static_content_subdir)
         elif self.do_import_python_lib and self.python_lib_filename:
             if self.verbose:
                 log.debug("Skipping static content import, still importing python library")
@@ -315,9 +392,9 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             if self.verbose:
                 log.debug("Importing %s directory", simport)
-            static_content_importer.import_static_content_directory(
-                content_subdir=simport, verbose=self.verbose
-            )
+            import_static_content_directory(simport)
+
+        return static_imports
 
     def import_asset_metadata(self, data_dir, course_id):
         """
@@ -502,23 +579,39 @@ class ImportManager(object):
             # This bulk operation wraps all the operations to populate the published branch.
             with self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+                with self._timed('courselike'):
+                    source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+
+                # The static pieces are imported in parallel with the blocks if there are static import
+                # workers, since the blocks only reference them by path.
+                with self._static_import_executor() as executor:
+                    # Import all static pieces.
+                    with self._timed('static'):
+                        static_imports = self.import_static(data_path, dest_id, executor=executor)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                    # Import asset metadata stored in XML.
+                    with self._timed('asset_metadata'):
+                        self.import_asset_metadata(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import all children
+                    with self._timed('children'):
+                        self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    # Wait for the static pieces, raising any error of their imports
+                    with self._timed('static_wait'):
+                        for static_import in static_imports:
+                            static_import.result()
+
+                # Writing the published branch happens when the bulk operation ends
+                bulk_write_start_time = time.time()
+            self._record_timing('bulk_write', bulk_write_start_time)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self._timed('drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
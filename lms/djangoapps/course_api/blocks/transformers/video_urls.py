@@ -51,8 +51,15 @@ class VideoBlockURLTransformer(BlockStructureTransformer):
             only_on_web = student_view_data.get('only_on_web')
             if only_on_web:
                 continue
-            encoded_videos = student_view_data.get('encoded_videos')
-            for video_format, video_data in six.iteritems(encoded_videos):
-                if video_format in self.VIDEO_FORMAT_EXCEPTIONS:
-                    continue
-                video_data['url'] = rewrite_video_url(self.CDN_URL, video_data['url'])
+            # Rewrite copies of the collected data, which may be shared with other requests.
+            encoded_videos = {}
+            for video_format, video_data in six.iteritems(student_view_data.get('encoded_videos')):
+                if video_format not in self.VIDEO_FORMAT_EXCEPTIONS:
+                    video_data = dict(video_data, url=rewrite_video_url(self.CDN_URL, video_data['url']))
+                encoded_videos[video_format] = video_data
+            block_structure.set_transformer_block_field(
+                block_key,
+                StudentViewTransformer,
+                StudentViewTransformer.STUDENT_VIEW_DATA,
+                dict(student_view_data, encoded_videos=encoded_videos),
+            )
@@ -0,0 +1,104 @@
+"""
+Profile the course blocks transformers for a course and a user.
+
+Collects the course's block structure from the modulestore and then
+transforms it for the user, reporting the wall time, the number of
+blocks removed and the size of the collected data of each transformer.
+
+Example usage:
+    $ ./manage.py lms profile_course_blocks 'course-v1:edX+DemoX+Demo_Course' --username=staff --settings=devstack
+"""
+
+
+from textwrap import dedent
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from six.moves import range
+
+from lms.djangoapps.course_blocks.api import get_course_block_access_transformers
+from lms.djangoapps.course_blocks.transformers.hidden_content import HiddenContentTransformer
+from lms.djangoapps.course_blocks.usage_info import CourseUsageInfo
+from openedx.core.djangoapps.content.block_structure.config import INSTRUMENT_TRANSFORMERS, waffle
+from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from openedx.core.djangoapps.content.block_structure.instrumentation import (
+    BLOCKS_REMOVED,
+    COLLECTED_BYTES,
+    DURATION,
+    TransformerMetrics
+)
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id',
+                            help=u'the course to profile')
+        parser.add_argument('--username',
+                            required=True,
+                            help=u'the user to transform the course blocks for')
+        parser.add_argument('--iterations',
+                            default=1,
+                            type=int,
+                            help=u'the number of times to transform the course blocks, to average their timings')
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            raise CommandError(u'Invalid course_id')
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(u'Invalid username')
+        iterations = options['iterations']
+        if iterations < 1:
+            raise CommandError(u'--iterations must be a positive number')
+
+        waffle().override_for_request(INSTRUMENT_TRANSFORMERS)
+
+        store = modulestore()
+        with store.bulk_operations(course_key):
+            collected_block_structure = BlockStructureFactory.create_from_modulestore(
+                store.make_course_usage_key(course_key),
+                store,
+            )
+            collect_metrics = BlockStructureTransformers.collect(collected_block_structure)
+
+        transform_metrics = TransformerMetrics(u'transform')
+        for _ in range(iterations):
+            transformers = BlockStructureTransformers(
+                get_course_block_access_transformers(user) + [HiddenContentTransformer()],
+                usage_info=CourseUsageInfo(course_key, user),
+            )
+            transform_metrics.update(transformers.transform(collected_block_structure.copy()))
+
+        self.stdout.write(u'Blocks in course: {}'.format(len(collected_block_structure)))
+        self._write_metrics(collect_metrics, 1)
+        self._write_metrics(transform_metrics, iterations)
+
+    def _write_metrics(self, metrics, iterations):
+        """
+        Writes a table of the given metrics, averaged over the given
+        number of iterations.
+        """
+        self.stdout.write(u'\n{:<10} {:<40} {:>12} {:>15} {:>16}'.format(
+            metrics.phase, u'transformer', u'duration_ms', BLOCKS_REMOVED, COLLECTED_BYTES,
+        ))
+        for transformer_name, measurements in sorted(
+                metrics.transformers.items(),
+                key=lambda item: item[1].get(DURATION, 0),
+                reverse=True,
+        ):
+            self.stdout.write(u'{:<10} {:<40} {:>12.1f} {:>15} {:>16}'.format(
+                u'',
+                transformer_name,
+                measurements.get(DURATION, 0) * 1000 / iterations,
+                measurements.get(BLOCKS_REMOVED, 0) // iterations,
+                measurements.get(COLLECTED_BYTES, u'-'),
+            ))
@@ -0,0 +1,41 @@
+"""
+Tests for the profile_course_blocks management command.
+"""
+
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from six import StringIO, text_type
+
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestProfileCourseBlocks(ModuleStoreTestCase):
+    """
+    Tests for the profile_course_blocks management command.
+    """
+    def setUp(self):
+        super(TestProfileCourseBlocks, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        ItemFactory.create(parent=chapter, category='sequential', visible_to_staff_only=True)
+        self.user = UserFactory.create()
+
+    def test_profile(self):
+        out = StringIO()
+        call_command(
+            'profile_course_blocks', text_type(self.course.id), username=self.user.username, iterations=2, stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn(u'Blocks in course: 3', output)
+
+        transform_output = output[output.index(u'\ntransform'):]
+        visibility_row = [line for line in transform_output.splitlines() if VisibilityTransformer.name() in line][0]
+        self.assertEqual(visibility_row.split()[2], u'1')  # the staff only sequential is removed
+
+    def test_invalid_username(self):
+        with self.assertRaisesMessage(CommandError, u'Invalid username'):
+            call_command('profile_course_blocks', text_type(self.course.id), username='not_a_user')
@@ -25,6 +25,9 @@ from lms.djangoapps.grades.signals.handlers import disconnect_submissions_signal
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.subsection_grade_factory import SubsectionGradeFactory
 from lms.djangoapps.grades.tasks import compute_all_grades_for_course as task_compute_all_grades_for_course
+from lms.djangoapps.grades.tasks import (
+    recalculate_course_and_subsection_grades_for_user as task_recalculate_course_and_subsection_grades_for_user
+)
 from lms.djangoapps.grades.util_services import GradesUtilService
 from lms.djangoapps.utils import _get_key
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
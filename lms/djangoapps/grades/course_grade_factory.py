@@ -4,6 +4,7 @@ Course Grade Factory Class
 
 
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import six
@@ -16,10 +17,16 @@ from openedx.core.djangoapps.signals.signals import (
 )
 
 from .config import assume_zero_if_absent, should_persist_grades
+from .config.waffle import BULK_PREFETCH_GRADES, waffle
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
-from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .models_api import (
+    clear_prefetched_grades_for_users,
+    prefetch_grade_overrides_and_visible_blocks,
+    prefetch_grades_for_users
+)
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -30,6 +37,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grading data is prefetched together by iter
+    PREFETCH_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -109,8 +119,37 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if not waffle().is_enabled(BULK_PREFETCH_GRADES):
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+            return
+
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.PREFETCH_BATCH_SIZE))
+            if not batch:
+                break
+            self._prefetch_batch(batch, course_data)
+            try:
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                self._clear_prefetched_batch(batch, course_data)
+
+    @staticmethod
+    def _prefetch_batch(users, course_data):
+        """
+        Prefetches the grades and scores of a batch of users so that grading
+        them takes a constant number of queries instead of a few per user.
+        """
+        if should_persist_grades(course_data.course_key):
+            prefetch_grades_for_users(course_data.course_key, users)
+        SubsectionGradeFactory.prefetch_scores(course_data, users)
+
+    @staticmethod
+    def _clear_prefetched_batch(users, course_data):
+        clear_prefetched_grades_for_users(course_data.course_key, users)
+        SubsectionGradeFactory.clear_prefetched_scores(course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
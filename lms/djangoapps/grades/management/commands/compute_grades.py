@@ -114,6 +114,8 @@ class Command(BaseCommand):
                 'course_key': args[0],
                 'offset': args[1],
                 'batch_size': args[2],
+                'min_id': args[3],
+                'max_id': args[4],
                 'estimate_first_attempted': estimate_first_attempted,
             }
 
@@ -40,6 +40,16 @@ class TestComputeGrades(SharedModuleStoreTestCase):
             for course in cls.courses:
                 CourseEnrollment.enroll(user, course.id)
 
+    def _enrollment_id_range(self, course_key, offset, batch_size):
+        """
+        Returns the (min_id, max_id) enrollment ids of a batch of the course.
+        """
+        enrollment_ids = list(
+            CourseEnrollment.objects.filter(course_id=course_key).order_by('id').values_list('id', flat=True)
+        )
+        batch_ids = enrollment_ids[offset:offset + batch_size]
+        return batch_ids[0], batch_ids[-1]
+
     def test_select_all_courses(self):
         courses = self.command._get_course_keys({'all_courses': True})
         assert set(six.text_type(course) for course in courses) == set(self.course_keys)
@@ -85,6 +95,8 @@ class TestComputeGrades(SharedModuleStoreTestCase):
             'course_key': course_key,
             'batch_size': 2,
             'offset': offset,
+            'min_id': self._enrollment_id_range(course_key, offset, 2)[0],
+            'max_id': self._enrollment_id_range(course_key, offset, 2)[1],
             'estimate_first_attempted': estimate_first_attempted,
             'seq_id': ANY,
         }
@@ -124,6 +136,8 @@ class TestComputeGrades(SharedModuleStoreTestCase):
                     'course_key': self.course_keys[1],
                     'batch_size': 2,
                     'offset': 0,
+                    'min_id': self._enrollment_id_range(self.course_keys[1], 0, 2)[0],
+                    'max_id': self._enrollment_id_range(self.course_keys[1], 0, 2)[1],
                     'estimate_first_attempted': True,
                     'seq_id': ANY,
                 },
@@ -133,6 +147,8 @@ class TestComputeGrades(SharedModuleStoreTestCase):
                     'course_key': self.course_keys[1],
                     'batch_size': 2,
                     'offset': 2,
+                    'min_id': self._enrollment_id_range(self.course_keys[1], 2, 2)[0],
+                    'max_id': self._enrollment_id_range(self.course_keys[1], 2, 2)[1],
                     'estimate_first_attempted': True,
                     'seq_id': ANY,
                 },
@@ -278,6 +278,33 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
         return prefetched
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches visible blocks for the given users and course with a single query
+        and stores them in the cache of each user.
+        """
+        prefetched = {user.id: {} for user in users}
+        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+            user_id__in=list(prefetched),
+            course_id=course_key,
+        )
+        for grade in grades_with_blocks:
+            prefetched[grade.user_id][grade.visible_blocks.hashed] = grade.visible_blocks
+
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, user_blocks in six.iteritems(prefetched):
+            cache[cls._cache_key(user_id, course_key)] = user_blocks
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key, users):
+        """
+        Clears prefetched visible blocks for the given users and course from the RequestCache.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user in users:
+            cache.pop(cls._cache_key(user.id, course_key), None)
+
     @classmethod
     def _update_cache(cls, user_id, course_key, visible_blocks):
         """
@@ -729,6 +756,44 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def prefetch_for_users(cls, course_key, users):
+        """
+        Prefetches the overrides of the given users in the course with a single query.
+        """
+        prefetched = {user.id: {} for user in users}
+        overrides = cls.objects.select_related('grade').filter(
+            grade__user_id__in=list(prefetched),
+            grade__course_id=course_key,
+        )
+        for override in overrides:
+            prefetched[override.grade.user_id][override.grade.usage_key] = override
+
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, user_overrides in six.iteritems(prefetched):
+            cache[(user_id, str(course_key))] = user_overrides
+        cache[cls._bulk_cache_key(course_key)] = set(prefetched)
+
+    @classmethod
+    def is_prefetched_for_user(cls, user_id, course_key):
+        """
+        Returns whether the overrides of the user were prefetched by `prefetch_for_users`.
+        """
+        return user_id in get_cache(cls._CACHE_NAMESPACE).get(cls._bulk_cache_key(course_key), ())
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears the overrides prefetched by `prefetch_for_users` for this course from the RequestCache.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id in cache.pop(cls._bulk_cache_key(course_key), ()):
+            cache.pop((user_id, str(course_key)), None)
+
+    @classmethod
+    def _bulk_cache_key(cls, course_key):
+        return u"overrides_prefetched_users.{}".format(course_key)
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
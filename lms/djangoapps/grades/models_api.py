@@ -13,7 +13,8 @@ from lms.djangoapps.utils import _get_key
 
 
 def prefetch_grade_overrides_and_visible_blocks(user, course_key):
-    _PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
+    if not _PersistentSubsectionGradeOverride.is_prefetched_for_user(user.id, course_key):
+        _PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     _VisibleBlocks.bulk_read(user.id, course_key)
 
 
@@ -26,6 +27,24 @@ def prefetch_course_and_subsection_grades(course_key, users):
     _PersistentSubsectionGrade.prefetch(course_key, users)
 
 
+def prefetch_grades_for_users(course_key, users):
+    """
+    Prefetches the course grades, subsection grades, visible blocks and overrides
+    of all the given users with a constant number of queries.
+    """
+    _PersistentCourseGrade.prefetch(course_key, users)
+    _PersistentSubsectionGrade.prefetch(course_key, users)
+    _VisibleBlocks.prefetch(course_key, users)
+    _PersistentSubsectionGradeOverride.prefetch_for_users(course_key, users)
+
+
+def clear_prefetched_grades_for_users(course_key, users):
+    _PersistentCourseGrade.clear_prefetched_data(course_key)
+    _PersistentSubsectionGrade.clear_prefetched_data(course_key)
+    _VisibleBlocks.clear_prefetched_data(course_key, users)
+    _PersistentSubsectionGradeOverride.clear_prefetched_data(course_key)
+
+
 def clear_prefetched_course_grades(course_key):
     _PersistentCourseGrade.clear_prefetched_data(course_key)
     _PersistentSubsectionGrade.clear_prefetched_data(course_key)
@@ -3,18 +3,21 @@ SubsectionGrade Factory Class
 """
 
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from logging import getLogger
 
 from lazy import lazy
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
 from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_grades
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
-from student.models import anonymous_id_for_user
+from student.models import anonymous_id_for_user, anonymous_ids_for_users
 
 from .course_data import CourseData
 from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSubsectionGrade
@@ -26,6 +29,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u'grades.subsection_grade_factory.SubsectionGradeFactory'
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -106,12 +111,37 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_scores(cls, course_data, users):
+        """
+        Shares the CSM and Submissions scores of the given users in the course
+        between their factories. The scores of all the users are queried together
+        the first time any of the factories needs them.
+        """
+        get_cache(cls._CACHE_NAMESPACE)[str(course_data.course_key)] = _PrefetchedScores(course_data, users)
+
+    @classmethod
+    def clear_prefetched_scores(cls, course_key):
+        """
+        Clears the prefetched scores for this course from the RequestCache.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(str(course_key), None)
+
+    @lazy
+    def _prefetched_scores(self):
+        prefetched_scores = get_cache(self._CACHE_NAMESPACE).get(str(self.course_data.course_key))
+        if prefetched_scores is not None and self.student.id in prefetched_scores:
+            return prefetched_scores
+        return None
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores.csm_scores[self.student.id]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -121,6 +151,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores.submissions_scores[self.student.id]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -169,3 +201,50 @@ class SubsectionGradeFactory(object):
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+class _PrefetchedScores(object):
+    """
+    Lazily queries the CSM and Submissions scores of a batch of users in a course
+    with a constant number of queries.
+    """
+    def __init__(self, course_data, users):
+        self.course_data = course_data
+        self.users = list(users)
+        self._user_ids = {user.id for user in self.users}
+
+    def __contains__(self, user_id):
+        return user_id in self._user_ids
+
+    @lazy
+    def csm_scores(self):
+        """
+        Returns a dict of user_id -> ScoresClient. The scorable locations are taken
+        from the collected structure since it includes the blocks of all the users.
+        """
+        scorable_locations = [
+            block_key for block_key in self.course_data.collected_structure if possibly_scored(block_key)
+        ]
+        return ScoresClient.create_for_users(self.course_data.course_key, self._user_ids, scorable_locations)
+
+    @lazy
+    def submissions_scores(self):
+        """
+        Returns a dict of user_id -> scores in the same format as `submissions_api.get_scores`.
+        """
+        course_id = str(self.course_data.course_key)
+        anonymous_ids = anonymous_ids_for_users(self.users, self.course_data.course_key)
+        scores_by_anonymous_id = defaultdict(dict)
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=course_id,
+            student_item__student_id__in=list(anonymous_ids.values()),
+        ).select_related('latest', 'latest__submission', 'student_item')
+        for summary in score_summaries:
+            if not summary.latest.is_hidden():
+                scores_by_anonymous_id[summary.student_item.student_id][summary.student_item.item_id] = (
+                    UnannotatedScoreSerializer(summary.latest).data
+                )
+        return {
+            user_id: scores_by_anonymous_id.get(anonymous_id, {})
+            for user_id, anonymous_id in anonymous_ids.items()
+        }
@@ -62,11 +62,13 @@ def compute_all_grades_for_course(**kwargs):
         if are_grades_frozen(course_key):
             log.info(u"Attempted compute_all_grades_for_course for course '%s', but grades are frozen.", course_key)
             return
-        for course_key_string, offset, batch_size in _course_task_args(course_key=course_key, **kwargs):
+        for course_key_string, offset, batch_size, min_id, max_id in _course_task_args(course_key=course_key, **kwargs):
             kwargs.update({
                 'course_key': course_key_string,
                 'offset': offset,
                 'batch_size': batch_size,
+                'min_id': min_id,
+                'max_id': max_id,
             })
             compute_grades_for_course_v2.apply_async(
                 kwargs=kwargs, routing_key=settings.POLICY_CHANGE_GRADES_ROUTING_KEY
@@ -85,9 +87,8 @@ def compute_grades_for_course_v2(self, **kwargs):
     """
     Compute grades for a set of students in the specified course.
 
-    The set of students will be determined by the order of enrollment date, and
-    limited to at most <batch_size> students, starting from the specified
-    offset.
+    The set of students will be determined by the range of enrollment ids
+    between <min_id> and <max_id>, see compute_grades_for_course.
 
     TODO: Roll this back into compute_grades_for_course once all workers have
     the version with **kwargs.
@@ -99,27 +100,42 @@ def compute_grades_for_course_v2(self, **kwargs):
         set_event_transaction_type(kwargs['event_transaction_type'])
 
     try:
-        return compute_grades_for_course(kwargs['course_key'], kwargs['offset'], kwargs['batch_size'])
+        return compute_grades_for_course(
+            kwargs['course_key'],
+            kwargs['offset'],
+            kwargs['batch_size'],
+            min_id=kwargs.get('min_id'),
+            max_id=kwargs.get('max_id'),
+        )
     except Exception as exc:
         raise self.retry(kwargs=kwargs, exc=exc)
 
 
 @task(base=LoggedPersistOnFailureTask)
-def compute_grades_for_course(course_key, offset, batch_size, **kwargs):  # pylint: disable=unused-argument
+def compute_grades_for_course(course_key, offset, batch_size, min_id=None, max_id=None, **kwargs):
+    # pylint: disable=unused-argument
     """
     Compute and save grades for a set of students in the specified course.
 
-    The set of students will be determined by the order of enrollment date, and
-    limited to at most <batch_size> students, starting from the specified
-    offset.
+    The set of students will be determined by the range of enrollment ids
+    between <min_id> and <max_id> (inclusive), so that every batch is a cheap
+    index range scan wherever it is in the course.
+
+    Tasks queued without <min_id> and <max_id> fall back to the order of
+    enrollment date, limited to at most <batch_size> students, starting from
+    the specified offset.
     """
     course_key = CourseKey.from_string(course_key)
     if are_grades_frozen(course_key):
         log.info(u"Attempted compute_grades_for_course for course '%s', but grades are frozen.", course_key)
         return
 
-    enrollments = CourseEnrollment.objects.filter(course_id=course_key).order_by('created')
-    student_iter = (enrollment.user for enrollment in enrollments[offset:offset + batch_size])
+    enrollments = CourseEnrollment.objects.filter(course_id=course_key).select_related('user')
+    if min_id is not None and max_id is not None:
+        enrollments = enrollments.filter(id__range=(min_id, max_id)).order_by('id')
+    else:
+        enrollments = enrollments.order_by('created')[offset:offset + batch_size]
+    student_iter = (enrollment.user for enrollment in enrollments)
     for result in CourseGradeFactory().iter(users=student_iter, course_key=course_key, force_update=True):
         if result.error is not None:
             raise result.error
@@ -342,16 +358,31 @@ def _update_subsection_grades(
 def _course_task_args(course_key, **kwargs):
     """
     Helper function to generate course-grade task args.
+
+    Yields (course_key, offset, batch_size, min_id, max_id) tuples where
+    <min_id> and <max_id> are the first and last enrollment ids of each batch.
+    The <offset> is kept for the workers which don't support the id ranges yet.
     """
     from_settings = kwargs.pop('from_settings', True)
-    enrollment_count = CourseEnrollment.objects.filter(course_id=course_key).count()
-    if enrollment_count == 0:
-        log.warning(u"No enrollments found for {}".format(course_key))
-
     if from_settings is False:
         batch_size = kwargs.pop('batch_size', 100)
     else:
         batch_size = ComputeGradesSetting.current().batch_size
 
-    for offset in six.moves.range(0, enrollment_count, batch_size):
-        yield (six.text_type(course_key), offset, batch_size)
+    enrollment_ids = CourseEnrollment.objects.filter(
+        course_id=course_key,
+    ).order_by('id').values_list('id', flat=True)
+
+    # Walk the enrollment ids once instead of counting and slicing at increasing offsets.
+    offset = 0
+    batch_ids = []
+    for enrollment_id in enrollment_ids.iterator():
+        batch_ids.append(enrollment_id)
+        if len(batch_ids) == batch_size:
+            yield (six.text_type(course_key), offset, batch_size, batch_ids[0], batch_ids[-1])
+            offset += batch_size
+            batch_ids = []
+    if batch_ids:
+        yield (six.text_type(course_key), offset, batch_size, batch_ids[0], batch_ids[-1])
+    elif offset == 0:
+        log.warning(u"No enrollments found for {}".format(course_key))
@@ -7,17 +7,22 @@ import itertools
 
 import ddt
 from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from edx_django_utils.cache import RequestCache
 from mock import patch
 from six import text_type
 
 from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, BULK_PREFETCH_GRADES, waffle
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
@@ -187,6 +192,40 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    def _iter_query_count(self, user_ids, force_update, prefetch):
+        """
+        Returns the number of queries made by iter to grade the given users from a cold request cache.
+        """
+        users = list(User.objects.filter(id__in=user_ids).order_by('id'))
+        RequestCache.clear_all_namespaces()
+        with waffle().override(BULK_PREFETCH_GRADES, active=prefetch):
+            with CaptureQueriesContext(connection) as queries:
+                results = list(CourseGradeFactory().iter(users, self.course, force_update=force_update))
+        self.assertEqual([result.error for result in results], [None] * len(users))
+        return len(queries)
+
+    @ddt.data(True, False)
+    def test_bulk_prefetch_queries_per_user(self, force_update):
+        """
+        Benchmark of the queries made for each additional user by iter, with
+        and without prefetching the grades and scores of the batch.
+        """
+        user_ids = [self.request.user.id]
+        for _ in range(4):
+            user = UserFactory.create()
+            CourseEnrollment.enroll(user, self.course.id)
+            user_ids.append(user.id)
+        with mock_get_score(1, 2):
+            list(CourseGradeFactory().iter(User.objects.filter(id__in=user_ids), self.course, force_update=True))
+
+        queries_per_user = {}
+        for prefetch in (False, True):
+            single_user_queries = self._iter_query_count(user_ids[:1], force_update, prefetch)
+            all_users_queries = self._iter_query_count(user_ids, force_update, prefetch)
+            queries_per_user[prefetch] = (all_users_queries - single_user_queries) / float(len(user_ids) - 1)
+
+        self.assertLess(queries_per_user[True], queries_per_user[False])
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -12,7 +12,9 @@ import ddt
 import pytz
 import six
 from django.conf import settings
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from mock import MagicMock, patch
 from six.moves import range
@@ -435,10 +437,30 @@ class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase
             min(batch_size, 8)  # No more than 8 due to offset
         )
 
+    @ddt.data(*range(3, 12, 3))
+    def test_behavior_with_id_range(self, batch_size):
+        enrollment_ids = list(
+            CourseEnrollment.objects.filter(course_id=self.course.id).order_by('id').values_list('id', flat=True)
+        )
+        with mock_get_score(1, 2):
+            result = compute_grades_for_course_v2.delay(
+                course_key=six.text_type(self.course.id),
+                batch_size=batch_size,
+                offset=4,
+                min_id=enrollment_ids[4],
+                max_id=enrollment_ids[min(4 + batch_size, 12) - 1],
+            )
+        self.assertTrue(result.successful)
+        self.assertEqual(
+            PersistentCourseGrade.objects.filter(course_id=self.course.id).count(),
+            min(batch_size, 8)  # No more than 8 due to offset
+        )
+
     @ddt.data(*range(1, 12, 3))
     def test_course_task_args(self, test_batch_size):
         offset_expected = 0
-        for course_key, offset, batch_size in _course_task_args(
+        graded_enrollment_ids = []
+        for course_key, offset, batch_size, min_id, max_id in _course_task_args(
             batch_size=test_batch_size, course_key=self.course.id, from_settings=False
         ):
             self.assertEqual(course_key, six.text_type(self.course.id))
@@ -446,6 +468,39 @@ class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase
             self.assertEqual(offset, offset_expected)
             offset_expected += test_batch_size
 
+            batch_enrollment_ids = list(CourseEnrollment.objects.filter(
+                course_id=self.course.id, id__range=(min_id, max_id),
+            ).values_list('id', flat=True))
+            self.assertLessEqual(len(batch_enrollment_ids), test_batch_size)
+            graded_enrollment_ids.extend(batch_enrollment_ids)
+
+        self.assertEqual(
+            sorted(graded_enrollment_ids),
+            sorted(CourseEnrollment.objects.filter(course_id=self.course.id).values_list('id', flat=True)),
+        )
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.iter')
+    def test_batch_cost_is_flat(self, mock_iter):
+        """
+        Every batch should load its enrollments and users in one keyset query
+        without an OFFSET, so that the last batches of a course cost as much as
+        the first one.
+        """
+        mock_iter.side_effect = lambda users, **kwargs: [user for user in users if user is None]
+        for course_key, offset, batch_size, min_id, max_id in _course_task_args(
+            batch_size=3, course_key=self.course.id, from_settings=False
+        ):
+            with CaptureQueriesContext(connection) as captured:
+                compute_grades_for_course(course_key, offset, batch_size, min_id=min_id, max_id=max_id)
+
+            enrollment_queries = [
+                query['sql'] for query in captured.captured_queries if 'student_courseenrollment' in query['sql']
+            ]
+            self.assertEqual(len(enrollment_queries), 1)
+            self.assertIn('auth_user', enrollment_queries[0])
+            self.assertNotIn('OFFSET', enrollment_queries[0])
+            self.assertNotIn('LIMIT', enrollment_queries[0])
+
 
 class RecalculateGradesForUserTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
     """
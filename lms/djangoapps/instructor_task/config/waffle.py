@@ -13,6 +13,9 @@ WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 # Waffle switches
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = u'optimize_get_learners_for_course'
 GENERATE_GRADE_REPORT_VERIFIED_ONLY = u'generate_grade_report_for_verified_only'
+STREAM_GRADE_REPORTS = u'stream_grade_reports'
+PARALLEL_GRADE_REPORTS = u'parallel_grade_reports'
+BULK_MODULE_STATE_UPDATES = u'bulk_module_state_updates'
 
 
 def waffle_flags():
@@ -35,3 +38,27 @@ def generate_grade_report_for_verified_only():
     verified learners.
     """
     return WAFFLE_SWITCHES.is_enabled(GENERATE_GRADE_REPORT_VERIFIED_ONLY)
+
+
+def stream_grade_reports_switch_enabled():
+    """
+    Returns True if grade reports should be written batch by batch into a temporary file instead of
+    being compiled in memory.
+    """
+    return WAFFLE_SWITCHES.is_enabled(STREAM_GRADE_REPORTS)
+
+
+def parallel_grade_reports_switch_enabled():
+    """
+    Returns True if grade reports of large courses should be split into shards
+    of learners graded by separate celery subtasks.
+    """
+    return WAFFLE_SWITCHES.is_enabled(PARALLEL_GRADE_REPORTS)
+
+
+def bulk_module_state_updates_switch_enabled():
+    """
+    Returns True if the problem reset and delete tasks should update the StudentModules
+    in chunks of single statements instead of one by one.
+    """
+    return WAFFLE_SWITCHES.is_enabled(BULK_MODULE_STATE_UPDATES)
@@ -26,7 +26,7 @@ import six
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext as _
@@ -286,6 +286,26 @@ class DjangoStorageReportStore(ReportStore):
 
         self.storage.save(path, buff)
 
+    def store_file(self, course_id, filename, file_obj):
+        """
+        Store the utf-8 encoded contents of the binary `file_obj` without
+        reading it into memory first, see `ReportCSVWriter`.
+        """
+        path = self.path_to(course_id, filename)
+        self.storage.save(path, File(file_obj))
+
+    def open_file(self, course_id, filename):
+        """
+        Opens a stored file for binary reading.
+        """
+        return self.storage.open(self.path_to(course_id, filename), 'rb')
+
+    def delete_file(self, course_id, filename):
+        """
+        Deletes a stored file, e.g. the partial reports of a parallel grade report.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
+
     def store_rows(self, course_id, filename, rows):
         """
         Given a course_id, filename, and rows (each row is an iterable of
@@ -29,6 +29,7 @@ from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.config.waffle import bulk_module_state_updates_switch_enabled
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -37,7 +38,13 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv
 )
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses,
+    generate_grade_report_shard,
+    upload_merged_grade_report
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -45,8 +52,11 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_proctored_exam_results_report
 )
 from lms.djangoapps.instructor_task.tasks_helper.module_state import (
+    bulk_delete_problem_module_state,
+    bulk_reset_attempts_module_state,
     delete_problem_module_state,
     override_score_module_state,
+    perform_bulk_module_state_update,
     perform_module_state_update,
     rescore_problem_module_state,
     reset_attempts_module_state
@@ -113,8 +123,12 @@ def reset_problem_attempts(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('reset')
-    update_fcn = partial(reset_attempts_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    if bulk_module_state_updates_switch_enabled():
+        bulk_update_fcn = partial(bulk_reset_attempts_module_state, xmodule_instance_args)
+        visit_fcn = partial(perform_bulk_module_state_update, bulk_update_fcn)
+    else:
+        update_fcn = partial(reset_attempts_module_state, xmodule_instance_args)
+        visit_fcn = partial(perform_module_state_update, update_fcn, None)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -135,8 +149,12 @@ def delete_problem_state(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('deleted')
-    update_fcn = partial(delete_problem_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    if bulk_module_state_updates_switch_enabled():
+        bulk_update_fcn = partial(bulk_delete_problem_module_state, xmodule_instance_args)
+        visit_fcn = partial(perform_bulk_module_state_update, bulk_update_fcn)
+    else:
+        update_fcn = partial(delete_problem_module_state, xmodule_instance_args)
+        visit_fcn = partial(perform_module_state_update, update_fcn, None)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -206,6 +224,37 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grade_report_shard(entry_id, xmodule_instance_args, report_name, action_name, shard_id,
+                                 first_user_id, last_user_id):
+    """
+    Compute the rows of a range of learners of a grade report generated in
+    parallel, see the `instructor_task.parallel_grade_reports` waffle switch.
+
+    Progress is recorded in the subtasks of the `entry_id` InstructorTask.
+    """
+    TASK_LOG.info(
+        u"InstructorTask ID: %s, Grade report shard: %s, Learners: %s-%s",
+        entry_id, shard_id, first_user_id, last_user_id
+    )
+    return generate_grade_report_shard(
+        xmodule_instance_args, entry_id, report_name, action_name, shard_id, first_user_id, last_user_id
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def merge_grade_report_shards(_shard_statuses, entry_id, report_name, merge_id, shard_ids, success_headers,
+                              error_headers):
+    """
+    Chord callback merging the partial reports of the `calculate_grade_report_shard`
+    subtasks and completing the `entry_id` InstructorTask.
+
+    The shard statuses returned by the subtasks are ignored in favor of the ones
+    recorded in the InstructorTask, which are not lost if a subtask is redelivered.
+    """
+    upload_merged_grade_report(entry_id, report_name, merge_id, shard_ids, success_headers, error_headers)
+
+
 @task(base=BaseInstructorTask)
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -2,14 +2,19 @@
 Functionality for generating grade reports.
 """
 
+import json
 import logging
 import re
+import traceback
 from collections import OrderedDict, defaultdict
 from datetime import datetime
 from itertools import chain
 from time import time
+from uuid import uuid4
 
 import six
+from celery import chord
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from lazy import lazy
@@ -30,7 +35,17 @@ from lms.djangoapps.instructor_analytics.basic import list_problem_responses
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
     generate_grade_report_for_verified_only,
-    optimize_get_learners_switch_enabled
+    optimize_get_learners_switch_enabled,
+    parallel_grade_reports_switch_enabled,
+    stream_grade_reports_switch_enabled
+)
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException, GradeReportShardError
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    update_subtask_status
 )
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
@@ -40,12 +55,13 @@ from openedx.core.djangoapps.course_groups.cohorts import bulk_cache_cohorts, ge
 from openedx.core.djangoapps.user_api.course_tag.api import BulkCourseTags
 from student.models import CourseEnrollment
 from student.roles import BulkRoleCache
+from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import ReportCSVWriter, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -69,6 +85,53 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _write_batched_rows(context, batched_rows, success_writer, error_writer, error_headers=None):
+    """
+    Writes the (success_rows, error_rows) batches with the given ReportCSVWriters
+    as they are computed and updates the task progress after each batch.
+
+    The `error_headers`, if given, are written before the first error row.
+
+    Returns the (succeeded, failed) counts.
+    """
+    task_progress = context.task_progress
+    succeeded, failed = 0, 0
+    for success_rows, error_rows in batched_rows:
+        success_writer.write_rows(success_rows)
+        if error_rows:
+            if error_headers and not failed:
+                error_writer.write_rows([error_headers])
+            error_writer.write_rows(error_rows)
+
+        succeeded += len(success_rows)
+        failed += len(error_rows)
+        task_progress.succeeded = succeeded
+        task_progress.failed = failed
+        task_progress.attempted = task_progress.total = succeeded + failed
+        task_progress.update_task_state(extra_meta={'step': u'Streaming grades'})
+    return succeeded, failed
+
+
+def _stream_to_report_store(context, batched_rows, success_headers, error_headers, csv_name):
+    """
+    Writes the (success_rows, error_rows) batches to the report store as they are
+    computed, instead of compiling all the rows in memory, and updates the task
+    progress after each batch.
+
+    The error report is only uploaded if there are errors.
+    """
+    date = datetime.now(UTC)
+    with ReportCSVWriter(csv_name, context.course_id, date) as success_writer, \
+            ReportCSVWriter(csv_name + '_err', context.course_id, date) as error_writer:
+        success_writer.write_rows([success_headers])
+        _, failed = _write_batched_rows(context, batched_rows, success_writer, error_writer, error_headers)
+
+        context.update_status(u'Uploading grades')
+        success_writer.upload()
+        if failed:
+            error_writer.upload()
+
+
 class GradeReportBase(object):
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
@@ -144,6 +207,8 @@ class GradeReportBase(object):
             }
             if verified_only:
                 filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+            if context.user_id_range:
+                filter_kwargs['id__range'] = context.user_id_range
 
             user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
@@ -218,9 +283,13 @@ class _CourseGradeReportContext(object):
             course_id=course_id,
             task_input=_task_input,
         )
+        self.xmodule_instance_args = _xmodule_instance_args
+        self.entry_id = _entry_id
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
+        # [first_user_id, last_user_id] of the learners of a parallel grade report shard
+        self.user_id_range = None
 
     @lazy
     def course(self):
@@ -308,6 +377,7 @@ class _ProblemGradeReportContext(object):
             task_input=_task_input,
         )
         self.task_id = task_id
+        self.xmodule_instance_args = _xmodule_instance_args
         self.entry_id = _entry_id
         self.task_input = _task_input
         self.action_name = action_name
@@ -315,6 +385,8 @@ class _ProblemGradeReportContext(object):
         self.report_for_verified_only = generate_grade_report_for_verified_only()
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
         self.file_name = 'problem_grade_report'
+        # [first_user_id, last_user_id] of the learners of a parallel grade report shard
+        self.user_id_range = None
 
     @lazy
     def course(self):
@@ -421,8 +493,22 @@ class CourseGradeReport(object):
         context.update_status(u'Starting grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
+
+        if parallel_grade_reports_switch_enabled():
+            user_id_shards, num_users = _get_user_id_shards(
+                context.course_id, generate_grade_report_for_verified_only(),
+            )
+            if len(user_id_shards) > 1:
+                return _queue_grade_report_shards(
+                    context, 'grade_report', user_id_shards, num_users, success_headers, error_headers,
+                )
+
         batched_rows = self._batched_rows(context)
 
+        if stream_grade_reports_switch_enabled():
+            _stream_to_report_store(context, batched_rows, success_headers, error_headers, 'grade_report')
+            return context.update_status(u'Completed grades')
+
         context.update_status(u'Compiling grades')
         success_rows, error_rows = self._compile(context, batched_rows)
 
@@ -515,7 +601,11 @@ class CourseGradeReport(object):
                 course_id (CourseLocator): course_id to return enrollees for.
                 verified_only (boolean): is a boolean when True, returns only verified enrollees.
             """
-            if optimize_get_learners_switch_enabled():
+            if (
+                optimize_get_learners_switch_enabled() or
+                stream_grade_reports_switch_enabled() or
+                context.user_id_range
+            ):
                 TASK_LOG.info(u'%s, Creating Course Grade with optimization', task_log_message)
                 return users_for_course_v2(course_id, verified_only=verified_only)
 
@@ -548,6 +638,8 @@ class CourseGradeReport(object):
             }
             if verified_only:
                 filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+            if context.user_id_range:
+                filter_kwargs['id__range'] = context.user_id_range
 
             user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
@@ -728,8 +820,20 @@ class ProblemGradeReport(GradeReportBase):
         context.update_status('ProblemGradeReport - 1: Starting problem grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
+
+        if parallel_grade_reports_switch_enabled():
+            user_id_shards, num_users = _get_user_id_shards(context.course_id, context.report_for_verified_only)
+            if len(user_id_shards) > 1:
+                return _queue_grade_report_shards(
+                    context, context.file_name, user_id_shards, num_users, success_headers, error_headers,
+                )
+
         batched_rows = self._batched_rows(context)
 
+        if stream_grade_reports_switch_enabled():
+            _stream_to_report_store(context, batched_rows, success_headers, error_headers, context.file_name)
+            return context.update_status('ProblemGradeReport - 4: Completed problem grades')
+
         context.update_status('ProblemGradeReport - 2: Compiling grades')
         success_rows, error_rows = self._compile(context, batched_rows)
         context.update_status('ProblemGradeReport - 3: Uploading grades')
@@ -977,3 +1081,217 @@ class ProblemResponses(object):
         current_step = {'step': 'CSV uploaded', 'report_name': report_name}
 
         return task_progress.update_task_state(extra_meta=current_step)
+
+
+# Report and context classes of the grade reports which can be generated in parallel, by report name.
+_PARALLEL_GRADE_REPORTS = {
+    'grade_report': (CourseGradeReport, _CourseGradeReportContext),
+    'problem_grade_report': (ProblemGradeReport, _ProblemGradeReportContext),
+}
+
+
+def _get_user_id_shards(course_id, verified_only):
+    """
+    Splits the ids of the learners enrolled in the course into consecutive
+    [first_user_id, last_user_id] ranges of `GRADE_REPORT_USERS_PER_SHARD` learners.
+
+    Returns the (user_id_shards, num_users) tuple.
+    """
+    filter_kwargs = {
+        'courseenrollment__course_id': course_id,
+    }
+    if verified_only:
+        filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+
+    user_ids = list(get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id'))
+    users_per_shard = settings.GRADE_REPORT_USERS_PER_SHARD
+    user_id_shards = [
+        [user_ids[index], user_ids[min(index + users_per_shard, len(user_ids)) - 1]]
+        for index in range(0, len(user_ids), users_per_shard)
+    ]
+    return user_id_shards, len(user_ids)
+
+
+def _partial_report_name(report_name, entry_id, shard_id, is_error=False):
+    """
+    Returns the name of the partial report of a shard. The partial reports are
+    stored in a sub-directory so that they are not listed as downloadable reports.
+    """
+    return u'{report_name}_shards_{entry_id}/{shard_id}{suffix}.csv'.format(
+        report_name=report_name,
+        entry_id=entry_id,
+        shard_id=shard_id,
+        suffix='_err' if is_error else '',
+    )
+
+
+def _get_recorded_subtask_status(entry_id, subtask_id):
+    """
+    Returns the status of the subtask recorded in the InstructorTask as a
+    dict, or None if the InstructorTask doesn't know about the subtask.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if not entry.subtasks:
+        return None
+    return json.loads(entry.subtasks)['status'].get(subtask_id)
+
+
+def _queue_grade_report_shards(context, report_name, user_id_shards, num_users, success_headers, error_headers):
+    """
+    Fans out the grade report to one `calculate_grade_report_shard` subtask per
+    range of learners, with a `merge_grade_report_shards` chord callback to
+    merge the partial reports.
+
+    The shards and the callback are tracked as subtasks of the InstructorTask,
+    which is only marked as succeeded once the merged report is uploaded.
+    """
+    # Local import to avoid circular imports, the tasks module imports the report classes.
+    from lms.djangoapps.instructor_task.tasks import calculate_grade_report_shard, merge_grade_report_shards
+
+    shard_ids = [str(uuid4()) for _ in user_id_shards]
+    merge_id = str(uuid4())
+    with outer_atomic():
+        entry = InstructorTask.objects.get(pk=context.entry_id)
+        progress = initialize_subtask_info(entry, context.action_name, num_users, shard_ids + [merge_id])
+
+    TASK_LOG.info(
+        u'%s, Task type: %s, Queueing %s grade report shards for %s learners',
+        context.task_info_string, context.action_name, len(shard_ids), num_users,
+    )
+    routing_key = settings.GRADES_DOWNLOAD_ROUTING_KEY
+    shards = [
+        calculate_grade_report_shard.subtask(
+            (context.entry_id, context.xmodule_instance_args, report_name, context.action_name, shard_id,
+             first_user_id, last_user_id),
+            task_id=shard_id,
+            routing_key=routing_key,
+        )
+        for shard_id, (first_user_id, last_user_id) in zip(shard_ids, user_id_shards)
+    ]
+    callback = merge_grade_report_shards.subtask(
+        (context.entry_id, report_name, merge_id, shard_ids, success_headers, error_headers),
+        task_id=merge_id,
+        routing_key=routing_key,
+    )
+    chord(shards)(callback)
+    return progress
+
+
+def generate_grade_report_shard(xmodule_instance_args, entry_id, report_name, action_name, shard_id,
+                                first_user_id, last_user_id):
+    """
+    Computes the grade report rows of the learners with ids in
+    [first_user_id, last_user_id] and stores them as partial reports, without
+    headers, to be merged by `upload_merged_grade_report`.
+
+    Unexpected errors are recorded in the shard status instead of being raised,
+    so that the chord callback still runs and fails the whole report. A
+    redelivered shard which already ran, or is running, is skipped.
+
+    Returns the status of the shard as a dict.
+    """
+    subtask_status = SubtaskStatus.create(shard_id)
+    try:
+        check_subtask_is_valid(entry_id, shard_id, subtask_status)
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        report_class, context_class = _PARALLEL_GRADE_REPORTS[report_name]
+        with modulestore().bulk_operations(course_id):
+            context = context_class(
+                xmodule_instance_args, entry_id, course_id, json.loads(entry.task_input), action_name,
+            )
+            context.user_id_range = [first_user_id, last_user_id]
+            batched_rows = report_class()._batched_rows(context)  # pylint: disable=protected-access
+
+            with ReportCSVWriter(
+                report_name, course_id, None, report_name=_partial_report_name(report_name, entry_id, shard_id),
+            ) as success_writer, ReportCSVWriter(
+                report_name, course_id, None, report_name=_partial_report_name(report_name, entry_id, shard_id, True),
+            ) as error_writer:
+                succeeded, failed = _write_batched_rows(context, batched_rows, success_writer, error_writer)
+                success_writer.upload(emit_event=False)
+                if failed:
+                    error_writer.upload(emit_event=False)
+    except DuplicateTaskException:
+        TASK_LOG.warning(u'Skipping duplicate grade report shard %s of InstructorTask %s', shard_id, entry_id)
+        return _get_recorded_subtask_status(entry_id, shard_id)
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u'Grade report shard %s of InstructorTask %s failed', shard_id, entry_id)
+        subtask_status.increment(state=FAILURE)
+    else:
+        subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+
+    update_subtask_status(entry_id, shard_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def upload_merged_grade_report(entry_id, report_name, merge_id, shard_ids, success_headers, error_headers):
+    """
+    Concatenates the partial reports of the shards, in the order of their
+    learner ranges, into the final reports and completes the InstructorTask.
+
+    The InstructorTask is marked as failed if any of the shards failed. A
+    redelivered merge which already ran, or is running, is skipped.
+
+    Returns the status of the merge as a dict.
+    """
+    merge_status = SubtaskStatus.create(merge_id)
+    shard_statuses = []
+    try:
+        check_subtask_is_valid(entry_id, merge_id, merge_status)
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        subtask_status_info = json.loads(entry.subtasks)['status']
+        shard_statuses = [SubtaskStatus.from_dict(subtask_status_info[shard_id]) for shard_id in shard_ids]
+
+        failed_shard_ids = [shard_status.task_id for shard_status in shard_statuses if shard_status.state != SUCCESS]
+        if failed_shard_ids:
+            raise GradeReportShardError(u'{} of the {} grade report shards failed: {}'.format(
+                len(failed_shard_ids), len(shard_ids), u', '.join(failed_shard_ids),
+            ))
+
+        date = datetime.now(UTC)
+        with ReportCSVWriter(report_name, course_id, date) as success_writer, \
+                ReportCSVWriter(report_name + '_err', course_id, date) as error_writer:
+            success_writer.write_rows([success_headers])
+            error_writer.write_rows([error_headers])
+            for shard_status in shard_statuses:
+                partial_report_name = _partial_report_name(report_name, entry_id, shard_status.task_id)
+                with report_store.open_file(course_id, partial_report_name) as partial_report:
+                    success_writer.write_file(partial_report)
+                if shard_status.failed:
+                    partial_report_name = _partial_report_name(report_name, entry_id, shard_status.task_id, True)
+                    with report_store.open_file(course_id, partial_report_name) as partial_report:
+                        error_writer.write_file(partial_report)
+
+            success_writer.upload()
+            if any(shard_status.failed for shard_status in shard_statuses):
+                error_writer.upload()
+    except DuplicateTaskException:
+        TASK_LOG.warning(u'Skipping duplicate merge of the grade report shards of InstructorTask %s', entry_id)
+        return _get_recorded_subtask_status(entry_id, merge_id)
+    except Exception as exc:
+        TASK_LOG.exception(u'Merging the grade report shards of InstructorTask %s failed', entry_id)
+        merge_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, merge_id, merge_status)
+        # Marking the last subtask as done sets the InstructorTask state to SUCCESS, so override it.
+        with outer_atomic():
+            entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+        raise
+    else:
+        merge_status.increment(state=SUCCESS)
+        update_subtask_status(entry_id, merge_id, merge_status)
+    finally:
+        for shard_status in shard_statuses:
+            if shard_status.state == SUCCESS:
+                report_store.delete_file(course_id, _partial_report_name(report_name, entry_id, shard_status.task_id))
+                if shard_status.failed:
+                    report_store.delete_file(
+                        course_id, _partial_report_name(report_name, entry_id, shard_status.task_id, True),
+                    )
+
+    return merge_status.to_dict()
@@ -5,21 +5,29 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from collections import defaultdict
+from datetime import datetime
 from time import time
 
 import six
+from django.conf import settings
 from django.utils.translation import ugettext_noop
 from opaque_keys.edx.keys import UsageKey
+from pytz import UTC
 from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
 from tahoe_sites.api import get_organization_by_course
 
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
+from coursewarehistoryextended.models import StudentModuleHistoryExtended
 from lms.djangoapps.courseware.courses import get_course_by_id, get_problems_in_section
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.models import StudentModule, StudentModuleHistory
 from lms.djangoapps.courseware.module_render import get_module_for_descriptor_internal
+from lms.djangoapps.grades.api import constants as grades_constants
 from lms.djangoapps.grades.api import events as grades_events
+from lms.djangoapps.grades.api import signals as grades_signals
+from lms.djangoapps.grades.api import task_recalculate_course_and_subsection_grades_for_user
 from student.models import get_user_by_username_or_email
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from track.views import task_track
@@ -62,11 +70,77 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
+    student_identifier = task_input.get('student')
+    override_score_task = action_name == ugettext_noop('overridden')
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
+
+    modules_to_update = _get_modules_to_update(
+        course_id, usage_keys, student_identifier, filter_fcn, override_score_task
+    )
+
+    task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
+    task_progress.update_task_state()
+
+    for module_to_update in modules_to_update:
+        task_progress.attempted += 1
+        module_descriptor = problems[six.text_type(module_to_update.module_state_key)]
+        # There is no try here:  if there's an error, we let it throw, and the task will
+        # be marked as FAILED, with a stack trace.
+        update_status = update_fcn(module_descriptor, module_to_update, task_input)
+        _record_update_status(task_progress, update_status)
+
+    return task_progress.update_task_state()
+
+
+def perform_bulk_module_state_update(bulk_update_fcn, _entry_id, course_id, task_input, action_name):
+    """
+    Performs generic update by visiting StudentModule instances in chunks with the bulk_update_fcn provided.
+
+    The student modules are fetched in chunks of BULK_MODULE_STATE_UPDATE_CHUNK_SIZE, in the order of
+    their ids, and the `bulk_update_fcn` is called once per chunk.  It is passed three arguments:  the
+    dict of the problem descriptors by the string of their usage keys, the list of StudentModules in
+    the chunk, and the task_input being passed through.  It returns the list of the update statuses of
+    the StudentModules of the chunk, in the same order.
+
+    The task progress is updated after each chunk.  Each chunk is fetched after the last id of the
+    previous one, so the rows deleted by the `bulk_update_fcn` do not shift the following chunks, and
+    a retried task only finds the StudentModules that are left to update.
+
+    The return value is the same dict of results as `perform_module_state_update`.
+    """
+    start_time = time()
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
+
+    modules_to_update = _get_modules_to_update(course_id, usage_keys, task_input.get('student'), None)
+
+    task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
+    task_progress.update_task_state()
+
+    chunk_size = settings.BULK_MODULE_STATE_UPDATE_CHUNK_SIZE
+    modules_to_update = modules_to_update.select_related('student').order_by('id')
+    last_module_id = 0
+    while True:
+        chunk = list(modules_to_update.filter(id__gt=last_module_id)[:chunk_size])
+        if not chunk:
+            break
+        last_module_id = chunk[-1].id
+
+        for update_status in bulk_update_fcn(problems, chunk, task_input):
+            task_progress.attempted += 1
+            _record_update_status(task_progress, update_status)
+        task_progress.update_task_state()
+
+    return task_progress.update_task_state()
+
+
+def _get_problems_to_update(course_id, task_input):
+    """
+    Returns the list of the usage keys of the problems to update for the given `task_input`,
+    and the dict of their descriptors by the string of their usage keys.
+    """
     usage_keys = []
     problem_url = task_input.get('problem_url')
     entrance_exam_url = task_input.get('entrance_exam_url')
-    student_identifier = task_input.get('student')
-    override_score_task = action_name == ugettext_noop('overridden')
     problems = {}
 
     # if problem_url is present make a usage key from it
@@ -83,31 +157,23 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
         problems = get_problems_in_section(entrance_exam_url)
         usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
 
-    modules_to_update = _get_modules_to_update(
-        course_id, usage_keys, student_identifier, filter_fcn, override_score_task
-    )
-
-    task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
-    task_progress.update_task_state()
+    return usage_keys, problems
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[six.text_type(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        update_status = update_fcn(module_descriptor, module_to_update, task_input)
-        if update_status == UPDATE_STATUS_SUCCEEDED:
-            # If the update_fcn returns true, then it performed some kind of work.
-            # Logging of failures is left to the update_fcn itself.
-            task_progress.succeeded += 1
-        elif update_status == UPDATE_STATUS_FAILED:
-            task_progress.failed += 1
-        elif update_status == UPDATE_STATUS_SKIPPED:
-            task_progress.skipped += 1
-        else:
-            raise UpdateProblemModuleStateError(u"Unexpected update_status returned: {}".format(update_status))
 
-    return task_progress.update_task_state()
+def _record_update_status(task_progress, update_status):
+    """
+    Counts the `update_status` returned by an update function in the given `task_progress`.
+    """
+    if update_status == UPDATE_STATUS_SUCCEEDED:
+        # If the update_fcn returns true, then it performed some kind of work.
+        # Logging of failures is left to the update_fcn itself.
+        task_progress.succeeded += 1
+    elif update_status == UPDATE_STATUS_FAILED:
+        task_progress.failed += 1
+    elif update_status == UPDATE_STATUS_SKIPPED:
+        task_progress.skipped += 1
+    else:
+        raise UpdateProblemModuleStateError(u"Unexpected update_status returned: {}".format(update_status))
 
 
 @outer_atomic
@@ -319,6 +385,133 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     return UPDATE_STATUS_SUCCEEDED
 
 
+def bulk_reset_attempts_module_state(xmodule_instance_args, _problems, student_modules, _task_input):
+    """
+    Resets problem attempts to zero for the specified `student_modules` with a single UPDATE statement.
+
+    Returns the list of the statuses reset_attempts_module_state would have returned for each of the
+    `student_modules`.
+    """
+    update_statuses = []
+    reset_modules = []
+    old_numbers_of_attempts = []
+    modified_field = StudentModule._meta.get_field('modified')  # pylint: disable=protected-access
+    for student_module in student_modules:
+        problem_state = json.loads(student_module.state) if student_module.state else {}
+        if problem_state.get('attempts', 0) > 0:
+            old_numbers_of_attempts.append(problem_state['attempts'])
+            problem_state['attempts'] = 0
+            student_module.state = json.dumps(problem_state)
+            # set the modified time as save() would have
+            modified_field.pre_save(student_module, add=False)
+            reset_modules.append(student_module)
+            update_statuses.append(UPDATE_STATUS_SUCCEEDED)
+        else:
+            update_statuses.append(UPDATE_STATUS_SKIPPED)
+
+    with outer_atomic():
+        StudentModule.objects.bulk_update(reset_modules, ['state', 'modified'])
+        _save_history_in_bulk(reset_modules)
+
+    for student_module, old_number_of_attempts in zip(reset_modules, old_numbers_of_attempts):
+        track_function = _get_track_function_for_task(student_module.student, xmodule_instance_args)
+        event_info = {"old_attempts": old_number_of_attempts, "new_attempts": 0}
+        track_function('problem_reset_attempts', event_info)
+
+    return update_statuses
+
+
+def bulk_delete_problem_module_state(xmodule_instance_args, problems, student_modules, _task_input):
+    """
+    Delete the specified StudentModule entries with a single DELETE statement.
+
+    Sends a single grade recalculation signal for each learner whose scores were deleted.
+
+    Always returns UPDATE_STATUS_SUCCEEDED for each of the `student_modules`, if it doesn't raise
+    an exception due to database error.
+    """
+    with outer_atomic():
+        StudentModule.objects.filter(id__in=[student_module.id for student_module in student_modules]).delete()
+
+    for student_module in student_modules:
+        track_function = _get_track_function_for_task(student_module.student, xmodule_instance_args)
+        track_function('problem_delete_state', {})
+
+    _fire_scores_deleted(problems, student_modules)
+    return [UPDATE_STATUS_SUCCEEDED] * len(student_modules)
+
+
+def _save_history_in_bulk(student_modules):
+    """
+    Creates the history entries of the updated `student_modules`, which the post_save receivers
+    of StudentModule would have created one by one.
+    """
+    history_models = [StudentModuleHistoryExtended]
+    if not settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
+        history_models.append(StudentModuleHistory)
+
+    for history_model in history_models:
+        history_model.objects.bulk_create([
+            history_model(
+                student_module=student_module,
+                version=None,
+                created=student_module.modified,
+                state=student_module.state,
+                grade=student_module.grade,
+                max_grade=student_module.max_grade,
+            )
+            for student_module in student_modules
+            if student_module.module_type in history_model.HISTORY_SAVING_TYPES
+        ])
+
+
+def _fire_scores_deleted(problems, student_modules):
+    """
+    Sends a single grade recalculation signal for each learner of the deleted `student_modules`.
+
+    A learner with a single deleted problem gets the PROBLEM_RAW_SCORE_CHANGED signal of the deleted
+    score, which updates the grades of the subsections containing it.  A learner with several
+    deleted problems, as in an entrance exam, gets all their grades recalculated at once.
+    """
+    deleted_modules_by_user = defaultdict(list)
+    for student_module in student_modules:
+        if problems[six.text_type(student_module.module_state_key)].has_score:
+            deleted_modules_by_user[student_module.student_id].append(student_module)
+    if not deleted_modules_by_user:
+        return
+
+    create_new_event_transaction_id()
+    set_event_transaction_type(grades_events.STATE_DELETED_EVENT_TYPE)
+    modified = datetime.now(UTC)
+    max_scores = {}
+    for user_id, deleted_modules in six.iteritems(deleted_modules_by_user):
+        course_id = six.text_type(deleted_modules[0].course_id)
+        if len(deleted_modules) > 1:
+            task_recalculate_course_and_subsection_grades_for_user.apply_async(
+                kwargs=dict(user_id=user_id, course_key=course_id),
+            )
+            continue
+
+        usage_id = six.text_type(deleted_modules[0].module_state_key)
+        problem = problems[usage_id]
+        if usage_id not in max_scores:
+            max_scores[usage_id] = problem.max_score()
+        if max_scores[usage_id] is not None:
+            grades_signals.PROBLEM_RAW_SCORE_CHANGED.send(
+                sender=None,
+                raw_earned=0,
+                raw_possible=max_scores[usage_id],
+                weight=getattr(problem, 'weight', None),
+                user_id=user_id,
+                course_id=course_id,
+                usage_id=usage_id,
+                score_deleted=True,
+                only_if_higher=False,
+                modified=modified,
+                score_db_table=grades_constants.ScoreDatabaseTableEnum.courseware_student_module,
+            )
+
+
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
                                   grade_bucket_type=None, course=None):
     """
@@ -3,6 +3,11 @@ Utility methods for instructor tasks
 """
 
 
+import csv
+import shutil
+import tempfile
+
+import six
 from eventtracking import tracker
 
 from lms.djangoapps.instructor_task.models import ReportStore
@@ -37,15 +42,82 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         report_name: string - Name of the generated report
     """
     report_store = ReportStore.from_config(config_name)
-    report_name = u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+    report_name = get_report_name(csv_name, course_id, timestamp)
+
+    report_store.store_rows(course_id, report_name, rows)
+    tracker_emit(csv_name)
+    return report_name
+
+
+def get_report_name(csv_name, course_id, timestamp):
+    """
+    Returns the file name of a CSV report.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
         course_prefix=course_filename_prefix_generator(course_id),
         csv_name=csv_name,
         timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
     )
 
-    report_store.store_rows(course_id, report_name, rows)
-    tracker_emit(csv_name)
-    return report_name
+
+class ReportCSVWriter(object):
+    """
+    Writes a CSV report batch by batch into a spooled temporary file and uploads it
+    using ReportStore.
+
+    The file is moved to disk once it grows over `SPOOL_MAX_SIZE` bytes, so the memory
+    used doesn't depend on the number of rows. Use as a context manager to always
+    delete the temporary file.
+    """
+    SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD', report_name=None):
+        self.csv_name = csv_name
+        self.course_id = course_id
+        self.config_name = config_name
+        self.report_name = report_name or get_report_name(csv_name, course_id, timestamp)
+        self.rows_count = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_rows(self, rows):
+        """
+        Appends the given rows (each row is an iterable of values) to the CSV.
+        """
+        output_buffer = six.StringIO()
+        csvwriter = csv.writer(output_buffer)
+        for row in rows:
+            csvwriter.writerow([six.text_type(item) for item in row])
+            self.rows_count += 1
+        self._file.write(output_buffer.getvalue().encode('utf-8'))
+
+    def write_file(self, file_obj):
+        """
+        Appends the contents of a binary file written by another ReportCSVWriter.
+        """
+        shutil.copyfileobj(file_obj, self._file)
+
+    def upload(self, emit_event=True):
+        """
+        Uploads the CSV to the report store. The 'report.requested' event is
+        not emitted for partial reports when `emit_event` is False.
+
+        Returns:
+            report_name: string - Name of the uploaded report
+        """
+        self._file.seek(0)
+        ReportStore.from_config(self.config_name).store_file(self.course_id, self.report_name, self._file)
+        if emit_event:
+            tracker_emit(self.csv_name)
+        return self.report_name
+
+    def close(self):
+        self._file.close()
 
 
 def tracker_emit(report_name):
@@ -12,14 +12,18 @@ from uuid import uuid4
 
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_noop
 from mock import MagicMock, Mock, patch
 from opaque_keys.edx.keys import i4xEncoder
 from six.moves import range
+from waffle.testutils import override_switch
 
 from course_modes.models import CourseMode
+from coursewarehistoryextended.models import StudentModuleHistoryExtended
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
+from lms.djangoapps.instructor_task.config.waffle import BULK_MODULE_STATE_UPDATES
 from lms.djangoapps.instructor_task.exceptions import UpdateProblemModuleStateError
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.tasks import (
@@ -36,6 +40,7 @@ from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskModuleT
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 PROBLEM_URL_NAME = "test_urlname"
+SWITCH_BULK_MODULE_STATE_UPDATES = '.'.join(['instructor_task', BULK_MODULE_STATE_UPDATES])
 
 
 class TestTaskFailure(Exception):
@@ -633,6 +638,54 @@ class TestDeleteStateInstructorTask(TestInstructorTasks):
                                           module_state_key=self.location)
 
 
+@override_switch(SWITCH_BULK_MODULE_STATE_UPDATES, True)
+@override_settings(BULK_MODULE_STATE_UPDATE_CHUNK_SIZE=4)
+class TestBulkModuleStateInstructorTasks(TestInstructorTasks):
+    """Tests the bulk mode of the instructor tasks that reset attempts and delete problem state."""
+
+    def test_reset_with_some_state(self):
+        num_students = 10
+        students = self._create_students_with_state(num_students, json.dumps({'attempts': 3}))
+        StudentModule.objects.filter(student=students[0]).update(state=json.dumps({'attempts': 0}))
+
+        self._test_run_with_task(reset_problem_attempts, 'reset', num_students - 1, expected_num_skipped=1)
+        self._assert_num_attempts(students, 0)
+        # one progress update before the first chunk, one after each of the 3 chunks, and the final one
+        self.assertEqual(self.current_task.update_state.call_count, 5)
+
+    def test_reset_saves_history(self):
+        students = self._create_students_with_state(5, json.dumps({'attempts': 3}))
+        module_ids = list(StudentModule.objects.filter(student__in=students).values_list('id', flat=True))
+        history_entries = StudentModuleHistoryExtended.objects.filter(student_module__in=module_ids)
+        num_history_entries = history_entries.count()
+
+        self._test_run_with_task(reset_problem_attempts, 'reset', 5)
+        self.assertEqual(history_entries.count(), num_history_entries + 5)
+        self.assertEqual(
+            [json.loads(entry.state)['attempts'] for entry in history_entries.order_by('-id')[:5]],
+            [0] * 5,
+        )
+
+    def test_delete_with_some_state(self):
+        num_students = 10
+        students = self._create_students_with_state(num_students)
+
+        with patch('lms.djangoapps.grades.signals.signals.PROBLEM_RAW_SCORE_CHANGED.send') as mock_send:
+            self._test_run_with_task(delete_problem_state, 'deleted', num_students)
+
+        self.assertFalse(StudentModule.objects.filter(student__in=students).exists())
+        self.assertEqual(
+            sorted(call[1]['user_id'] for call in mock_send.call_args_list),
+            sorted(student.id for student in students),
+        )
+        for call in mock_send.call_args_list:
+            self.assertTrue(call[1]['score_deleted'])
+            self.assertEqual(call[1]['raw_earned'], 0)
+
+    def test_delete_with_no_state(self):
+        self._test_run_with_no_state(delete_problem_state, 'deleted')
+
+
 class TestCertificateGenerationnstructorTask(TestInstructorTasks):
     """Tests instructor task that generates student certificates."""
 
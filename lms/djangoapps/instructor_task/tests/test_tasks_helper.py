@@ -9,6 +9,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -17,6 +18,7 @@ from datetime import datetime, timedelta
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -53,13 +55,15 @@ from lms.djangoapps.instructor_task.tasks_helper.grades import (
     NOT_ENROLLED_IN_COURSE,
     CourseGradeReport,
     ProblemGradeReport,
-    ProblemResponses
+    ProblemResponses,
+    generate_grade_report_shard
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -90,8 +94,8 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ..config.waffle import GENERATE_GRADE_REPORT_VERIFIED_ONLY
-from ..models import ReportStore
+from ..config.waffle import GENERATE_GRADE_REPORT_VERIFIED_ONLY, PARALLEL_GRADE_REPORTS, STREAM_GRADE_REPORTS
+from ..models import InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 _TEAMS_CONFIG = TeamsConfig({
@@ -99,6 +103,8 @@ _TEAMS_CONFIG = TeamsConfig({
     'topics': [{'id': 'topic', 'name': 'Topic', 'description': 'A Topic'}],
 })
 SWITCH_GENERATE_GRADE_REPORT_VERIFIED_ONLY = '.'.join(['instructor_task', GENERATE_GRADE_REPORT_VERIFIED_ONLY])
+SWITCH_STREAM_GRADE_REPORTS = '.'.join(['instructor_task', STREAM_GRADE_REPORTS])
+SWITCH_PARALLEL_GRADE_REPORTS = '.'.join(['instructor_task', PARALLEL_GRADE_REPORTS])
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -164,6 +170,135 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @override_switch(SWITCH_STREAM_GRADE_REPORTS, True)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.iter')
+    def test_streaming_grading_failure(self, mock_grades_iter, _mock_current_task):
+        """
+        Test that grading errors are reported when the grade report is streamed.
+        """
+        mock_grades_iter.return_value = [
+            (self.create_student('username', 'student@example.com'), None, TypeError('Cannot grade student'))
+        ]
+        result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 0, 'failed': 1}, result)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
+
+    @override_switch(SWITCH_STREAM_GRADE_REPORTS, True)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport.USER_BATCH_SIZE', 2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.utils.ReportCSVWriter.SPOOL_MAX_SIZE', 10)
+    def test_streaming_in_batches(self):
+        """
+        Test that all the batches are written to the report and the progress is
+        updated after each batch, even once the report is spooled to disk.
+        """
+        students = [self.create_student(u'student{}'.format(i)) for i in range(5)]
+
+        self.current_task = Mock()  # pylint: disable=attribute-defined-outside-init
+        self.current_task.update_state = Mock()
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task') as mock_current_task:
+            mock_current_task.return_value = self.current_task
+            result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+        streaming_updates = [
+            call_args for call_args in self.current_task.update_state.call_args_list
+            if call_args[1]['meta'].get('step') == u'Streaming grades'
+        ]
+        self.assertEqual(len(streaming_updates), 3)
+        self.verify_rows_in_csv(
+            [{u'Student ID': text_type(student.id), u'Username': student.username} for student in students],
+            verify_order=False,
+            ignore_other_columns=True,
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertFalse(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
+
+    @override_switch(SWITCH_PARALLEL_GRADE_REPORTS, True)
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_parallel_grade_report(self, _mock_current_task):
+        """
+        Test that the learners are graded in shards and that the partial reports
+        are merged into a single report.
+        """
+        students = [self.create_student(u'student{}'.format(i)) for i in range(5)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+
+        CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output)
+        )
+        # Three shards of learners and the merge callback
+        self.assertEqual(json.loads(entry.subtasks)['total'], 4)
+        self.verify_rows_in_csv(
+            [{u'Student ID': text_type(student.id), u'Username': student.username} for student in students],
+            verify_order=False,
+            ignore_other_columns=True,
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1, 'The partial reports should be removed')
+
+    @override_switch(SWITCH_PARALLEL_GRADE_REPORTS, True)
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_parallel_grade_report_duplicate_shard(self, _mock_current_task):
+        """
+        Test that a redelivered shard is skipped and doesn't prevent the
+        partial reports from being merged.
+        """
+        students = [self.create_student(u'student{}'.format(i)) for i in range(3)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+        duplicate_statuses = []
+
+        def run_shard_twice(*args):
+            generate_grade_report_shard(*args)
+            duplicate_statuses.append(generate_grade_report_shard(*args))
+            return duplicate_statuses[-1]
+
+        with patch('lms.djangoapps.instructor_task.tasks.generate_grade_report_shard', side_effect=run_shard_twice):
+            CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual([status['state'] for status in duplicate_statuses], [SUCCESS, SUCCESS])
+        self.assertDictContainsSubset(
+            {'attempted': 3, 'succeeded': 3, 'failed': 0, 'total': 3}, json.loads(entry.task_output)
+        )
+        self.verify_rows_in_csv(
+            [{u'Student ID': text_type(student.id), u'Username': student.username} for student in students],
+            verify_order=False,
+            ignore_other_columns=True,
+        )
+
+    @override_switch(SWITCH_PARALLEL_GRADE_REPORTS, True)
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport._rows_for_users')
+    def test_parallel_grade_report_shard_failure(self, mock_rows_for_users, _mock_current_task):
+        """
+        Test that the InstructorTask fails if a shard fails unexpectedly.
+        """
+        for i in range(3):
+            self.create_student(u'student{}'.format(i))
+        mock_rows_for_users.side_effect = [([], []), Exception('Database is down')]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course')
+
+        CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'GradeReportShardError')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -904,6 +1039,25 @@ class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             )))
         ])
 
+    @override_switch(SWITCH_STREAM_GRADE_REPORTS, True)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_no_problems_streaming(self, _get_current_task):
+        """
+        Verify that the streamed problem grade report matches the compiled one.
+        """
+        result = ProblemGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'action_name': 'graded', 'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+        self.verify_rows_in_csv([
+            dict(list(zip(
+                self.csv_header_row,
+                [text_type(self.student_1.id), self.student_1.email, self.student_1.username, ENROLLED_IN_COURSE, '0.0']
+            ))),
+            dict(list(zip(
+                self.csv_header_row,
+                [text_type(self.student_2.id), self.student_2.email, self.student_2.username, ENROLLED_IN_COURSE, '0.0']
+            )))
+        ])
+
     @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
     def test_single_problem(self, _get_current_task):
         vertical = ItemFactory.create(
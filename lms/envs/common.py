@@ -1055,6 +1055,17 @@ CONTENTSTORE = {
     'DOC_STORE_CONFIG': DOC_STORE_CONFIG
 }
 
+# Size of the chunks in which the StaticContentServer middleware streams the assets
+# read from the contentstore, so that the whole asset is never buffered in the worker.
+CONTENTSERVER_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Per-node disk cache of the course assets too large for the "course_assets" cache,
+# with least recently used eviction over MAX_SIZE bytes. Disabled when DIRECTORY is None.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 MODULESTORE = {
     'default': {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
@@ -2204,6 +2215,19 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total number of blocks of the collected block structures kept
+    # in memory by each process, 0 to disable the in-process cache.
+    IN_PROCESS_CACHE_MAX_BLOCKS=0,
+
+    # Seconds after which the lock taken while collecting a block structure
+    # expires, and seconds that other requests wait for that collection to
+    # finish before collecting it themselves. The lock timeout should exceed
+    # the slowest collection, an expired lock lets another process collect
+    # concurrently. Only used when the single_flight_collection waffle switch
+    # is enabled.
+    COLLECT_LOCK_TIMEOUT=300,
+    COLLECT_WAIT_TIMEOUT=10,
 )
 
 ################################ Bulk Email ###################################
@@ -2871,6 +2895,14 @@ RECALCULATE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
 
 SOFTWARE_SECURE_VERIFICATION_ROUTING_KEY = 'edx.lms.core.default'
 
+# Number of learners graded by each subtask when the `instructor_task.parallel_grade_reports`
+# waffle switch is enabled. Courses with fewer learners are graded in a single task.
+GRADE_REPORT_USERS_PER_SHARD = 2000
+
+# Number of StudentModules reset or deleted by each statement of the problem reset and delete
+# instructor tasks when the `instructor_task.bulk_module_state_updates` waffle switch is enabled.
+BULK_MODULE_STATE_UPDATE_CHUNK_SIZE = 1000
+
 GRADES_DOWNLOAD = {
     'STORAGE_CLASS': 'django.core.files.storage.FileSystemStorage',
     'STORAGE_KWARGS': {
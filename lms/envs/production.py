@@ -245,6 +245,9 @@ if 'loc_cache' not in CACHES:
 # managed by the yaml file contents
 STATICFILES_STORAGE = os.environ.get('STATICFILES_STORAGE', ENV_TOKENS.get('STATICFILES_STORAGE', STATICFILES_STORAGE))
 
+CONTENTSERVER_STREAM_CHUNK_SIZE = ENV_TOKENS.get('CONTENTSERVER_STREAM_CHUNK_SIZE', CONTENTSERVER_STREAM_CHUNK_SIZE)
+COURSE_ASSETS_DISK_CACHE.update(ENV_TOKENS.get('COURSE_ASSETS_DISK_CACHE', {}))
+
 # Load all AWS_ prefixed variables to allow an S3Boto3Storage to be configured
 _locals = locals()
 for key, value in ENV_TOKENS.items():
@@ -578,6 +581,10 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADE_REPORT_USERS_PER_SHARD = ENV_TOKENS.get('GRADE_REPORT_USERS_PER_SHARD', GRADE_REPORT_USERS_PER_SHARD)
+BULK_MODULE_STATE_UPDATE_CHUNK_SIZE = ENV_TOKENS.get(
+    'BULK_MODULE_STATE_UPDATE_CHUNK_SIZE', BULK_MODULE_STATE_UPDATE_CHUNK_SIZE
+)
 
 # Rate limit for regrading tasks that a grading policy change can kick off
 
@@ -3,7 +3,7 @@ import logging
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
 
-from tahoe_sites.api import get_organization_by_site, get_users_of_organization
+from tahoe_sites.api import get_users_of_organization
 
 from organizations.models import (
     Organization,
@@ -16,6 +16,11 @@ from openedx.core.djangoapps.content.course_overviews.models import CourseOvervi
 from student.models import CourseEnrollment
 
 from openedx.core.djangoapps.appsembler.api.helpers import as_course_key
+from openedx.core.djangoapps.appsembler.sites.enrollment_index import is_enrollment_index_enabled
+from openedx.core.djangoapps.appsembler.sites.organization_cache import (
+    get_course_ids_for_organization,
+    get_organization_by_site,
+)
 
 log = logging.getLogger(__name__)
 
@@ -33,8 +38,7 @@ def get_course_keys_for_site(site):
         )
         result = []
     else:
-        org_courses = OrganizationCourse.objects.filter(organization=organization)
-        course_ids = org_courses.values_list('course_id', flat=True)
+        course_ids = get_course_ids_for_organization(organization)
         result = [as_course_key(cid) for cid in course_ids]
     return result
 
@@ -84,6 +88,10 @@ def course_belongs_to_site(site, course_id):
 
 @beeline.traced(name="api.sites.get_enrollments_for_site")
 def get_enrollments_for_site(site):
+    if is_enrollment_index_enabled():
+        # Single indexed join instead of a `course_id IN (...)` clause with all the site courses
+        return CourseEnrollment.objects.filter(site_index__site=site)
+
     course_keys = get_course_keys_for_site(site)
     return CourseEnrollment.objects.filter(course_id__in=course_keys)
 
@@ -0,0 +1,100 @@
+"""
+Celery tasks for the Tahoe API.
+"""
+
+from celery.task import task
+from celery.utils.log import get_task_logger
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.db.models.signals import post_save
+from opaque_keys.edx.keys import CourseKey
+
+from lms.djangoapps.courseware.courses import get_course_by_id
+from lms.djangoapps.instructor.enrollment import get_email_params, send_mail_to_student
+from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY
+from openedx.core.djangoapps.user_api.models import UserPreference
+from openedx.core.lib.celery.task_utils import emulate_http_request
+from student.models import (
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+    EVENT_NAME_ENROLLMENT_MODE_CHANGED,
+    SCORE_RECALCULATION_DELAY_ON_ENROLLMENT_UPDATE,
+    CourseEnrollment,
+    EnrollStatusChange,
+)
+from student.signals import ENROLLMENT_TRACK_UPDATED
+
+log = get_task_logger(__name__)
+
+
+def replay_enrollment_signals(enrollment, created, activated, mode_changed, request_user=None):
+    """
+    Send the signals and events of `CourseEnrollment.enroll` for an enrollment written with `bulk_create`.
+    """
+    if created or activated or mode_changed:
+        # Used by django-simple-history to attribute the historical record to the API caller.
+        enrollment._history_user = request_user  # pylint: disable=protected-access
+        post_save.send(
+            sender=CourseEnrollment,
+            instance=enrollment,
+            created=created,
+            update_fields=None,
+            raw=False,
+            using=enrollment._state.db,  # pylint: disable=protected-access
+        )
+
+    if activated:
+        enrollment.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+
+    if mode_changed:
+        enrollment.emit_event(EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+        ENROLLMENT_TRACK_UPDATED.send(
+            sender=None,
+            user=enrollment.user,
+            course_key=enrollment.course_id,
+            mode=enrollment.mode,
+            countdown=SCORE_RECALCULATION_DELAY_ON_ENROLLMENT_UPDATE,
+        )
+
+    enrollment.send_signal(EnrollStatusChange.enroll)
+
+
+@task()
+def bulk_enrollment_fan_out(site_id, course_id, request_user_id, enrollment_changes, notifications,
+                            auto_enroll=False, secure=True):
+    """
+    Send the signals, events and emails deferred by `bulk_enroll_learners_in_course` for a chunk of learners.
+
+    :param enrollment_changes: list of [enrollment_id, created, activated, mode_changed].
+    :param notifications: list of [message_type, email, user_id, full_name] emails to send.
+    """
+    # Tahoe: `get_current_site()` don't work in celery tasks because there's no `request`.
+    site = Site.objects.get(pk=site_id)
+    request_user = User.objects.filter(pk=request_user_id).first() if request_user_id else None
+    course_key = CourseKey.from_string(course_id)
+
+    with emulate_http_request(site=site, user=request_user):
+        changes = {change[0]: change[1:] for change in enrollment_changes}
+        for enrollment in CourseEnrollment.objects.filter(id__in=list(changes)).select_related('user'):
+            created, activated, mode_changed = changes[enrollment.id]
+            try:
+                replay_enrollment_signals(enrollment, created, activated, mode_changed, request_user=request_user)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Error while sending the enrollment signals of %s in %s', enrollment.user_id, course_id)
+
+        if not notifications:
+            return
+
+        email_params = get_email_params(course=get_course_by_id(course_key), auto_enroll=auto_enroll, secure=secure)
+        languages = dict(UserPreference.objects.filter(
+            user_id__in=[user_id for _message_type, _email, user_id, _full_name in notifications if user_id],
+            key=LANGUAGE_KEY,
+        ).values_list('user_id', 'value'))
+
+        for message_type, email, user_id, full_name in notifications:
+            params = dict(email_params, message_type=message_type, email_address=email)
+            if full_name is not None:
+                params['full_name'] = full_name
+            try:
+                send_mail_to_student(email, params, language=languages.get(user_id))
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Error while sending the %s email to %s', message_type, email)
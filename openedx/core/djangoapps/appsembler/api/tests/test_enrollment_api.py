@@ -10,6 +10,9 @@ docker run -p 27017:27017 mongo:3.6.17
 ```
 
 """
+from urllib.parse import parse_qs, urlparse
+
+from django.test import override_settings
 from django.urls import resolve, reverse
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, force_authenticate
@@ -26,7 +29,12 @@ from openedx.core.djangoapps.site_configuration.tests.factories import (
     SiteFactory,
 )
 
-from student.models import CourseEnrollment, CourseEnrollmentAllowed
+from student.models import (
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+    CourseEnrollment,
+    CourseEnrollmentAllowed,
+    ManualEnrollmentAudit,
+)
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -38,6 +46,7 @@ from tahoe_sites.api import get_users_of_organization
 from openedx.core.djangoapps.appsembler.api.sites import (
     get_enrollments_for_site,
 )
+from openedx.core.djangoapps.appsembler.api.tasks import bulk_enrollment_fan_out
 from openedx.core.djangoapps.appsembler.api.tests.factories import (
     CourseOverviewFactory,
     OrganizationFactory,
@@ -46,6 +55,7 @@ from openedx.core.djangoapps.appsembler.api.tests.factories import (
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 APPSEMBLER_API_VIEWS_MODULE = 'openedx.core.djangoapps.appsembler.api.v1.views'
+APPSEMBLER_API_MODULE = 'openedx.core.djangoapps.appsembler.api.v1.api'
 
 
 class BaseEnrollmentApiTestCase(ModuleStoreTestCase):
@@ -111,6 +121,25 @@ class EnrollmentApiGetTest(BaseEnrollmentApiTestCase):
         self.assertEqual(len(results), len(self.my_enrollments))
         # TODO: Validate each record
 
+    def test_get_all_with_cursor_pagination(self):
+        more_enrollments = [CourseEnrollmentFactory(course=self.my_course_overviews[0]) for _ in range(3)]
+        enrollment_ids = []
+        data = {'pagination': 'cursor', 'limit': 2, 'count': 'false'}
+        for _ in range(10):
+            response = self.call_enrollment_api('get', self.my_site, self.caller, {'data': data})
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            enrollment_ids += [
+                (rec['user'], rec['course_details']['course_id']) for rec in response.data['results']
+            ]
+            if not response.data['next']:
+                break
+            data['cursor'] = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+
+        expected = self.my_enrollments + more_enrollments
+        expected.sort(key=lambda enrollment: (enrollment.created, enrollment.id))
+        assert enrollment_ids == [(e.user.username, str(e.course_id)) for e in expected]
+
     def test_get_enrollments_for_course(self):
         selected_course = self.my_course_overviews[0]
         expected_enrollments = [
@@ -452,6 +481,137 @@ class EnrollmentApiPostTest(BaseEnrollmentApiTestCase):
         assert CourseEnrollment.objects.filter(course_id=lowercase_key).count() == 0
 
 
+@mock.patch(APPSEMBLER_API_VIEWS_MODULE + '.EnrollmentViewSet.throttle_classes', [])
+@mock.patch(APPSEMBLER_API_MODULE + '.transaction.on_commit', lambda func: func())
+@mock.patch(APPSEMBLER_API_MODULE + '.bulk_enrollment_fan_out')
+class EnrollmentApiBatchedPostTest(BaseEnrollmentApiTestCase):
+    """
+    Test cases for the `enroll` action with `"batched": true`.
+    """
+
+    def setUp(self):
+        super(EnrollmentApiBatchedPostTest, self).setUp()
+        self.course = self.my_course_overviews[0]
+        self.reg_users = [UserFactory(), UserFactory()]
+        for reg_user in self.reg_users:
+            create_organization_mapping(user=reg_user, organization=self.my_site_org)
+
+    def enroll(self, identifiers, **extra_payload):
+        payload = {
+            'action': 'enroll',
+            'batched': True,
+            'auto_enroll': True,
+            'identifiers': identifiers,
+            'email_learners': True,
+            'courses': [str(self.course.id)],
+        }
+        payload.update(extra_payload)
+        response = self.call_enrollment_api('post', self.my_site, self.caller, {'data': payload})
+        assert response.status_code == status.HTTP_201_CREATED, response.content
+        return response.data['results']
+
+    def test_batched_enroll_results(self, mock_fan_out):
+        new_users_emails = ['alpha@example.com', 'bravo@example.com']
+        results = self.enroll([user.email for user in self.reg_users] + new_users_emails + ['not-an-email'])
+
+        assert len(results) == 5
+        for rec in results[:2]:
+            assert rec['before'] == dict(enrollment=False, auto_enroll=False, user=True, allowed=False)
+            assert rec['after'] == dict(enrollment=True, auto_enroll=False, user=True, allowed=False)
+            assert rec['course'] == str(self.course.id)
+        for rec in results[2:4]:
+            assert rec['before'] == dict(enrollment=False, auto_enroll=False, user=False, allowed=False)
+            assert rec['after'] == dict(enrollment=False, auto_enroll=True, user=False, allowed=True)
+        assert results[4] == {'identifier': 'not-an-email', 'invalidIdentifier': True}
+
+        for reg_user in self.reg_users:
+            assert CourseEnrollment.is_enrolled(reg_user, self.course.id)
+        assert set(CourseEnrollmentAllowed.objects.filter(
+            course_id=self.course.id, auto_enroll=True,
+        ).values_list('email', flat=True)) == set(new_users_emails)
+        assert ManualEnrollmentAudit.objects.filter(enrolled_by=self.caller).count() == 4
+
+        fan_out_kwargs = mock_fan_out.delay.call_args[1]
+        assert fan_out_kwargs['site_id'] == self.my_site.id
+        assert len(fan_out_kwargs['enrollment_changes']) == 2
+        assert all(created for _id, created, _activated, _mode_changed in fan_out_kwargs['enrollment_changes'])
+        assert [notification[0] for notification in fan_out_kwargs['notifications']] == [
+            'enrolled_enroll', 'enrolled_enroll', 'allowed_enroll', 'allowed_enroll',
+        ]
+
+    def test_batched_enroll_reactivates_enrollment(self, mock_fan_out):
+        learner = self.reg_users[0]
+        enrollment = CourseEnrollmentFactory(user=learner, course=self.course, is_active=False)
+        results = self.enroll([learner.username], email_learners=False)
+
+        assert results[0]['before']['enrollment'] is False
+        assert results[0]['after']['enrollment'] is True
+        enrollment.refresh_from_db()
+        assert enrollment.is_active
+        fan_out_kwargs = mock_fan_out.delay.call_args[1]
+        assert fan_out_kwargs['enrollment_changes'][0][:3] == [enrollment.id, False, True]
+        assert fan_out_kwargs['notifications'] == []
+
+    def test_batched_enroll_same_learner_twice(self, mock_fan_out):
+        learner = self.reg_users[0]
+        results = self.enroll([learner.username, learner.email, learner.username])
+
+        assert len(results) == 2, 'Duplicate identifiers are enrolled once'
+        assert results[0]['before']['enrollment'] is False
+        assert results[1]['before']['enrollment'] is True
+        assert CourseEnrollment.objects.filter(user=learner, course_id=self.course.id).count() == 1
+
+    def test_batched_enroll_other_site_learner(self, mock_fan_out):
+        other_site_learner = UserFactory()
+        create_organization_mapping(user=other_site_learner, organization=self.other_site_org)
+        results = self.enroll([other_site_learner.email])
+
+        assert results[0]['after']['user'] is False, 'Learners of other sites are invited by email'
+        assert not CourseEnrollment.is_enrolled(other_site_learner, self.course.id)
+
+    @override_settings(TAHOE_BULK_ENROLLMENT_BATCH_SIZE=1)
+    def test_batched_enroll_failed_batch(self, mock_fan_out):
+        with mock.patch(
+            APPSEMBLER_API_MODULE + '._bulk_upsert_allowed',
+            side_effect=[None, Exception('database error')],
+        ):
+            results = self.enroll(['alpha@example.com', 'bravo@example.com'])
+
+        assert 'error' not in results[0]
+        assert results[1] == {'identifier': 'bravo@example.com', 'error': True, 'error_message': 'database error'}
+        assert ManualEnrollmentAudit.objects.filter(enrolled_by=self.caller).count() == 1, 'Batch rolled back'
+
+
+class BulkEnrollmentFanOutTaskTest(BaseEnrollmentApiTestCase):
+    """
+    Tests for the `bulk_enrollment_fan_out` Celery task.
+    """
+
+    @mock.patch('openedx.core.djangoapps.appsembler.api.tasks.send_mail_to_student')
+    @mock.patch('student.models.CourseEnrollment.emit_event')
+    def test_fan_out(self, mock_emit_event, mock_send_mail):
+        enrollment = self.my_enrollments[0]
+        with mock.patch('openedx.core.djangoapps.appsembler.api.tasks.ENROLLMENT_TRACK_UPDATED') as mock_track:
+            bulk_enrollment_fan_out(
+                site_id=self.my_site.id,
+                course_id=str(enrollment.course_id),
+                request_user_id=self.caller.id,
+                enrollment_changes=[[enrollment.id, False, True, True]],
+                notifications=[
+                    ['enrolled_enroll', enrollment.user.email, enrollment.user.id, 'Learner'],
+                    ['allowed_enroll', 'alpha@example.com', None, None],
+                ],
+            )
+
+        mock_emit_event.assert_any_call(EVENT_NAME_ENROLLMENT_ACTIVATED)
+        assert mock_track.send.called
+        assert mock_send_mail.call_count == 2
+        email, params = mock_send_mail.call_args_list[0][0]
+        assert email == enrollment.user.email
+        assert params['message_type'] == 'enrolled_enroll'
+        assert params['full_name'] == 'Learner'
+
+
 @ddt.ddt
 @mock.patch(APPSEMBLER_API_VIEWS_MODULE + '.EnrollmentViewSet.throttle_classes', [])
 class EnrollmentApiUnenrollPostTest(BaseEnrollmentApiTestCase):
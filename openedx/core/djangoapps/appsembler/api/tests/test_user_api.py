@@ -1,6 +1,7 @@
 
 import unittest
 from datetime import datetime
+from urllib.parse import parse_qs, urlparse
 
 from django.contrib.sites.models import Site
 from django.urls import resolve, reverse
@@ -105,6 +106,43 @@ class UserIndexViewSetTest(TestCase):
         user_ids = [rec['id'] for rec in results]
         assert set(user_ids) == set([obj.id for obj in expected_users])
 
+    def call_users_api(self, data):
+        url = reverse('tahoe-api:v1:users-list')
+        request = APIRequestFactory().get(url, data=data)
+        request.META['HTTP_HOST'] = self.my_site.domain
+        force_authenticate(request, user=self.caller)
+
+        view = resolve(url).func
+        response = view(request)
+        response.render()
+        return response
+
+    def test_get_all_users_for_site_with_cursor_pagination(self):
+        user_ids = []
+        data = {'pagination': 'cursor', 'limit': 1}
+        for _ in range(10):
+            response = self.call_users_api(data)
+            assert response.status_code == 200
+            assert response.data['count'] == get_users_for_site(self.my_site).count()
+            user_ids += [rec['id'] for rec in response.data['results']]
+            if not response.data['next']:
+                break
+            data['cursor'] = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+
+        expected_users = get_users_for_site(self.my_site).order_by('date_joined', 'id')
+        assert user_ids == [user.id for user in expected_users]
+
+    def test_cursor_pagination_without_count(self):
+        response = self.call_users_api({'pagination': 'cursor', 'count': 'false'})
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        assert response.data['next'] is None
+        assert len(response.data['results']) == get_users_for_site(self.my_site).count()
+
+    def test_cursor_pagination_invalid_cursor(self):
+        response = self.call_users_api({'pagination': 'cursor', 'cursor': 'not-a-cursor'})
+        assert response.status_code == 404
+
     @ddt.unpack
     @ddt.data(
         {'email': JANE_DUE_EMAIL.lower(),
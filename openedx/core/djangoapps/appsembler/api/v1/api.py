@@ -1,15 +1,27 @@
 import beeline
 import logging
+from functools import partial
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from tahoe_sites.api import get_users_of_organization
+from user_util import user_util
 
+from course_modes.models import CourseMode
 from lms.djangoapps.instructor.enrollment import (
     get_user_email_language,
 )
 
+from openedx.core.djangoapps.appsembler.api.tasks import bulk_enrollment_fan_out
+from openedx.core.djangoapps.enrollments.api import _default_course_mode
+from openedx.core.djangoapps.user_api.models import UserRetirementRequest
 from student.models import (email_exists_or_retired,
+                            generate_retired_email_address,
                             username_exists_or_retired)
 from lms.djangoapps.instructor.views.tools import get_student_from_identifier
 
@@ -23,6 +35,7 @@ from student.models import (
     ALLOWEDTOENROLL_TO_UNENROLLED,
     UNENROLLED_TO_UNENROLLED,
     CourseEnrollment,
+    CourseEnrollmentAllowed,
     ManualEnrollmentAudit
 )
 
@@ -242,3 +255,332 @@ def unenroll_learners_in_course(course_id, identifiers, unenroll_func, **kwargs)
             }
             results.append(result)
     return results
+
+
+def _chunks(items, size):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def get_retired_emails(emails, organization):
+    """
+    Batched version of `student.models.is_email_retired`.
+
+    :return set of the `emails` that belong to retired accounts.
+    """
+    retired_emails_lookup = {}
+    for email in emails:
+        candidates = [email]
+        if settings.FEATURES.get('APPSEMBLER_MULTI_TENANT_EMAILS', False):
+            candidates.append(generate_retired_email_address(email, organization))
+        for candidate in candidates:
+            for retired_email in user_util.get_all_retired_emails(
+                candidate,
+                settings.RETIRED_USER_SALTS,
+                settings.RETIRED_EMAIL_FMT,
+            ):
+                retired_emails_lookup[retired_email] = email
+
+    retired_emails = set()
+    for chunk in _chunks(list(retired_emails_lookup), settings.TAHOE_BULK_ENROLLMENT_BATCH_SIZE):
+        for retired_email in User.objects.filter(email__in=chunk).values_list('email', flat=True):
+            retired_emails.add(retired_emails_lookup[retired_email])
+    return retired_emails
+
+
+def get_organization_users_by_identifiers(identifiers, organization):
+    """
+    Batched version of `get_student_from_identifier` limited to the organization learners.
+
+    Users who requested the retirement of their account are skipped when found by username.
+
+    :return dict of {identifier: User}.
+    """
+    users = list(get_users_of_organization(organization, without_inactive_users=False).filter(
+        Q(email__in=identifiers) | Q(username__in=identifiers)
+    ).select_related('profile'))
+
+    identifiers_set = set(identifiers)
+    retiring_user_ids = set(UserRetirementRequest.objects.filter(
+        user__in=[user for user in users if user.username in identifiers_set],
+    ).values_list('user_id', flat=True))
+
+    users_by_identifier = {}
+    for user in users:
+        users_by_identifier[user.email] = user
+        if user.id not in retiring_user_ids:
+            users_by_identifier[user.username] = user
+
+    return {
+        identifier: users_by_identifier[identifier]
+        for identifier in identifiers
+        if identifier in users_by_identifier
+    }
+
+
+def _bulk_upsert_enrollments(course_id, users, enrollments, course_mode):
+    """
+    Create or reactivate the enrollments of `users` in a few queries.
+
+    The `post_save` signal isn't sent by `bulk_create` and `QuerySet.update`, so it's replayed later by the
+    `bulk_enrollment_fan_out` task along with the rest of the signals and events of `CourseEnrollment.enroll`.
+
+    :param enrollments: dict of {user_id: CourseEnrollment} of the existing enrollments, updated in place.
+    :return list of [enrollment_id, created, activated, mode_changed] for the fan out task.
+    """
+    new_user_ids = [user.id for user in users if user.id not in enrollments]
+    reactivated = [
+        enrollments[user.id] for user in users
+        if user.id in enrollments and not enrollments[user.id].is_active
+    ]
+
+    if new_user_ids:
+        CourseEnrollment.objects.bulk_create([
+            CourseEnrollment(user_id=user_id, course_id=course_id, mode=course_mode, is_active=True)
+            for user_id in new_user_ids
+        ])
+        # MySQL doesn't return the primary keys of the bulk created rows.
+        for enrollment in CourseEnrollment.objects.filter(course_id=course_id, user_id__in=new_user_ids):
+            enrollments[enrollment.user_id] = enrollment
+
+    if reactivated:
+        CourseEnrollment.objects.filter(
+            id__in=[enrollment.id for enrollment in reactivated],
+        ).update(is_active=True, mode=course_mode)
+
+    # Like `CourseEnrollment.get_or_create_enrollment`, link the unused allowances to the enrolled users.
+    if users:
+        CourseEnrollmentAllowed.objects.filter(
+            course_id=course_id,
+            email__in=[user.email for user in users],
+            user__isnull=True,
+        ).update(user=Subquery(
+            User.objects.filter(id__in=[user.id for user in users], email=OuterRef('email')).values('id')[:1]
+        ))
+
+    changes = [[enrollments[user_id].id, True, True, False] for user_id in new_user_ids]
+    for enrollment in reactivated:
+        changes.append([enrollment.id, False, True, enrollment.mode != course_mode])
+        enrollment.is_active = True
+        enrollment.mode = course_mode
+
+    changed_ids = {change[0] for change in changes}
+    changes += [
+        [enrollments[user.id].id, False, False, False]
+        for user in users if enrollments[user.id].id not in changed_ids
+    ]
+    return changes
+
+
+def _bulk_upsert_allowed(course_id, emails, auto_enroll):
+    """
+    Create or update the `CourseEnrollmentAllowed` records of the `emails` in a few queries.
+    """
+    existing_emails = set(CourseEnrollmentAllowed.objects.filter(
+        course_id=course_id,
+        email__in=emails,
+    ).values_list('email', flat=True))
+
+    CourseEnrollmentAllowed.objects.filter(
+        course_id=course_id,
+        email__in=existing_emails,
+    ).exclude(auto_enroll=auto_enroll).update(auto_enroll=auto_enroll)
+
+    CourseEnrollmentAllowed.objects.bulk_create([
+        CourseEnrollmentAllowed(course_id=course_id, email=email, auto_enroll=auto_enroll)
+        for email in emails if email not in existing_emails
+    ], ignore_conflicts=True)
+
+
+def _bulk_create_audits(audits, request_user, started):
+    """
+    Bulk create the `ManualEnrollmentAudit` records and their history.
+
+    :param audits: list of unsaved `ManualEnrollmentAudit` objects.
+    :param started: datetime before the audits were created to fetch them again on MySQL.
+    """
+    if not audits:
+        return
+
+    ManualEnrollmentAudit.objects.bulk_create(audits)
+    if audits[0].pk is None:
+        audits = ManualEnrollmentAudit.objects.filter(
+            enrolled_by=request_user,
+            enrolled_email__in=[audit.enrolled_email for audit in audits],
+            time_stamp__gte=started,
+        )
+    ManualEnrollmentAudit.history.bulk_history_create(audits, default_user=request_user)
+
+
+def _enrollment_state(user, enrollment, allowed):
+    """
+    Build the same dict as `EmailEnrollmentState.to_dict()` from pre-fetched records.
+    """
+    return {
+        'user': user is not None,
+        'enrollment': bool(enrollment and enrollment.is_active),
+        'allowed': allowed is not None,
+        'auto_enroll': bool(allowed and allowed.auto_enroll),
+    }
+
+
+def _bulk_enroll_batch(course_id, identifiers, organization, course_mode, auto_enroll, request_user, reason, role):
+    """
+    Enroll a batch of identifiers, see `bulk_enroll_learners_in_course`.
+
+    :return tuple of (results, enrollment_changes, notifications).
+    """
+    started = timezone.now()
+    users_by_identifier = get_organization_users_by_identifiers(identifiers, organization)
+    users_by_email = {user.email: user for user in users_by_identifier.values()}
+    emails = [
+        users_by_identifier[identifier].email if identifier in users_by_identifier else identifier
+        for identifier in identifiers
+    ]
+    enrollments = {
+        enrollment.user_id: enrollment
+        for enrollment in CourseEnrollment.objects.filter(
+            course_id=course_id,
+            user_id__in=[user.id for user in users_by_email.values()],
+        )
+    }
+    allowed_by_email = {}
+    for allowed in CourseEnrollmentAllowed.objects.filter(course_id=course_id, email__in=emails):
+        user = users_by_email.get(allowed.email)
+        if user and allowed.user_id not in (None, user.id):
+            continue  # Same as `CourseEnrollmentAllowed.for_user`
+        allowed_by_email.setdefault(allowed.email, allowed)
+
+    retired_emails = get_retired_emails(set(emails) - set(users_by_email), organization)
+
+    results = []
+    states = {}
+    users_to_enroll = {}
+    emails_to_allow = []
+    audits = []
+    notifications = []
+
+    for identifier, email in zip(identifiers, emails):
+        try:
+            validate_email(email)  # Raises ValidationError if invalid
+        except ValidationError:
+            results.append({
+                'identifier': identifier,
+                'invalidIdentifier': True,
+            })
+            continue
+
+        user = users_by_email.get(email)
+        if email in states:
+            # The same learner was already processed, e.g. by both username and email.
+            before = states[email]
+        elif user:
+            before = _enrollment_state(user, enrollments.get(user.id), allowed_by_email.get(email))
+        else:
+            before = _enrollment_state(None, None, allowed_by_email.get(email))
+
+        if user:
+            after = dict(before, enrollment=True)
+            if before['enrollment']:
+                state_transition = ENROLLED_TO_ENROLLED
+            elif before['allowed']:
+                state_transition = ALLOWEDTOENROLL_TO_ENROLLED
+            else:
+                state_transition = UNENROLLED_TO_ENROLLED
+            users_to_enroll[user.id] = user
+            notifications.append(['enrolled_enroll', email, user.id, user.profile.name])
+        elif email in retired_emails:
+            after = dict(before)
+            state_transition = DEFAULT_TRANSITION_STATE
+        else:
+            after = dict(before, allowed=True, auto_enroll=auto_enroll)
+            state_transition = UNENROLLED_TO_ALLOWEDTOENROLL
+            emails_to_allow.append(email)
+            notifications.append(['allowed_enroll', email, None, None])
+
+        states[email] = after
+        audits.append((email, state_transition, user))
+        results.append({
+            'identifier': identifier,
+            'before': before,
+            'after': after,
+            'course': str(course_id),
+        })
+
+    enrollment_changes = _bulk_upsert_enrollments(course_id, list(users_to_enroll.values()), enrollments, course_mode)
+    _bulk_upsert_allowed(course_id, emails_to_allow, auto_enroll)
+    _bulk_create_audits([
+        ManualEnrollmentAudit(
+            enrolled_by=request_user,
+            enrolled_email=email,
+            state_transition=state_transition,
+            reason=reason,
+            enrollment=enrollments.get(user.id) if user else None,
+            role=role,
+        )
+        for email, state_transition, user in audits
+    ], request_user, started)
+
+    return results, enrollment_changes, notifications
+
+
+@beeline.traced(name="apis.v1.api.bulk_enroll_learners_in_course")
+def bulk_enroll_learners_in_course(course_id, identifiers, organization, site, auto_enroll=False,
+                                   email_learners=False, secure=True, **kwargs):
+    """
+    Batched version of `enroll_learners_in_course` for large lists of identifiers.
+
+    Each batch of `TAHOE_BULK_ENROLLMENT_BATCH_SIZE` identifiers is resolved with a few `IN` queries and written
+    with `bulk_create` in a single transaction. The enrollment signals, analytics events and emails are sent by
+    `bulk_enrollment_fan_out` Celery tasks once the transaction is committed.
+
+    This method assumes that the site has been verified to own this course.
+
+    :return the per-identifier results in the same format as `enroll_learners_in_course`.
+    """
+    reason = kwargs.get('reason', '')
+    request_user = kwargs.get('request_user')
+    role = kwargs.get('role')
+
+    # Same as `enroll_email` and `CourseEnrollment.enroll` for learners who aren't actively enrolled.
+    if CourseMode.is_white_label(course_id):
+        course_mode = CourseMode.DEFAULT_SHOPPINGCART_MODE_SLUG
+    else:
+        course_mode = _default_course_mode(str(course_id))
+
+    results = []
+    unique_identifiers = list(dict.fromkeys(identifiers))
+    for batch in _chunks(unique_identifiers, settings.TAHOE_BULK_ENROLLMENT_BATCH_SIZE):
+        try:
+            with transaction.atomic():
+                batch_results, enrollment_changes, notifications = _bulk_enroll_batch(
+                    course_id, batch, organization, course_mode, auto_enroll, request_user, reason, role,
+                )
+        except Exception as exc:  # pylint: disable=broad-except
+            # Fail the batch but continue with the rest of the identifiers.
+            log.exception("Error while bulk enrolling students")
+            results += [{
+                'identifier': identifier,
+                'error': True,
+                'error_message': str(exc),
+            } for identifier in batch]
+            continue
+
+        results += batch_results
+        if not email_learners:
+            notifications = []
+
+        chunk_size = settings.TAHOE_BULK_ENROLLMENT_FAN_OUT_CHUNK_SIZE
+        for index in range(0, max(len(enrollment_changes), len(notifications)), chunk_size):
+            transaction.on_commit(partial(
+                bulk_enrollment_fan_out.delay,
+                site_id=site.id,
+                course_id=str(course_id),
+                request_user_id=request_user.id if request_user else None,
+                enrollment_changes=enrollment_changes[index:index + chunk_size],
+                notifications=notifications[index:index + chunk_size],
+                auto_enroll=auto_enroll,
+                secure=secure,
+            ))
+
+    return results
@@ -1,8 +1,18 @@
 """Paginatiors for Appsembler API v1
 
 """
+import base64
+import json
+from collections import OrderedDict
 
-from rest_framework.pagination import LimitOffsetPagination
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from openedx.core.djangoapps.appsembler.api.helpers import normalize_bool_param
 
 
 class TahoeLimitOffsetPagination(LimitOffsetPagination):
@@ -13,3 +23,131 @@ class TahoeLimitOffsetPagination(LimitOffsetPagination):
     we can test performance and then adjust.
     '''
     default_limit = 20
+
+
+class TahoeKeysetPagination(BasePagination):
+    '''Keyset (cursor) paginator for streaming large Tahoe site querysets
+
+    Records are ordered by a ``(datetime field, id field)`` pair such as
+    ``('created', 'id')`` and each page is fetched with a ``WHERE`` clause
+    on the last record of the previous page instead of an ``OFFSET``, so
+    every page costs the same regardless of how deep it is.
+
+    Query parameters:
+
+    * ``limit``: page size, defaults to 20 and is capped to 1000
+    * ``cursor``: opaque position taken from the ``next`` link
+    * ``count``: set to ``false`` to skip the ``COUNT(*)`` query
+
+    Only forward pagination is supported, clients follow ``next`` until
+    it is ``null``.
+    '''
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    count_query_param = 'count'
+    default_limit = 20
+    max_limit = 1000
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.count = None
+        self.next_position = None
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def should_count(self, request):
+        return normalize_bool_param(request.query_params.get(self.count_query_param, 'true'))
+
+    def encode_cursor(self, position):
+        value, pk = position
+        data = json.dumps([value.isoformat() if value else None, pk])
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError('invalid datetime')
+            return value, int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound('Invalid cursor')
+
+    def get_keyset_filter(self, position):
+        '''Filter the records that come after ``position`` in the ``ordering``
+
+        MySQL sorts NULLs first, so rows with a NULL datetime come before all
+        the others.
+        '''
+        value_field, id_field = self.ordering
+        value, pk = position
+        if value is None:
+            return (
+                Q(**{value_field + '__isnull': False}) |
+                Q(**{value_field + '__isnull': True, id_field + '__gt': pk})
+            )
+        return Q(**{value_field + '__gt': value}) | Q(**{value_field: value, id_field + '__gt': pk})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        limit = self.get_limit(request)
+        if self.should_count(request):
+            self.count = queryset.count()
+
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if position:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        # Fetch one extra record to know whether there is a next page
+        results = list(queryset[:limit + 1])
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            self.next_position = tuple(getattr(last, field) for field in self.ordering)
+
+        return results
+
+    def get_next_link(self):
+        if not self.next_position:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        response_data = OrderedDict()
+        if self.count is not None:
+            response_data['count'] = self.count
+        response_data['next'] = self.get_next_link()
+        response_data['results'] = data
+        return Response(response_data)
+
+
+class TahoeKeysetPaginationMixin(object):
+    """Let API clients opt in to ``TahoeKeysetPagination`` with ``?pagination=cursor``
+
+    Views declare the keyset with the ``keyset_ordering`` attribute and keep
+    their regular ``pagination_class`` as the default paginator.
+    """
+    keyset_ordering = None
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.keyset_ordering:
+            if self.request.query_params.get(self.pagination_query_param) == 'cursor':
+                self._paginator = TahoeKeysetPagination(ordering=self.keyset_ordering)
+        return super(TahoeKeysetPaginationMixin, self).paginator
@@ -36,6 +36,8 @@ class BulkEnrollmentSerializer(serializers.Serializer):
     )
     auto_enroll = serializers.BooleanField(default=False)
     email_learners = serializers.BooleanField(default=False)
+    # Opt-in: enroll in batches and send the signals and emails in Celery tasks, only for the 'enroll' action.
+    batched = serializers.BooleanField(default=False)
 
     def validate_courses(self, value):
         """
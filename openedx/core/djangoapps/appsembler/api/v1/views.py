@@ -45,6 +45,7 @@ from lms.djangoapps.instructor.enrollment import (
 from openedx.core.djangoapps.appsembler.api.helpers import as_course_key, normalize_bool_param
 from openedx.core.djangoapps.appsembler.api.v1.api import (
     account_exists,
+    bulk_enroll_learners_in_course,
     enroll_learners_in_course,
     unenroll_learners_in_course,
 )
@@ -54,7 +55,8 @@ from openedx.core.djangoapps.appsembler.api.v1.filters import (
     UserIndexFilter,
 )
 from openedx.core.djangoapps.appsembler.api.v1.pagination import (
-    TahoeLimitOffsetPagination
+    TahoeKeysetPaginationMixin,
+    TahoeLimitOffsetPagination,
 )
 from openedx.core.djangoapps.appsembler.api.v1.serializers import (
     CourseOverviewSerializer,
@@ -74,6 +76,7 @@ from openedx.core.djangoapps.appsembler.api.sites import (
     course_belongs_to_site,
     get_users_for_site,
 )
+from openedx.core.djangoapps.appsembler.sites.organization_cache import get_organization_by_site
 
 
 log = logging.getLogger(__name__)
@@ -273,20 +276,28 @@ class CourseViewSet(TahoeAuthMixin, viewsets.ReadOnlyModelViewSet):
 
 
 # @can_disable_rate_limit
-class EnrollmentViewSet(TahoeAuthMixin, viewsets.ModelViewSet):
+class EnrollmentViewSet(TahoeAuthMixin, TahoeKeysetPaginationMixin, viewsets.ModelViewSet):
     """Provides course information
 
     To provide data for all enrollments on your site::
 
         GET /tahoe/api/v1/enrollments/
 
+    To stream all enrollments on your site at a constant cost per page::
+
+        GET /tahoe/api/v1/enrollments/?pagination=cursor&limit=1000&count=false
+
     To provide enrollments for a specific course::
 
         GET /tahoe/api/v1/enrollments/<course id>/
 
+    To enroll thousands of learners, add ``"batched": true`` to the ``enroll`` POST payload.
+    The enrollment signals and emails are then sent asynchronously by Celery tasks.
+
     """
     model = CourseEnrollment
     pagination_class = TahoeLimitOffsetPagination
+    keyset_ordering = ('created', 'id')
     serializer_class = CourseEnrollmentSerializer
     throttle_classes = (TahoeAPIUserThrottle,)
     filter_backends = (DjangoFilterBackend, )
@@ -361,6 +372,19 @@ class EnrollmentViewSet(TahoeAuthMixin, viewsets.ModelViewSet):
                         # _site = get_site_for_course(course_id)
                         # _org = OrganizationCourse.objects.get(course_id=str(course_id))
 
+                        if action == 'enroll' and serializer.data.get('batched'):
+                            results += bulk_enroll_learners_in_course(
+                                course_id=course_key,
+                                identifiers=identifiers,
+                                organization=get_organization_by_site(site),
+                                site=site,
+                                auto_enroll=auto_enroll,
+                                email_learners=email_learners,
+                                secure=request.is_secure(),
+                                request_user=request.user,
+                            )
+                            continue
+
                         if email_learners:
                             email_params = get_email_params(course=get_course_by_id(course_key),
                                                             auto_enroll=auto_enroll,
@@ -414,13 +438,17 @@ class EnrollmentViewSet(TahoeAuthMixin, viewsets.ModelViewSet):
         return Response(response_data, status=response_code)
 
 
-class UserIndexViewSet(TahoeAuthMixin, viewsets.ReadOnlyModelViewSet):
+class UserIndexViewSet(TahoeAuthMixin, TahoeKeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """Provides course information
 
     To provide data for all learners on your site::
 
         GET /tahoe/api/v1/users/
 
+    To stream all learners on your site at a constant cost per page::
+
+        GET /tahoe/api/v1/users/?pagination=cursor&limit=1000&count=false
+
     To provide details on a specific learner:
 
         GET /tahoe/api/v1/users/<user id>/
@@ -428,6 +456,7 @@ class UserIndexViewSet(TahoeAuthMixin, viewsets.ReadOnlyModelViewSet):
     """
     model = get_user_model()
     pagination_class = TahoeLimitOffsetPagination
+    keyset_ordering = ('date_joined', 'id')
     serializer_class = UserIndexSerializer
     throttle_classes = (TahoeAPIUserThrottle,)
     filter_backends = (DjangoFilterBackend, )
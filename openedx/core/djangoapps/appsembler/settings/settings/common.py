@@ -30,6 +30,14 @@ def plugin_settings(settings):
         0, 'beeline.middleware.django.HoneyMiddleware'
     )
 
+    # Report the site configuration lookups of each request, needs to run before the request cache is cleared.
+    request_cache_middleware = 'edx_django_utils.cache.middleware.RequestCacheMiddleware'
+    if request_cache_middleware in settings.MIDDLEWARE:
+        settings.MIDDLEWARE.insert(
+            settings.MIDDLEWARE.index(request_cache_middleware) + 1,
+            'openedx.core.djangoapps.site_configuration.middleware.SiteConfigurationLookupCounterMiddleware',
+        )
+
     # Disable PDF certificates on Tahoe by default because we only support HTML certificate
     # This is a custom Tahoe feature flag.
     # TODO: Add tests for the feature
@@ -76,6 +84,45 @@ def plugin_settings(settings):
 
     settings.COPY_SEGMENT_EVENT_PROPERTIES_TO_TOP_LEVEL = False
 
+    # Two-tier Site -> Organization cache, see the `appsembler.sites.organization_cache` module.
+    settings.TAHOE_ORGANIZATION_CACHE_ENABLED = True
+    settings.TAHOE_ORGANIZATION_CACHE_TIMEOUT = 60 * 60  # Shared Django cache tier, invalidated by signals
+    settings.TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT = 60  # Per-process tier, only expires by time in other workers
+    settings.TAHOE_ORGANIZATION_CACHE_LOCAL_MAXSIZE = 5000
+
+    # Skip or share the site Sass compilations, see the `appsembler.sites.sass_cache` module.
+    settings.TAHOE_SASS_COMPILE_CACHE_ENABLED = True
+    # Compile the site Sass in a Celery task instead of the `SiteConfiguration` post_save signal receiver.
+    settings.TAHOE_SASS_COMPILE_ASYNC = True
+
+    # Batched enrollment API (`"batched": true`), see `appsembler.api.v1.api.bulk_enroll_learners_in_course`.
+    settings.TAHOE_BULK_ENROLLMENT_BATCH_SIZE = 1000  # Identifiers resolved and written per transaction
+    settings.TAHOE_BULK_ENROLLMENT_FAN_OUT_CHUNK_SIZE = 100  # Enrollments per signals and emails Celery task
+
+    # Read the site enrollments from the `SiteEnrollmentIndex` table, enable after `backfill_site_enrollment_index`.
+    settings.TAHOE_SITE_ENROLLMENT_INDEX_ENABLED = False
+    settings.TAHOE_SITE_ENROLLMENT_INDEX_BATCH_SIZE = 1000
+
+    # Per-request frozen snapshot of the site configuration values, see `site_configuration.helpers`.
+    settings.TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED = True
+
+    # Shared TierInfo cache with stale-while-revalidate, see `tahoe_tiers.tier_cache`.
+    settings.TAHOE_TIER_INFO_CACHE_ENABLED = True
+    settings.TAHOE_TIER_INFO_CACHE_TTL = 5 * 60  # Entries older than this are refreshed in the background
+    settings.TAHOE_TIER_INFO_CACHE_TIMEOUT = 24 * 60 * 60  # Maximum age of the stale entries
+    settings.TAHOE_TIER_INFO_REFRESH_PERIOD_MINUTES = 4
+
+    # Checkpointed site deletion celery pipeline, see `sites.deletion_utils`.
+    settings.TAHOE_SITE_DELETION_ASYNC = False  # Use the pipeline in the AMC site deletion API
+    settings.TAHOE_SITE_DELETION_BATCH_SIZE = 1000
+    settings.TAHOE_SITE_DELETION_BATCHES_PER_TASK = 10
+
+    # Batched Site Configuration service client, see `sites.site_config_batch_client`.
+    settings.TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED = False
+    settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_PATH = None  # Local JSON file path, e.g. on a worker volume
+    settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE = 5 * 60  # Same as the `site_config_client` cache timeout
+    settings.TAHOE_SITE_CONFIG_CLIENT_PREFETCH_CONCURRENCY = 8
+
     settings.EVENT_TRACKING_PROCESSORS += [
         # This processor does nothing outside of LMS but it's easier to keep this in common settings
         # but we could look at just putting this in the `_lms` modules, too.
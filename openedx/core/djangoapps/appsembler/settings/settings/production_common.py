@@ -89,6 +89,9 @@ def plugin_settings(settings):
         settings.INSTALLED_APPS += [
             'tiers',
         ]
+        settings.CELERY_IMPORTS += (
+            'openedx.core.djangoapps.appsembler.tahoe_tiers.tasks',
+        )
 
     if settings.FEATURES.get('APPSEMBLER_MULTI_TENANT_EMAILS', False):
         settings.INSTALLED_APPS += [
@@ -111,6 +114,67 @@ def plugin_settings(settings):
         'CMS_UPDATE_SEARCH_INDEX_JOB_QUEUE', 'edx.cms.core.default'
     )
 
+    settings.TAHOE_ORGANIZATION_CACHE_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_ORGANIZATION_CACHE_ENABLED', settings.TAHOE_ORGANIZATION_CACHE_ENABLED
+    )
+    settings.TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT = settings.ENV_TOKENS.get(
+        'TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT', settings.TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT
+    )
+    settings.TAHOE_ORGANIZATION_CACHE_LOCAL_MAXSIZE = settings.ENV_TOKENS.get(
+        'TAHOE_ORGANIZATION_CACHE_LOCAL_MAXSIZE', settings.TAHOE_ORGANIZATION_CACHE_LOCAL_MAXSIZE
+    )
+    settings.TAHOE_SASS_COMPILE_CACHE_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_SASS_COMPILE_CACHE_ENABLED', settings.TAHOE_SASS_COMPILE_CACHE_ENABLED
+    )
+    settings.TAHOE_SASS_COMPILE_ASYNC = settings.ENV_TOKENS.get(
+        'TAHOE_SASS_COMPILE_ASYNC', settings.TAHOE_SASS_COMPILE_ASYNC
+    )
+    settings.TAHOE_BULK_ENROLLMENT_BATCH_SIZE = settings.ENV_TOKENS.get(
+        'TAHOE_BULK_ENROLLMENT_BATCH_SIZE', settings.TAHOE_BULK_ENROLLMENT_BATCH_SIZE
+    )
+    settings.TAHOE_BULK_ENROLLMENT_FAN_OUT_CHUNK_SIZE = settings.ENV_TOKENS.get(
+        'TAHOE_BULK_ENROLLMENT_FAN_OUT_CHUNK_SIZE', settings.TAHOE_BULK_ENROLLMENT_FAN_OUT_CHUNK_SIZE
+    )
+    settings.TAHOE_SITE_ENROLLMENT_INDEX_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_ENROLLMENT_INDEX_ENABLED', settings.TAHOE_SITE_ENROLLMENT_INDEX_ENABLED
+    )
+    settings.TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED', settings.TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED
+    )
+    settings.TAHOE_TIER_INFO_CACHE_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_TIER_INFO_CACHE_ENABLED', settings.TAHOE_TIER_INFO_CACHE_ENABLED
+    )
+    settings.TAHOE_TIER_INFO_CACHE_TTL = settings.ENV_TOKENS.get(
+        'TAHOE_TIER_INFO_CACHE_TTL', settings.TAHOE_TIER_INFO_CACHE_TTL
+    )
+    settings.TAHOE_TIER_INFO_CACHE_TIMEOUT = settings.ENV_TOKENS.get(
+        'TAHOE_TIER_INFO_CACHE_TIMEOUT', settings.TAHOE_TIER_INFO_CACHE_TIMEOUT
+    )
+    settings.TAHOE_TIER_INFO_REFRESH_PERIOD_MINUTES = settings.ENV_TOKENS.get(
+        'TAHOE_TIER_INFO_REFRESH_PERIOD_MINUTES', settings.TAHOE_TIER_INFO_REFRESH_PERIOD_MINUTES
+    )
+    settings.TAHOE_SITE_DELETION_ASYNC = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_DELETION_ASYNC', settings.TAHOE_SITE_DELETION_ASYNC
+    )
+    settings.TAHOE_SITE_DELETION_BATCH_SIZE = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_DELETION_BATCH_SIZE', settings.TAHOE_SITE_DELETION_BATCH_SIZE
+    )
+    settings.TAHOE_SITE_DELETION_BATCHES_PER_TASK = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_DELETION_BATCHES_PER_TASK', settings.TAHOE_SITE_DELETION_BATCHES_PER_TASK
+    )
+    settings.TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED', settings.TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED
+    )
+    settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_PATH = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_PATH', settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_PATH
+    )
+    settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE', settings.TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE
+    )
+    settings.TAHOE_SITE_CONFIG_CLIENT_PREFETCH_CONCURRENCY = settings.ENV_TOKENS.get(
+        'TAHOE_SITE_CONFIG_CLIENT_PREFETCH_CONCURRENCY', settings.TAHOE_SITE_CONFIG_CLIENT_PREFETCH_CONCURRENCY
+    )
+
     # force S3 v4 (temporary until we can upgrade to django-storages 1.9)
     settings.S3_USE_SIGV4 = True
 
@@ -2,6 +2,8 @@
 Settings for Appsembler on LMS in Production.
 """
 
+import datetime
+
 import sentry_sdk
 
 from openedx.core.djangoapps.appsembler.settings.settings import production_common
@@ -103,6 +105,12 @@ def plugin_settings(settings):
     if settings.SENTRY_DSN:
         sentry_sdk.set_tag('app', 'lms')
 
+    if settings.FEATURES.get('ENABLE_TIERS_APP', False) and settings.TAHOE_TIER_INFO_CACHE_ENABLED:
+        settings.CELERYBEAT_SCHEDULE['refresh-active-tier-infos'] = {
+            'task': 'openedx.core.djangoapps.appsembler.tahoe_tiers.tasks.refresh_active_tier_infos',
+            'schedule': datetime.timedelta(minutes=settings.TAHOE_TIER_INFO_REFRESH_PERIOD_MINUTES),
+        }
+
     settings.ACCESS_CONTROL_BACKENDS = settings.ENV_TOKENS.get('ACCESS_CONTROL_BACKENDS', {})
     settings.LMS_SEGMENT_SITE = settings.AUTH_TOKENS.get('SEGMENT_SITE')
 
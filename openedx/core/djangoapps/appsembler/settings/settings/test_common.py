@@ -17,6 +17,11 @@ def plugin_settings(settings):
         getenv('TEST_APPSEMBLER_MULTI_TENANT_EMAILS', 'false') == 'true'
 
     settings.TAHOE_ENABLE_CUSTOM_ERROR_VIEW = False  # see ./common.py
+    settings.TAHOE_ORGANIZATION_CACHE_ENABLED = False  # The per-process tier would leak between tests
+    settings.TAHOE_SASS_COMPILE_CACHE_ENABLED = False  # The shared CSS files would leak between tests
+    settings.TAHOE_SASS_COMPILE_ASYNC = False
+    settings.TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED = False  # Tests change the site values within a request
+    settings.TAHOE_TIER_INFO_CACHE_ENABLED = False  # The shared TierInfo entries would leak between tests
     settings.CUSTOMER_THEMES_BACKEND_OPTIONS = {}
 
     # Permanently skip some tests that we're unable or don't want to fix
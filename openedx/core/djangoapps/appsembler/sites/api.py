@@ -34,7 +34,7 @@ from .utils import (
     get_customer_files_storage,
     to_safe_file_name,
 )
-from .deletion_utils import delete_site
+from .deletion_utils import delete_site, start_site_deletion
 
 log = logging.Logger(__name__)
 
@@ -70,7 +70,10 @@ class SiteConfigurationViewSet(viewsets.ModelViewSet):
         return super(SiteConfigurationViewSet, self).get_serializer_class()
 
     def perform_destroy(self, instance):
-        delete_site(instance.site)
+        if settings.TAHOE_SITE_DELETION_ASYNC:
+            start_site_deletion(instance.site)
+        else:
+            delete_site(instance.site)
 
 
 class FileUploadView(views.APIView):
@@ -1,6 +1,6 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 
-from django.db.models.signals import pre_save, post_init
+from django.db.models.signals import pre_delete, pre_save, post_delete, post_init, post_save
 
 
 class SitesConfig(AppConfig):
@@ -8,10 +8,47 @@ class SitesConfig(AppConfig):
     label = 'appsembler_sites'
 
     def ready(self):
+        from django.contrib.sites.models import Site
+        from organizations.models import Organization, OrganizationCourse
+
         from openedx.core.djangoapps.appsembler.sites.models import patched_clear_site_cache
         from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
+        from student.models import CourseEnrollment
 
         from .config_values_modifier import init_configuration_modifier_for_site_config
+        from .enrollment_index import (
+            index_course_on_organization_course_save,
+            index_enrollment_on_save,
+            unindex_course_on_organization_course_delete,
+        )
+        from .site_config_batch_client import install_batched_site_config_client
+        from .organization_cache import (
+            clear_organization_cache_on_course_change,
+            clear_organization_cache_on_organization_change,
+            clear_organization_cache_on_site_delete,
+        )
 
         pre_save.connect(patched_clear_site_cache, sender=SiteConfiguration)
         post_init.connect(init_configuration_modifier_for_site_config, sender=SiteConfiguration)
+
+        post_save.connect(clear_organization_cache_on_organization_change, sender=Organization)
+        pre_delete.connect(clear_organization_cache_on_organization_change, sender=Organization)
+        post_save.connect(clear_organization_cache_on_course_change, sender=OrganizationCourse)
+        post_delete.connect(clear_organization_cache_on_course_change, sender=OrganizationCourse)
+        post_delete.connect(clear_organization_cache_on_site_delete, sender=Site)
+
+        if apps.is_installed('tiers'):
+            # The TierInfo cache relies on the `tiers` models, see `tahoe_tiers.legacy_amc_helpers`.
+            from tiers.models import Tier
+            from ..tahoe_tiers.tier_cache import (
+                clear_tier_info_cache_on_site_configuration_change,
+                clear_tier_info_cache_on_tier_change,
+            )
+            post_save.connect(clear_tier_info_cache_on_site_configuration_change, sender=SiteConfiguration)
+            post_save.connect(clear_tier_info_cache_on_tier_change, sender=Tier)
+
+        post_save.connect(index_enrollment_on_save, sender=CourseEnrollment)
+        post_save.connect(index_course_on_organization_course_save, sender=OrganizationCourse)
+        post_delete.connect(unindex_course_on_organization_course_delete, sender=OrganizationCourse)
+
+        install_batched_site_config_client()
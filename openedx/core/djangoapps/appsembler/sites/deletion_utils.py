@@ -1,12 +1,24 @@
 """
 Site and courses deletion utils.
+
+Large sites are deleted by a checkpointed celery pipeline (see `start_site_deletion`):
+
+ - A `SiteDeletionJob` stores the course keys and a `SiteDeletionStep` for each course related model.
+ - The steps run concurrently in `delete_course_related_objects` tasks, each task deletes a bounded number of
+   batches and re-schedules itself until the model has no objects left for the job courses.
+ - The last completed step schedules `finish_deletion_job` to delete the users, organization and site.
+
+Every step is idempotent, `resume_deletion_job` re-schedules an interrupted job e.g. after a worker crash.
 """
 
 import beeline
 
 from django.apps import apps
+from django.conf import settings
+from django.contrib.sites.models import Site
 from django.core.management import CommandError
 from django.db import transaction
+from django.db.models import F
 
 import tahoe_sites.api
 from organizations.models import OrganizationCourse
@@ -20,6 +32,13 @@ from common.djangoapps.util.organizations_helpers import get_organization_course
 from ...content.course_overviews.models import CourseOverview
 from organizations.api import get_organization_courses
 
+from .models import SiteDeletionJob, SiteDeletionStep
+from .organization_cache import invalidate_organization_cache, invalidate_site_cache
+
+
+def _get_batch_size():
+    return getattr(settings, 'TAHOE_SITE_DELETION_BATCH_SIZE', 1000)
+
 
 def confirm_deletion(commit, question):
     """
@@ -48,10 +67,31 @@ def remove_course_creator_role(users):
     CourseAccessRole.objects.filter(user__in=users).delete()
 
 
+def delete_in_batches(queryset, max_batches=None):
+    """
+    Delete the objects of a queryset in batches of `TAHOE_SITE_DELETION_BATCH_SIZE` rows to keep transactions short.
+
+    :return (deleted_count, is_done) tuple, `is_done` is False if `max_batches` was reached first.
+    """
+    batch_size = _get_batch_size()
+    deleted_count = 0
+    batches_count = 0
+    while max_batches is None or batches_count < max_batches:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted_count, True
+        queryset.model.objects.filter(pk__in=pks).delete()
+        deleted_count += len(pks)
+        batches_count += 1
+    return deleted_count, False
+
+
 @beeline.traced(name="delete_site")
-def delete_site(site):
+def delete_site(site, delete_courses=True):
     """
     Delete site with all related objects except for MongoDB course files.
+
+    :param delete_courses: False when the courses have already been deleted by the `SiteDeletionJob` steps.
     """
     from third_party_auth.models import SAMLConfiguration  # local import to avoid import-time errors
 
@@ -71,15 +111,18 @@ def delete_site(site):
     # SAMLConfiguration will be deleted with `site.delete()`
     SAMLConfiguration.objects.filter(changed_by__in=users).update(changed_by=None)
 
-    users.delete()
+    delete_in_batches(users)
 
-    print('Deleting courses of', site)
-    delete_organization_courses(organization)
+    if delete_courses:
+        print('Deleting courses of', site)
+        delete_organization_courses(organization)
 
     print('Deleting organization', organization)
+    invalidate_organization_cache(organization)
     organization.delete()
 
     print('Deleting site', site)
+    invalidate_site_cache(site)
     site.delete()
 
 
@@ -123,6 +166,12 @@ def delete_organization_courses(organization):
     delete_related_models_of_courses(course_keys)
 
 
+def get_course_related_queryset(model_class, field_name, course_keys):
+    return model_class.objects.filter(**{
+        '{field_name}__in'.format(field_name=field_name): course_keys,
+    })
+
+
 def delete_related_models_of_courses(course_keys):
     model_classes = get_models_using_course_key()
 
@@ -132,10 +181,7 @@ def delete_related_models_of_courses(course_keys):
     ]))
 
     for model_class, field_name in model_classes:
-        objects_to_delete = model_class.objects.filter(**{
-            '{field_name}__in'.format(field_name=field_name): course_keys,
-        })
-        objects_to_delete.delete()
+        delete_in_batches(get_course_related_queryset(model_class, field_name, course_keys))
 
 
 def get_courses_keys_without_organization_linked(limit=None, only_active_links=True):
@@ -161,11 +207,13 @@ def get_courses_keys_without_organization_linked(limit=None, only_active_links=T
     return course_keys_list
 
 
-def remove_stray_courses_from_mysql(limit, commit=None, print_func=print):
+def remove_stray_courses_from_mysql(limit, commit=None, print_func=print, background=False):
     """
     Removes courses without linked organization from LMS MySQL database.
 
     The MongoDB courses won't be removed with this command.
+
+    :param background: Delete the courses with the celery pipeline instead of a single transaction.
     """
     course_keys = get_courses_keys_without_organization_linked(limit=limit)
     if not course_keys:
@@ -176,9 +224,109 @@ def remove_stray_courses_from_mysql(limit, commit=None, print_func=print):
 
     commit = confirm_deletion(commit=commit, question='Do you confirm to delete those courses from the LMS?')
 
+    if background:
+        if commit:
+            job = start_deletion_job(course_keys)
+            print_func('Scheduled the deletion in the background with {}.'.format(job))
+        else:
+            print_func('Skipped scheduling the deletion [commit={}].'.format(commit))
+        return
+
     with transaction.atomic():
         delete_related_models_of_courses(course_keys)
         print_func('Finished [commit={}] courses.'.format(commit))
 
         if not commit:
             transaction.set_rollback(True)
+
+
+def start_site_deletion(site):
+    """
+    Delete a site and its courses in the background, see the module docstring.
+    """
+    organization = tahoe_sites.api.get_organization_by_site(site)
+    course_keys = [course['course_id'] for course in get_organization_courses({'id': organization.id})]
+    return start_deletion_job(course_keys, site=site, organization=organization)
+
+
+def start_deletion_job(course_keys, site=None, organization=None):
+    """
+    Create a `SiteDeletionJob` with a step per course related model and schedule its steps.
+    """
+    with transaction.atomic():
+        job = SiteDeletionJob.objects.create(
+            site_id=site.id if site else None,
+            domain=site.domain if site else '',
+            organization_id=organization.id if organization else None,
+            course_keys=[str(course_key) for course_key in course_keys],
+        )
+        SiteDeletionStep.objects.bulk_create([
+            SiteDeletionStep(job=job, model_label=model_class._meta.label, field_name=field_name)
+            for model_class, field_name in get_models_using_course_key()
+        ])
+        transaction.on_commit(lambda: resume_deletion_job(job))
+    return job
+
+
+def resume_deletion_job(job):
+    """
+    Schedule the incomplete steps of a job, this is safe to call again for jobs interrupted by a crash.
+    """
+    from .tasks import delete_course_related_objects, finish_deletion_job  # Avoid circular import.
+
+    if job.status == SiteDeletionJob.STATUS_COMPLETED:
+        return
+
+    step_ids = list(job.steps.filter(completed=False).values_list('id', flat=True))
+    if job.status == SiteDeletionJob.STATUS_FINALIZING or not step_ids:
+        finish_deletion_job.delay(job.id)
+        return
+
+    for step_id in step_ids:
+        delete_course_related_objects.delay(step_id)
+
+
+def run_deletion_step(step):
+    """
+    Delete up to `TAHOE_SITE_DELETION_BATCHES_PER_TASK` batches of a step and checkpoint its progress.
+
+    :return True if the step is completed.
+    """
+    queryset = get_course_related_queryset(apps.get_model(step.model_label), step.field_name, step.job.course_keys)
+    deleted_count, is_done = delete_in_batches(
+        queryset,
+        max_batches=getattr(settings, 'TAHOE_SITE_DELETION_BATCHES_PER_TASK', 10),
+    )
+    SiteDeletionStep.objects.filter(pk=step.pk).update(
+        deleted_count=F('deleted_count') + deleted_count,
+        completed=is_done,
+    )
+    return is_done
+
+
+def claim_deletion_job_finalization(job):
+    """
+    Mark a job as finalizing once all of its steps are completed.
+
+    :return True only for the single caller which should finalize the job.
+    """
+    if job.steps.filter(completed=False).exists():
+        return False
+
+    return SiteDeletionJob.objects.filter(
+        pk=job.pk,
+        status=SiteDeletionJob.STATUS_RUNNING,
+    ).update(status=SiteDeletionJob.STATUS_FINALIZING) == 1
+
+
+def finalize_deletion_job(job):
+    """
+    Delete the site records that don't depend on a course key after all the steps of the job are completed.
+    """
+    site = Site.objects.filter(pk=job.site_id).first() if job.site_id else None
+    if site:
+        with transaction.atomic():  # All or nothing to be able to re-run after a crash
+            delete_site(site, delete_courses=False)
+
+    job.status = SiteDeletionJob.STATUS_COMPLETED
+    job.save(update_fields=['status', 'modified'])
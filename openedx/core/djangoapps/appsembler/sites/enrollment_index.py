@@ -0,0 +1,161 @@
+"""
+Maintenance of the denormalized `SiteEnrollmentIndex` table.
+
+The site scoped enrollment queries used to filter on `course_id__in=[...]` with all the site courses which gets
+slow for sites with hundreds of courses. The index rows are written by:
+
+ - The `CourseEnrollment` post_save receiver for new enrollments.
+ - The `OrganizationCourse` receivers when a course is linked or unlinked from a site.
+ - The `backfill_site_enrollment_index` management command for existing data.
+
+Index rows are deleted along with their enrollment by the foreign key cascade.
+
+The index is always maintained but only read when `TAHOE_SITE_ENROLLMENT_INDEX_ENABLED` is set, which should be
+enabled once the backfill command has run.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+
+import tahoe_sites.api
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from organizations.models import OrganizationCourse
+
+from student.models import CourseEnrollment
+
+from .models import SiteEnrollmentIndex
+
+
+log = logging.getLogger(__name__)
+
+
+def is_enrollment_index_enabled():
+    return getattr(settings, 'TAHOE_SITE_ENROLLMENT_INDEX_ENABLED', False)
+
+
+def _get_batch_size():
+    return getattr(settings, 'TAHOE_SITE_ENROLLMENT_INDEX_BATCH_SIZE', 1000)
+
+
+def get_site_id_for_course(course_id):
+    """
+    Get the id of the site which owns the course or `None`.
+    """
+    org_course = OrganizationCourse.objects.filter(
+        course_id=str(course_id),
+    ).select_related('organization').first()
+    if not org_course:
+        return None
+
+    try:
+        return tahoe_sites.api.get_site_by_organization(organization=org_course.organization).id
+    except ObjectDoesNotExist:
+        return None
+
+
+def index_course_enrollments(site_id, course_id):
+    """
+    Add the missing index rows for all the enrollments of a course.
+
+    :return number of indexed enrollments.
+    """
+    enrollments = CourseEnrollment.objects.filter(
+        course_id=course_id,
+        site_index__isnull=True,
+    ).values_list('id', 'user_id')
+
+    batch_size = _get_batch_size()
+    indexed_count = 0
+    last_id = 0
+    while True:
+        batch = list(enrollments.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            break
+        SiteEnrollmentIndex.objects.bulk_create([
+            SiteEnrollmentIndex(site_id=site_id, enrollment_id=enrollment_id, user_id=user_id, course_id=course_id)
+            for enrollment_id, user_id in batch
+        ], ignore_conflicts=True)
+        indexed_count += len(batch)
+        last_id = batch[-1][0]
+
+    return indexed_count
+
+
+def unindex_course(course_id):
+    SiteEnrollmentIndex.objects.filter(course_id=course_id).delete()
+
+
+def _parse_course_keys(course_ids):
+    course_keys = set()
+    for course_id in course_ids:
+        try:
+            course_keys.add(CourseKey.from_string(course_id))
+        except InvalidKeyError:
+            log.warning('Skipping the invalid course key %s of the site enrollment index', course_id)
+    return course_keys
+
+
+def rebuild_site_index(site):
+    """
+    Rebuild the index rows of a site from its `OrganizationCourse` records.
+
+    :return number of indexed enrollments.
+    """
+    organization = tahoe_sites.api.get_organization_by_site(site=site)
+    course_keys = _parse_course_keys(OrganizationCourse.objects.filter(
+        organization=organization,
+    ).values_list('course_id', flat=True))
+
+    stale_rows = SiteEnrollmentIndex.objects.filter(site=site)
+    if course_keys:
+        stale_rows = stale_rows.exclude(course_id__in=course_keys)
+    stale_rows.delete()
+
+    return sum(index_course_enrollments(site.id, course_key) for course_key in course_keys)
+
+
+def index_enrollment_on_save(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `CourseEnrollment` saves, only new enrollments need to be indexed.
+    """
+    if not created or kwargs.get('raw'):
+        return
+
+    site_id = get_site_id_for_course(instance.course_id)
+    if site_id:
+        SiteEnrollmentIndex.objects.bulk_create([
+            SiteEnrollmentIndex(
+                site_id=site_id,
+                enrollment_id=instance.id,
+                user_id=instance.user_id,
+                course_id=instance.course_id,
+            ),
+        ], ignore_conflicts=True)
+
+
+def index_course_on_organization_course_save(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `OrganizationCourse` saves.
+    """
+    if not created or kwargs.get('raw'):
+        return
+
+    course_keys = _parse_course_keys([instance.course_id])
+    try:
+        site = tahoe_sites.api.get_site_by_organization(organization=instance.organization)
+    except ObjectDoesNotExist:
+        return
+
+    for course_key in course_keys:
+        index_course_enrollments(site.id, course_key)
+
+
+def unindex_course_on_organization_course_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `OrganizationCourse` deletes.
+    """
+    for course_key in _parse_course_keys([instance.course_id]):
+        unindex_course(course_key)
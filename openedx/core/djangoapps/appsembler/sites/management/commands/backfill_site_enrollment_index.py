@@ -0,0 +1,48 @@
+"""
+Backfill the `SiteEnrollmentIndex` table.
+
+Run this command before enabling `TAHOE_SITE_ENROLLMENT_INDEX_ENABLED`, it's safe to re-run at any time.
+"""
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+from organizations.models import Organization
+
+from openedx.core.djangoapps.appsembler.sites.enrollment_index import rebuild_site_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the site enrollment index of all sites (or the requested domains).
+    """
+
+    help = 'Backfill the denormalized Site -> CourseEnrollment index table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--domain',
+            action='append',
+            dest='domains',
+            default=[],
+            help='Only rebuild the index of the given site domain, can be repeated.',
+        )
+
+    def handle(self, *args, **options):
+        sites = Site.objects.order_by('id')
+        if options['domains']:
+            sites = sites.filter(domain__in=options['domains'])
+
+        total_count = 0
+        for site in sites:
+            try:
+                indexed_count = rebuild_site_index(site)
+            except Organization.DoesNotExist:
+                self.stdout.write('Skipping {domain}: no organization'.format(domain=site.domain))
+                continue
+            total_count += indexed_count
+            self.stdout.write('Indexed {count} new enrollments of {domain}'.format(
+                count=indexed_count,
+                domain=site.domain,
+            ))
+
+        self.stdout.write('Indexed {count} new enrollments in total'.format(count=total_count))
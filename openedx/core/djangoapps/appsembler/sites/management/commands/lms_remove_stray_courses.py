@@ -37,6 +37,13 @@ class Command(BaseCommand):
             dest='commit',
         )
 
+        parser.add_argument(
+            '--background',
+            help='Delete the courses in parallel celery tasks instead of a single transaction.',
+            action='store_true',
+            dest='background',
+        )
+
     def handle(self, *args, **options):
         if settings.ROOT_URLCONF != 'lms.urls':
             raise CommandError('This command can only be run in LMS.')
@@ -45,4 +52,5 @@ class Command(BaseCommand):
             limit=options['limit'],
             commit=options.get('commit'),
             print_func=self.stdout.write,
+            background=options['background'],
         )
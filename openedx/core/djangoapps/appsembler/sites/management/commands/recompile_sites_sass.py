@@ -0,0 +1,168 @@
+"""
+Recompile the CSS of active sites across a process pool.
+
+This command is useful after theme releases.
+"""
+
+import json
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from openedx.core.djangoapps.appsembler.sites import sass_cache
+from openedx.core.djangoapps.appsembler.sites.site_config_client_helpers import prefetch_site_configurations
+from openedx.core.djangoapps.appsembler.sites.utils import get_active_sites, get_default_site_theme
+from openedx.core.djangoapps.site_configuration.models import SiteConfiguration, get_customer_themes_storage
+
+
+_WORKER_THEME = None  # The default site theme loaded once per worker process
+
+
+def init_worker(close_connections=True):
+    """
+    Set up a pool worker: drop the database connections inherited from the parent and load the theme once.
+    """
+    global _WORKER_THEME  # pylint: disable=global-statement
+    if close_connections:
+        connections.close_all()
+    _WORKER_THEME = get_default_site_theme()
+    if sass_cache.is_sass_cache_enabled():
+        sass_cache.get_theme_sass_source_hash()  # Hash the theme sources once per worker
+
+
+def compile_sites_batch(site_ids, force=False):
+    """
+    Compile a batch of sites then write their CSS files to the storage together.
+
+    :return list of per-site results.
+    """
+    storage = get_customer_themes_storage()
+    results = []
+    compiled = []
+    site_configs = SiteConfiguration.objects.filter(site_id__in=site_ids).select_related('site')
+    found_site_ids = set()
+
+    for site_config in site_configs:
+        found_site_ids.add(site_config.site_id)
+        start = time.time()
+        result = {'domain': site_config.site.domain}
+        try:
+            sass_status, css_output = site_config.compile_microsite_css(storage, force=force, theme=_WORKER_THEME)
+        except Exception as exc:  # pylint: disable=broad-except
+            result.update({'successful_sass_compile': False, 'sass_compile_message': str(exc)})
+        else:
+            result.update({
+                'successful_sass_compile': sass_status['successful_sass_compile'],
+                'sass_compile_message': sass_status['sass_compile_message'],
+                'sass_compile_cache': sass_status['sass_compile_cache'],
+            })
+            if css_output is not None:
+                compiled.append((result, css_output, sass_status))
+        result['compile_seconds'] = round(time.time() - start, 3)
+        results.append(result)
+
+    for result, css_output, sass_status in compiled:
+        start = time.time()
+        try:
+            SiteConfiguration.store_microsite_css(storage, css_output, sass_status)
+        except Exception as exc:  # pylint: disable=broad-except
+            result.update({
+                'successful_sass_compile': False,
+                'sass_compile_message': 'Failed to store the CSS file: {}'.format(exc),
+            })
+        result['store_seconds'] = round(time.time() - start, 3)
+
+    for site_id in set(site_ids) - found_site_ids:
+        results.append({
+            'site_id': site_id,
+            'successful_sass_compile': False,
+            'sass_compile_message': 'Site has no SiteConfiguration',
+        })
+
+    return results
+
+
+def _compile_sites_batch_star(args):
+    return compile_sites_batch(*args)
+
+
+class Command(BaseCommand):
+    """
+    Recompile the CSS of all active sites (or the requested domains) and print a JSON summary.
+    """
+
+    help = 'Recompile the CSS of active sites across a pool of processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--domain',
+            action='append',
+            dest='domains',
+            default=[],
+            help='Only recompile the given site domain, can be repeated.',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='Number of worker processes, defaults to the number of CPUs.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Number of sites compiled by a worker before writing their CSS files.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            default=False,
+            help='Compile even if the stored CSS is up to date.',
+        )
+
+    def get_site_ids(self, domains):
+        sites = get_active_sites()
+        if domains:
+            sites = sites.filter(domain__in=domains)
+        sites = list(sites)
+        prefetch_site_configurations(sites)  # Warm the shared cache once instead of a service call per worker site
+        return [site.id for site in sites]
+
+    def handle(self, *args, **options):
+        if not settings.ROOT_URLCONF == 'lms.urls':
+            raise CommandError('This command can only be run from within the LMS')
+
+        if options['processes'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Both --processes and --batch-size should be positive numbers')
+
+        site_ids = self.get_site_ids(options['domains'])
+        batch_size = options['batch_size']
+        batches = [
+            (site_ids[index:index + batch_size], options['force'])
+            for index in range(0, len(site_ids), batch_size)
+        ]
+
+        start = time.time()
+        results = []
+        if options['processes'] == 1:
+            init_worker(close_connections=False)
+            for batch in batches:
+                results.extend(_compile_sites_batch_star(batch))
+        else:
+            connections.close_all()  # Avoid sharing the parent database connections with the forked workers
+            with multiprocessing.Pool(processes=options['processes'], initializer=init_worker) as pool:
+                for batch_results in pool.imap_unordered(_compile_sites_batch_star, batches):
+                    results.extend(batch_results)
+
+        failures = [result for result in results if not result['successful_sass_compile']]
+        summary = {
+            'total_sites': len(results),
+            'successful': len(results) - len(failures),
+            'failed': len(failures),
+            'total_seconds': round(time.time() - start, 3),
+            'sites': sorted(results, key=lambda result: result.get('domain', '')),
+        }
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -4,7 +4,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.sites.models import Site
 from django.db import transaction
 
-from ...deletion_utils import delete_site
+from ...deletion_utils import delete_site, start_site_deletion
 
 
 class Command(BaseCommand):
@@ -23,6 +23,14 @@ class Command(BaseCommand):
             action='store_true',
         )
 
+        parser.add_argument(
+            '--background',
+            default=False,
+            dest='background',
+            help='Delete the site in parallel celery tasks, requires `--commit`. See `resume_site_deletions`.',
+            action='store_true',
+        )
+
         parser.add_argument(
             'domain',
             help='The domain of the organization to be deleted.',
@@ -42,6 +50,11 @@ class Command(BaseCommand):
                     self.stderr.write(self.style.ERROR('Cannot find "{domain}"'.format(domain=domain)))
                     continue
 
+                if options['background'] and options['commit']:
+                    job = start_site_deletion(site)
+                    self.stdout.write('Scheduled {job}'.format(job=job))
+                    continue
+
                 with transaction.atomic():
                     delete_site(site)
 
@@ -0,0 +1,38 @@
+"""
+Resume the site deletions interrupted by a crash or a deploy.
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...deletion_utils import resume_deletion_job
+from ...models import SiteDeletionJob
+
+
+class Command(BaseCommand):
+    """
+    Re-schedule the incomplete steps of the `SiteDeletionJob`s, it's safe to run while the jobs are in progress.
+    """
+
+    help = 'Resume the incomplete background site deletions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job-id',
+            action='append',
+            dest='job_ids',
+            type=int,
+            default=[],
+            help='Only resume the given job id, can be repeated.',
+        )
+
+    def handle(self, *args, **options):
+        jobs = SiteDeletionJob.objects.exclude(status=SiteDeletionJob.STATUS_COMPLETED).order_by('id')
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+
+        for job in jobs:
+            resume_deletion_job(job)
+            self.stdout.write('Resumed {job} with {count} incomplete steps'.format(
+                job=job,
+                count=job.steps.filter(completed=False).count(),
+            ))
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
+from openedx.core.djangoapps.appsembler.sites.site_config_client_helpers import prefetch_site_configurations
 from openedx.core.djangoapps.appsembler.sites.utils import get_active_sites
 from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
 
@@ -17,7 +18,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         if not settings.ROOT_URLCONF == 'lms.urls':
             raise CommandError('This command can only be run from within the LMS')
-        for site in get_active_sites():
+        sites = list(get_active_sites())
+        prefetch_site_configurations(sites)
+        for site in sites:
             print('On:', site.domain)
             try:
                 site_config = SiteConfiguration.objects.get(site=site)
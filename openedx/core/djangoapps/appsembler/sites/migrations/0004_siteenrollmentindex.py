@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sites', '0001_initial'),
+        ('student', '0033_userprofile_state'),
+        ('appsembler_sites', '0003_add_juniper_new_sass_vars'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteEnrollmentIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                           to='sites.Site')),
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE,
+                                                    related_name='site_index', to='student.CourseEnrollment')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                           to=settings.AUTH_USER_MODEL)),
+                ('course_id', opaque_keys.edx.django.models.CourseKeyField(db_index=True, max_length=255)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='siteenrollmentindex',
+            index=models.Index(fields=['site', 'user'], name='appsembler__site_id_b1cceb_idx'),
+        ),
+    ]
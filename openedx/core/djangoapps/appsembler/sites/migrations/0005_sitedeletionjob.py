@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+
+from django.db import migrations, models
+import django.db.models.deletion
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appsembler_sites', '0004_siteenrollmentindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteDeletionJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site_id', models.IntegerField(blank=True, null=True)),
+                ('domain', models.CharField(blank=True, max_length=255)),
+                ('organization_id', models.IntegerField(blank=True, null=True)),
+                ('course_keys', jsonfield.fields.JSONField(default=list)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('finalizing', 'Finalizing'),
+                                                     ('completed', 'Completed')],
+                                            db_index=True, default='running', max_length=16)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SiteDeletionStep',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=255)),
+                ('field_name', models.CharField(max_length=255)),
+                ('deleted_count', models.PositiveIntegerField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps',
+                                          to='appsembler_sites.SiteDeletionJob')),
+            ],
+            options={
+                'unique_together': {('job', 'model_label', 'field_name')},
+            },
+        ),
+    ]
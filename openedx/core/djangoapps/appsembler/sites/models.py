@@ -6,6 +6,8 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.http.request import split_domain_port
 from django.contrib.sites.models import Site, SiteManager, SITE_CACHE
+from jsonfield.fields import JSONField
+from opaque_keys.edx.django.models import CourseKeyField
 import beeline
 import django
 
@@ -112,6 +114,86 @@ class AlternativeDomain(models.Model):
         return settings.LMS_BASE in self.domain
 
 
+class SiteEnrollmentIndex(models.Model):
+    """
+    Denormalized Site -> CourseEnrollment (and enrolled user) index.
+
+    Avoids the `course_id__in=[...]` list of all the site courses in the site scoped queries.
+    Maintained by the signal receivers of the `enrollment_index` module and rebuilt by the
+    `backfill_site_enrollment_index` management command.
+    """
+    site = models.ForeignKey(Site, related_name='+', on_delete=models.CASCADE)
+    enrollment = models.OneToOneField(
+        'student.CourseEnrollment',
+        related_name='site_index',
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['site', 'user'])]
+
+    def __str__(self):
+        return 'SiteEnrollmentIndex <{site_id}: {enrollment_id}>'.format(
+            site_id=self.site_id,
+            enrollment_id=self.enrollment_id,
+        )
+
+
+class SiteDeletionJob(models.Model):
+    """
+    Checkpoint of a site (or stray courses) deletion running in the celery pipeline of the `deletion_utils` module.
+
+    The course keys are stored because the `OrganizationCourse` records are deleted along the way.
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_FINALIZING = 'finalizing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = (
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_FINALIZING, 'Finalizing'),
+        (STATUS_COMPLETED, 'Completed'),
+    )
+
+    # Not foreign keys because the site and organization are deleted by the job.
+    site_id = models.IntegerField(null=True, blank=True)
+    domain = models.CharField(max_length=255, blank=True)
+    organization_id = models.IntegerField(null=True, blank=True)
+    course_keys = JSONField(default=list)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_RUNNING, db_index=True)
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'SiteDeletionJob <{id}: {domain} {status}>'.format(
+            id=self.id,
+            domain=self.domain or 'stray courses',
+            status=self.status,
+        )
+
+
+class SiteDeletionStep(models.Model):
+    """
+    Deletion progress of the objects of a single course related model in a `SiteDeletionJob`.
+    """
+    job = models.ForeignKey(SiteDeletionJob, related_name='steps', on_delete=models.CASCADE)
+    model_label = models.CharField(max_length=255)  # The `app_label.ModelName` of the model
+    field_name = models.CharField(max_length=255)
+    deleted_count = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('job', 'model_label', 'field_name')
+
+    def __str__(self):
+        return 'SiteDeletionStep <{job_id}: {model_label}.{field_name}>'.format(
+            job_id=self.job_id,
+            model_label=self.model_label,
+            field_name=self.field_name,
+        )
+
+
 @receiver(post_save, sender=AlternativeDomain)
 def delete_alternative_domain_cache(sender, instance, **kwargs):
     if instance.site.domain.endswith(settings.SITE_NAME):
@@ -0,0 +1,175 @@
+"""
+Two-tier cache for the Site -> Organization related lookups.
+
+Tahoe resolves the organization of the current site on every request, so these lookups are cached in:
+
+ - A bounded per-process LRU (first tier) with a short timeout.
+ - The shared Django cache (second tier) which is invalidated by the `Organization`, `OrganizationCourse`
+   and `Site` model signals.
+
+The signals only clear the first tier of the process that made the change, other processes pick up the change
+once their local entries expire after `TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT` seconds.
+"""
+
+import beeline
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+import tahoe_sites.api
+from organizations.models import OrganizationCourse
+
+from openedx.core.lib.cache_utils import ProcessLRUCache
+
+
+ORGANIZATION_BY_SITE = 'organization_by_site'
+UUID_BY_ORGANIZATION = 'uuid_by_organization'
+COURSE_IDS_BY_ORGANIZATION = 'course_ids_by_organization'
+
+_LOCAL_CACHE = None
+
+
+def is_organization_cache_enabled():
+    return getattr(settings, 'TAHOE_ORGANIZATION_CACHE_ENABLED', False)
+
+
+def get_local_cache():
+    """
+    Get the per-process (first tier) cache.
+    """
+    global _LOCAL_CACHE  # pylint: disable=global-statement
+    if _LOCAL_CACHE is None:
+        _LOCAL_CACHE = ProcessLRUCache(
+            maxsize=getattr(settings, 'TAHOE_ORGANIZATION_CACHE_LOCAL_MAXSIZE', 5000),
+            timeout=getattr(settings, 'TAHOE_ORGANIZATION_CACHE_LOCAL_TIMEOUT', 60),
+        )
+    return _LOCAL_CACHE
+
+
+def _cache_key(kind, pk):
+    return 'tahoe_organization_cache:{kind}:{pk}'.format(kind=kind, pk=pk)
+
+
+def _record_lookup(kind, tier):
+    """
+    Report the cache tier that served the lookup and the process hit/miss counters to Honeycomb.
+    """
+    local_cache = get_local_cache()
+    beeline.add_context_field('organization_cache.{kind}'.format(kind=kind), tier)
+    beeline.add_trace_field('organization_cache.local_hits', local_cache.hits)
+    beeline.add_trace_field('organization_cache.local_misses', local_cache.misses)
+
+
+def _get_or_load(kind, pk, loader):
+    """
+    Get a value from the local tier, then the shared tier and lastly from the `loader` function.
+
+    Exceptions raised by `loader` such as `Organization.DoesNotExist` are propagated and nothing is cached.
+    """
+    if not is_organization_cache_enabled():
+        return loader()
+
+    key = _cache_key(kind, pk)
+    local_cache = get_local_cache()
+    cached_response = local_cache.get_cached_response(key)
+    if cached_response.is_found:
+        _record_lookup(kind, 'local')
+        return cached_response.value
+
+    value = cache.get(key)
+    if value is not None:
+        _record_lookup(kind, 'shared')
+    else:
+        value = loader()
+        cache.set(key, value, getattr(settings, 'TAHOE_ORGANIZATION_CACHE_TIMEOUT', 60 * 60))
+        _record_lookup(kind, 'miss')
+
+    local_cache.set(key, value)
+    return value
+
+
+def _delete_keys(keys):
+    get_local_cache().delete_many(keys)
+    cache.delete_many(keys)
+
+
+def get_organization_by_site(site):
+    """
+    Cached version of `tahoe_sites.api.get_organization_by_site`.
+    """
+    return _get_or_load(
+        ORGANIZATION_BY_SITE,
+        site.id,
+        lambda: tahoe_sites.api.get_organization_by_site(site=site),
+    )
+
+
+def get_uuid_by_organization(organization):
+    """
+    Cached version of `tahoe_sites.api.get_uuid_by_organization`.
+    """
+    return _get_or_load(
+        UUID_BY_ORGANIZATION,
+        organization.id,
+        lambda: tahoe_sites.api.get_uuid_by_organization(organization=organization),
+    )
+
+
+def get_course_ids_for_organization(organization):
+    """
+    Get the `OrganizationCourse.course_id` strings of an organization.
+    """
+    return _get_or_load(
+        COURSE_IDS_BY_ORGANIZATION,
+        organization.id,
+        lambda: list(OrganizationCourse.objects.filter(
+            organization=organization,
+        ).values_list('course_id', flat=True)),
+    )
+
+
+def invalidate_site_cache(site):
+    _delete_keys([_cache_key(ORGANIZATION_BY_SITE, site.id)])
+
+
+def invalidate_organization_cache(organization):
+    """
+    Clear all cached values of an organization including the organization of its site.
+    """
+    keys = [
+        _cache_key(UUID_BY_ORGANIZATION, organization.id),
+        _cache_key(COURSE_IDS_BY_ORGANIZATION, organization.id),
+    ]
+
+    try:
+        site = tahoe_sites.api.get_site_by_organization(organization=organization)
+    except (ObjectDoesNotExist, ValueError):
+        # The site is either not linked yet or already deleted (`ValueError` for unsaved organizations).
+        pass
+    else:
+        keys.append(_cache_key(ORGANIZATION_BY_SITE, site.id))
+
+    _delete_keys(keys)
+
+
+def clear_organization_cache_on_organization_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `Organization` saves and deletes.
+
+    Connected to `pre_delete` to be able to find the linked site before it's removed.
+    """
+    invalidate_organization_cache(instance)
+
+
+def clear_organization_cache_on_course_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `OrganizationCourse` saves and deletes.
+    """
+    _delete_keys([_cache_key(COURSE_IDS_BY_ORGANIZATION, instance.organization_id)])
+
+
+def clear_organization_cache_on_site_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `Site` deletes.
+    """
+    invalidate_site_cache(instance)
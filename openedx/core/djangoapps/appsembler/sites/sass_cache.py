@@ -0,0 +1,108 @@
+"""
+Content-hashed cache for the compiled site theme CSS.
+
+Compiling the site Sass is expensive and most of the `SiteConfiguration` saves don't change any Sass variable.
+Each compilation is identified by a fingerprint of:
+
+ - The theme Sass source tree (hashed once per process, themes only change on deployment).
+ - The compiled scss file name e.g. `_main-v2.scss`.
+ - The effective variable overrides of the site.
+
+The fingerprint of the stored site CSS file is kept in the Django cache to skip compiling up-to-date sites and the
+compiled CSS is stored once per fingerprint in the customer themes storage so sites with the same branding share it.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+from openedx.core.lib.cache_utils import process_cached
+
+from . import utils as sites_utils
+
+
+SHARED_CSS_DIR = 'compiled-css'
+
+
+def is_sass_cache_enabled():
+    return getattr(settings, 'TAHOE_SASS_COMPILE_CACHE_ENABLED', False)
+
+
+def _site_css_fingerprint_cache_key(css_file_name):
+    return 'tahoe_sass_fingerprint:{css_file_name}'.format(css_file_name=css_file_name)
+
+
+@process_cached
+def get_theme_sass_source_hash():
+    """
+    Hash every Sass file in the default site theme and the customer specific include paths.
+    """
+    source_hash = hashlib.sha256()
+    theme = sites_utils.get_default_site_theme()
+    if not theme:
+        return source_hash.hexdigest()
+
+    sass_dirs = [os.path.join(theme.path, 'static', 'sass')] + sites_utils.get_sass_include_paths(theme)
+    for sass_dir in sass_dirs:
+        for dir_path, dir_names, file_names in os.walk(sass_dir):
+            dir_names.sort()  # Ensure a stable walk order
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                source_hash.update(os.path.relpath(file_path, sass_dir).encode('utf-8'))
+                with open(file_path, 'rb') as sass_file:
+                    source_hash.update(sass_file.read())
+
+    return source_hash.hexdigest()
+
+
+def get_sass_fingerprint(scss_file, variables_overrides):
+    """
+    Get the fingerprint of a site CSS compilation.
+
+    :param scss_file: The main scss file name.
+    :param variables_overrides: List of the Sass strings that the site injects into the theme.
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(get_theme_sass_source_hash().encode('utf-8'))
+    fingerprint.update(scss_file.encode('utf-8'))
+    for override in variables_overrides:
+        fingerprint.update(b'\0')
+        fingerprint.update((override or '').encode('utf-8'))
+    return fingerprint.hexdigest()
+
+
+def get_site_css_fingerprint(css_file_name):
+    return cache.get(_site_css_fingerprint_cache_key(css_file_name))
+
+
+def set_site_css_fingerprint(css_file_name, fingerprint):
+    cache.set(_site_css_fingerprint_cache_key(css_file_name), fingerprint, None)
+
+
+def get_shared_css_file_name(fingerprint):
+    return '{directory}/{fingerprint}.css'.format(directory=SHARED_CSS_DIR, fingerprint=fingerprint)
+
+
+def get_shared_css(storage, fingerprint):
+    """
+    Get the CSS previously compiled for the same fingerprint or `None`.
+    """
+    shared_css_file_name = get_shared_css_file_name(fingerprint)
+    if not storage.exists(shared_css_file_name):
+        return None
+
+    with storage.open(shared_css_file_name) as f:
+        css_output = f.read()
+
+    if isinstance(css_output, bytes):
+        css_output = css_output.decode('utf-8')
+    return css_output
+
+
+def save_shared_css(storage, fingerprint, css_output):
+    shared_css_file_name = get_shared_css_file_name(fingerprint)
+    if not storage.exists(shared_css_file_name):
+        storage.save(shared_css_file_name, ContentFile(css_output.encode('utf-8')))
@@ -0,0 +1,243 @@
+"""
+Batched client for the Site Configuration service.
+
+The `site_config_client` library fetches the backend configs one site at a time, so batch operations such as the
+`save_active_sites` command make one HTTP call per site. When `TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED` is set the
+`settings.SITE_CONFIG_CLIENT` is wrapped in a `BatchedSiteConfigClient` which adds:
+
+ - `prefetch_backend_configs(site_uuids)` which reads the cached configs of many sites in a single `get_many` call
+   and fetches the missing ones concurrently. The service has no multi-site endpoint, so misses are still fetched
+   per site but over a bounded thread pool.
+ - Request coalescing: concurrent fetches of the same site within a process share a single HTTP call.
+ - A local JSON snapshot of the prefetched live configs, used instead of the service when the shared cache is cold
+   e.g. on a new worker or after a cache flush. Snapshot entries of sites changed after the snapshot was taken and
+   snapshots older than `TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE` seconds are ignored.
+
+Only `live` configs are batched, cached and snapshotted. The `draft` configs are always fetched fresh as the
+`site_config_client` library does.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from site_config_client.client import STATUS_LIVE, get_cache_key_for_site
+
+
+log = logging.getLogger(__name__)
+
+
+def _invalidation_key(site_uuid):
+    return 'tahoe_site_config_client_invalidated:{site_uuid}'.format(site_uuid=site_uuid)
+
+
+class BatchedSiteConfigClient:
+    """
+    Wrapper of the `site_config_client.client.Client` with batching, coalescing and a local snapshot.
+    """
+
+    def __init__(self, client, snapshot_path=None, snapshot_max_age=5 * 60, max_workers=8):
+        self.client = client
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age = snapshot_max_age
+        self.max_workers = max_workers
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def __getattr__(self, name):
+        # Delegate the rest of the `Client` API e.g. `list_active_sites` and `create_site`.
+        if name == 'client':  # Not set yet e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _get_django_cache(self):
+        client_cache = getattr(self.client, 'cache', None)
+        if client_cache and hasattr(client_cache, 'get_django_cache'):
+            return client_cache.get_django_cache()
+        return None
+
+    def _load_snapshot(self):
+        if self._snapshot is None:
+            self._snapshot = {}
+            if self.snapshot_path:
+                try:
+                    with open(self.snapshot_path) as snapshot_file:
+                        self._snapshot = json.load(snapshot_file)
+                except FileNotFoundError:
+                    pass
+                except (IOError, ValueError):
+                    log.exception('Ignoring the unreadable site configuration snapshot %s', self.snapshot_path)
+        return self._snapshot
+
+    def _save_snapshot(self, configs):
+        snapshot = {'saved_at': time.time(), 'configs': configs}
+        self._snapshot = snapshot
+        if not self.snapshot_path:
+            return
+
+        try:
+            # Write then rename to avoid exposing partially written snapshots to the other workers.
+            snapshot_dir = os.path.dirname(os.path.abspath(self.snapshot_path))
+            with tempfile.NamedTemporaryFile('w', dir=snapshot_dir, delete=False) as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+            os.replace(snapshot_file.name, self.snapshot_path)
+        except (IOError, OSError):
+            log.exception('Could not write the site configuration snapshot %s', self.snapshot_path)
+
+    def get_configs_from_snapshot(self, site_uuids):
+        """
+        Get the snapshot configs of the sites which didn't change since the snapshot was taken.
+        """
+        django_cache = self._get_django_cache()
+        if not django_cache:
+            return {}  # The invalidations can't be checked
+
+        snapshot = self._load_snapshot()
+        if time.time() - snapshot.get('saved_at', 0) > self.snapshot_max_age:
+            self._snapshot = None  # Another process may have written a newer snapshot
+            snapshot = self._load_snapshot()
+
+        saved_at = snapshot.get('saved_at', 0)
+        if time.time() - saved_at > self.snapshot_max_age:
+            return {}
+
+        snapshot_configs = snapshot.get('configs', {})
+        configs = {
+            site_uuid: snapshot_configs[site_uuid]
+            for site_uuid in map(str, site_uuids)
+            if site_uuid in snapshot_configs
+        }
+        if configs:
+            invalidated_at = django_cache.get_many([_invalidation_key(site_uuid) for site_uuid in configs])
+            configs = {
+                site_uuid: config
+                for site_uuid, config in configs.items()
+                if invalidated_at.get(_invalidation_key(site_uuid), 0) < saved_at
+            }
+        return configs
+
+    def _fetch_live_configs(self, site_uuid):
+        """
+        Fetch the live configs of a site, concurrent calls for the same site wait for the first one.
+        """
+        key = str(site_uuid)
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result(timeout=getattr(self.client, 'request_timeout', None))
+
+        try:
+            config = self.client.get_backend_configs_from_readonly_storage(site_uuid, STATUS_LIVE)
+            if not config:
+                config = self.client.get_backend_configs_from_api(site_uuid, STATUS_LIVE)
+            self.client.set_backend_configs_in_cache(site_uuid, STATUS_LIVE, config)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(config)
+            return config
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get_backend_configs(self, site_uuid, status):
+        """
+        Same as `Client.get_backend_configs` with the local snapshot and coalescing for live configs.
+        """
+        if status != STATUS_LIVE:
+            return self.client.get_backend_configs(site_uuid, status)
+
+        config = self.client.get_backend_configs_from_cache(site_uuid, status)
+        if config:
+            return config
+
+        config = self.get_configs_from_snapshot([site_uuid]).get(str(site_uuid))
+        if config:
+            self.client.set_backend_configs_in_cache(site_uuid, status, config)
+            return config
+
+        return self._fetch_live_configs(site_uuid)
+
+    def delete_cache_for_site(self, site_uuid, status):
+        self.client.delete_cache_for_site(site_uuid, status)
+        django_cache = self._get_django_cache()
+        if django_cache and status == STATUS_LIVE:
+            # Tell the other workers to skip this site in their snapshots.
+            django_cache.set(_invalidation_key(site_uuid), time.time(), self.snapshot_max_age)
+
+    def prefetch_backend_configs(self, site_uuids):
+        """
+        Load the live configs of many sites into the shared cache and the local snapshot.
+
+        :return dict of site UUID string -> config, sites which failed to load are logged and omitted.
+        """
+        site_uuids = [str(site_uuid) for site_uuid in site_uuids]
+        django_cache = self._get_django_cache()
+
+        configs = {}
+        if django_cache:
+            cached_configs = django_cache.get_many([get_cache_key_for_site(site_uuid) for site_uuid in site_uuids])
+            configs = {
+                site_uuid: cached_configs[get_cache_key_for_site(site_uuid)]
+                for site_uuid in site_uuids
+                if cached_configs.get(get_cache_key_for_site(site_uuid))
+            }
+        cached_count = len(configs)
+
+        snapshot_configs = self.get_configs_from_snapshot([
+            site_uuid for site_uuid in site_uuids if site_uuid not in configs
+        ])
+        if snapshot_configs:
+            django_cache.set_many({
+                get_cache_key_for_site(site_uuid): config for site_uuid, config in snapshot_configs.items()
+            }, getattr(self.client.cache, 'cache_timeout', None))
+            configs.update(snapshot_configs)
+
+        missing_uuids = [site_uuid for site_uuid in site_uuids if site_uuid not in configs]
+        if missing_uuids:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    site_uuid: executor.submit(self._fetch_live_configs, site_uuid)
+                    for site_uuid in missing_uuids
+                }
+            for site_uuid, future in futures.items():
+                try:
+                    configs[site_uuid] = future.result()
+                except Exception:  # pylint: disable=broad-except
+                    log.exception('Could not prefetch the site configuration of %s', site_uuid)
+
+        log.info('Prefetched %s site configurations: %s cached, %s from the snapshot and %s fetched',
+                 len(configs), cached_count, len(snapshot_configs), len(missing_uuids))
+        self._save_snapshot(configs)
+        return configs
+
+
+def install_batched_site_config_client():
+    """
+    Wrap `settings.SITE_CONFIG_CLIENT` in a `BatchedSiteConfigClient` if enabled.
+    """
+    client = getattr(settings, 'SITE_CONFIG_CLIENT', None)
+    if not client or not getattr(settings, 'TAHOE_SITE_CONFIG_BATCHED_CLIENT_ENABLED', False):
+        return
+    if isinstance(client, BatchedSiteConfigClient):
+        return
+
+    settings.SITE_CONFIG_CLIENT = BatchedSiteConfigClient(
+        client,
+        snapshot_path=getattr(settings, 'TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_PATH', None),
+        snapshot_max_age=getattr(settings, 'TAHOE_SITE_CONFIG_CLIENT_SNAPSHOT_MAX_AGE', 5 * 60),
+        max_workers=getattr(settings, 'TAHOE_SITE_CONFIG_CLIENT_PREFETCH_CONCURRENCY', 8),
+    )
@@ -74,6 +74,20 @@ def get_active_site_uuids_from_site_config_service():
     return []
 
 
+def prefetch_site_configurations(sites):
+    """
+    Prefetch the live configurations of many sites if the batched client is enabled, see `site_config_batch_client`.
+
+    This avoids one Site Configuration service call per site in batch operations.
+    """
+    client = getattr(settings, 'SITE_CONFIG_CLIENT', None)
+    if not hasattr(client, 'prefetch_backend_configs'):
+        return {}
+
+    site_uuids = [tahoe_sites.api.get_uuid_by_site(site) for site in sites if is_enabled_for_site(site)]
+    return client.prefetch_backend_configs(site_uuids)
+
+
 def get_current_site_config_tier_info():
     """
     Return TierInfo object from SiteConfiguration backend configs.
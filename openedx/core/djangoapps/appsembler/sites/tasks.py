@@ -12,8 +12,9 @@ from tempfile import NamedTemporaryFile, TemporaryDirectory
 from celery.task import task
 from celery.utils.log import get_task_logger
 
-from django.db import transaction
+from django.db import DatabaseError, transaction
 from django.conf import settings
+from django.core.cache import cache
 
 from opaque_keys.edx.keys import CourseKey
 
@@ -26,6 +27,9 @@ from xmodule.modulestore.django import modulestore, SignalHandler
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
+from .deletion_utils import claim_deletion_job_finalization, finalize_deletion_job, run_deletion_step
+from .models import SiteDeletionJob, SiteDeletionStep
+
 log = get_task_logger(__name__)
 
 
@@ -200,3 +204,93 @@ def emit_course_published_signal_in_cms(course_key):
         sender=__name__,
         course_key=CourseKey.from_string(course_key),
     )
+
+
+SASS_COMPILE_LOCK_TIMEOUT = 5 * 60  # Sass compilation takes seconds, the timeout is only a safety net for crashes
+SASS_COMPILE_LOCK_RETRY_DELAY = 10
+
+
+def compile_site_sass_after_transaction(site_configuration, preview=False):
+    """
+    Schedule the `compile_site_sass` task after the transaction is committed to compile the latest values.
+    """
+    site_configuration_id = site_configuration.id
+
+    def compile_task_on_commit():
+        compile_site_sass.apply_async(kwargs={
+            'site_configuration_id': site_configuration_id,
+            'preview': preview,
+        })
+
+    transaction.on_commit(compile_task_on_commit)
+
+
+@task(bind=True, max_retries=30)
+def compile_site_sass(self, site_configuration_id, force=False, preview=False):
+    """
+    Compile the site Sass outside of the web workers, one compilation at a time per site.
+
+    `preview` compiles the preview CSS file, the task runs without a request to tell the preview mode.
+
+    Concurrent saves of the same site are retried until the running compilation finishes because the running one
+    may have been started before the latest changes were committed.
+    """
+    from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
+
+    lock_key = 'tahoe_compile_site_sass_lock:{}'.format(site_configuration_id)
+    if not cache.add(lock_key, 'true', SASS_COMPILE_LOCK_TIMEOUT):
+        log.info('Sass compile in progress for site configuration %s, retrying later', site_configuration_id)
+        raise self.retry(countdown=SASS_COMPILE_LOCK_RETRY_DELAY)
+
+    try:
+        site_configuration = SiteConfiguration.objects.get(pk=site_configuration_id)
+        sass_status = site_configuration.compile_microsite_sass(force=force, preview=preview)
+    finally:
+        cache.delete(lock_key)
+
+    if sass_status['successful_sass_compile']:
+        log.info('tahoe sass compiled successfully: %s', sass_status['sass_compile_message'])
+    else:
+        log.warning('tahoe css compile error: %s', sass_status['sass_compile_message'])
+
+    return sass_status
+
+
+SITE_DELETION_RETRY_DELAY = 30
+
+
+@task(bind=True, max_retries=10)
+def delete_course_related_objects(self, step_id):
+    """
+    Delete a bounded chunk of the objects of a `SiteDeletionStep` and re-schedule until the step is completed.
+
+    Re-scheduling between the chunks releases the worker for the other steps and other queued tasks.
+    """
+    step = SiteDeletionStep.objects.select_related('job').get(pk=step_id)
+    if not step.completed:
+        try:
+            is_done = run_deletion_step(step)
+        except DatabaseError as exc:
+            # Concurrent steps may deadlock on the cascaded deletes, the deleted batches are already checkpointed.
+            log.warning('Error while deleting %s, retrying later: %s', step, exc)
+            raise self.retry(exc=exc, countdown=SITE_DELETION_RETRY_DELAY)
+
+        if not is_done:
+            delete_course_related_objects.delay(step_id)
+            return
+
+        log.info('Completed %s', step)
+
+    if claim_deletion_job_finalization(step.job):
+        finish_deletion_job.delay(step.job_id)
+
+
+@task()
+def finish_deletion_job(job_id):
+    """
+    Delete the site, organization and users once all of the course related objects are deleted.
+    """
+    job = SiteDeletionJob.objects.get(pk=job_id)
+    if job.status != SiteDeletionJob.STATUS_COMPLETED:
+        finalize_deletion_job(job)
+        log.info('Completed %s', job)
@@ -1,3 +1,4 @@
+import json
 import os
 from unittest.mock import patch, mock_open, Mock
 from io import StringIO
@@ -8,6 +9,7 @@ from django.contrib.sites.models import Site
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.test import override_settings, TestCase
+from sass import CompileError
 
 from tahoe_sites.api import (
     create_tahoe_site_by_link,
@@ -683,3 +685,54 @@ class DisableCustomDomainCommandTestCase(TestCase):
         assert not AlternativeDomain.objects.filter(domain=disable_domain).exists()
         # and there shouldn't be a lingering/duplicate Site for the old one either
         assert not Site.objects.filter(domain=disable_domain).exists()
+
+
+@patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(return_value='I am working CSS'))
+class RecompileSitesSassCommandTestCase(TestCase):
+    """
+    Test ./manage.py lms recompile_sites_sass --processes 1
+    """
+    def setUp(self):
+        self.site_configs = [
+            SiteConfigurationFactory.create(site=SiteFactory.create(domain='{}.example.com'.format(color)))
+            for color in ['red', 'blue', 'green']
+        ]
+        self.storage = Mock()
+        self.storage.open = mock_open()
+        sites = Site.objects.filter(id__in=[config.site_id for config in self.site_configs])
+        patchers = [
+            patch('openedx.core.djangoapps.appsembler.sites.management.commands.recompile_sites_sass.get_active_sites',
+                  Mock(return_value=sites)),
+            patch('openedx.core.djangoapps.appsembler.sites.management.commands.recompile_sites_sass'
+                  '.get_customer_themes_storage', Mock(return_value=self.storage)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('recompile_sites_sass', '--processes=1', '--batch-size=2', *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_recompile_all_active_sites(self):
+        summary = self.call_command()
+        assert summary['total_sites'] == 3
+        assert summary['successful'] == 3
+        assert [site['domain'] for site in summary['sites']] == [
+            'blue.example.com', 'green.example.com', 'red.example.com',
+        ]
+        assert all('compile_seconds' in site and 'store_seconds' in site for site in summary['sites'])
+        assert self.storage.open.call_count == 3
+
+    def test_recompile_filtered_sites(self):
+        summary = self.call_command('--domain=red.example.com')
+        assert summary['total_sites'] == 1
+        assert summary['sites'][0]['domain'] == 'red.example.com'
+
+    @patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(side_effect=CompileError('broken')))
+    def test_recompile_reports_failures(self):
+        summary = self.call_command()
+        assert summary['failed'] == 3
+        assert 'broken' in summary['sites'][0]['sass_compile_message']
+        assert not self.storage.open.called
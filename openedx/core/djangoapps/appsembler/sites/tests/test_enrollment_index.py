@@ -0,0 +1,82 @@
+"""
+Tests for the denormalized Site -> CourseEnrollment index.
+"""
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from student.tests.factories import CourseEnrollmentFactory
+
+from openedx.core.djangoapps.appsembler.api.sites import get_enrollments_for_site
+from openedx.core.djangoapps.appsembler.api.tests.factories import (
+    CourseOverviewFactory,
+    OrganizationCourseFactory,
+    OrganizationFactory,
+)
+from openedx.core.djangoapps.appsembler.sites.models import SiteEnrollmentIndex
+from openedx.core.djangoapps.site_configuration.tests.factories import SiteFactory
+
+
+class SiteEnrollmentIndexTests(TestCase):
+    def setUp(self):
+        super(SiteEnrollmentIndexTests, self).setUp()
+        self.site = SiteFactory(domain='foo.test')
+        self.organization = OrganizationFactory(linked_site=self.site)
+        self.course = CourseOverviewFactory()
+        self.org_course = OrganizationCourseFactory(organization=self.organization, course_id=str(self.course.id))
+
+        self.other_site = SiteFactory(domain='bar.test')
+        OrganizationFactory(linked_site=self.other_site)
+        self.other_enrollment = CourseEnrollmentFactory()
+
+    def test_new_enrollment_is_indexed(self):
+        enrollment = CourseEnrollmentFactory(course=self.course)
+        index = SiteEnrollmentIndex.objects.get(enrollment=enrollment)
+        assert index.site == self.site
+        assert index.user_id == enrollment.user_id
+        assert index.course_id == self.course.id
+        assert not SiteEnrollmentIndex.objects.filter(enrollment=self.other_enrollment).exists()
+
+    def test_enrollment_delete_removes_index(self):
+        enrollment = CourseEnrollmentFactory(course=self.course)
+        enrollment.delete()
+        assert not SiteEnrollmentIndex.objects.exists()
+
+    def test_organization_course_link_and_unlink(self):
+        course = CourseOverviewFactory()
+        enrollments = [CourseEnrollmentFactory(course=course), CourseEnrollmentFactory(course=course)]
+        assert not SiteEnrollmentIndex.objects.filter(course_id=course.id).exists()
+
+        org_course = OrganizationCourseFactory(organization=self.organization, course_id=str(course.id))
+        assert set(SiteEnrollmentIndex.objects.filter(
+            site=self.site,
+        ).values_list('enrollment_id', flat=True)) == {enrollment.id for enrollment in enrollments}
+
+        org_course.delete()
+        assert not SiteEnrollmentIndex.objects.filter(course_id=course.id).exists()
+
+    def test_get_enrollments_for_site(self):
+        enrollment = CourseEnrollmentFactory(course=self.course)
+        with override_settings(TAHOE_SITE_ENROLLMENT_INDEX_ENABLED=True):
+            assert list(get_enrollments_for_site(self.site)) == [enrollment]
+            assert not get_enrollments_for_site(self.other_site).exists()
+        assert list(get_enrollments_for_site(self.site)) == [enrollment]
+
+    @override_settings(TAHOE_SITE_ENROLLMENT_INDEX_BATCH_SIZE=2)
+    def test_backfill_command(self):
+        enrollments = [CourseEnrollmentFactory(course=self.course) for _i in range(3)]
+        SiteEnrollmentIndex.objects.all().delete()
+        SiteEnrollmentIndex.objects.create(  # A stale row left by a course moved to another site
+            site=self.site,
+            enrollment=self.other_enrollment,
+            user=self.other_enrollment.user,
+            course_id=self.other_enrollment.course_id,
+        )
+
+        call_command('backfill_site_enrollment_index', domains=[self.site.domain])
+
+        assert set(SiteEnrollmentIndex.objects.values_list('enrollment_id', flat=True)) == {
+            enrollment.id for enrollment in enrollments
+        }
+
+        call_command('backfill_site_enrollment_index')  # Idempotent and skips sites without organization
+        assert SiteEnrollmentIndex.objects.count() == len(enrollments)
@@ -0,0 +1,74 @@
+"""
+Tests for the two-tier Site -> Organization cache.
+"""
+from mock import patch
+
+from django.test import TestCase, override_settings
+
+from organizations.models import Organization
+
+from openedx.core.djangoapps.appsembler.api.tests.factories import (
+    CourseOverviewFactory,
+    OrganizationCourseFactory,
+    OrganizationFactory,
+)
+from openedx.core.djangoapps.appsembler.sites import organization_cache
+from openedx.core.djangoapps.site_configuration.tests.factories import SiteFactory
+
+
+@override_settings(TAHOE_ORGANIZATION_CACHE_ENABLED=True)
+class OrganizationCacheTests(TestCase):
+    def setUp(self):
+        super(OrganizationCacheTests, self).setUp()
+        organization_cache.get_local_cache().clear()
+        self.addCleanup(organization_cache.get_local_cache().clear)
+        self.site = SiteFactory(domain='foo.test')
+        self.organization = OrganizationFactory(linked_site=self.site)
+
+    def test_organization_by_site_hits_local_tier(self):
+        assert organization_cache.get_organization_by_site(self.site) == self.organization
+        with self.assertNumQueries(0):
+            assert organization_cache.get_organization_by_site(self.site) == self.organization
+        assert organization_cache.get_local_cache().hits == 1
+
+    def test_missing_organization_is_not_cached(self):
+        other_site = SiteFactory(domain='bar.test')
+        with self.assertRaises(Organization.DoesNotExist):
+            organization_cache.get_organization_by_site(other_site)
+        organization = OrganizationFactory(linked_site=other_site)
+        assert organization_cache.get_organization_by_site(other_site) == organization
+
+    def test_disabled_cache(self):
+        with override_settings(TAHOE_ORGANIZATION_CACHE_ENABLED=False):
+            organization_cache.get_organization_by_site(self.site)
+            organization_cache.get_organization_by_site(self.site)
+        assert not len(organization_cache.get_local_cache())
+
+    def test_course_ids_invalidated_by_organization_course(self):
+        assert organization_cache.get_course_ids_for_organization(self.organization) == []
+        course = CourseOverviewFactory()
+        org_course = OrganizationCourseFactory(organization=self.organization, course_id=str(course.id))
+        assert organization_cache.get_course_ids_for_organization(self.organization) == [str(course.id)]
+        org_course.delete()
+        assert organization_cache.get_course_ids_for_organization(self.organization) == []
+
+    def test_organization_save_invalidates_site_entry(self):
+        organization_cache.get_organization_by_site(self.site)
+        organization_cache.get_uuid_by_organization(self.organization)
+        self.organization.name = 'changed'
+        self.organization.save()
+        assert not len(organization_cache.get_local_cache())
+        assert organization_cache.get_organization_by_site(self.site).name == 'changed'
+
+    def test_site_delete_invalidates_site_entry(self):
+        organization_cache.get_organization_by_site(self.site)
+        self.site.delete()
+        assert not len(organization_cache.get_local_cache())
+
+    @patch('openedx.core.djangoapps.appsembler.sites.organization_cache.beeline')
+    def test_beeline_fields(self, mock_beeline):
+        organization_cache.get_organization_by_site(self.site)
+        organization_cache.get_organization_by_site(self.site)
+        mock_beeline.add_context_field.assert_any_call('organization_cache.organization_by_site', 'miss')
+        mock_beeline.add_context_field.assert_any_call('organization_cache.organization_by_site', 'local')
+        mock_beeline.add_trace_field.assert_any_call('organization_cache.local_hits', 1)
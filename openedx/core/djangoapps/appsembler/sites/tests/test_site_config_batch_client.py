@@ -0,0 +1,132 @@
+"""
+Tests for the batched Site Configuration service client against a local stub server.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+from django.core.cache import cache
+from site_config_client.client import Client
+from site_config_client.django_cache import DjangoCache
+
+from openedx.core.djangoapps.appsembler.sites.site_config_batch_client import BatchedSiteConfigClient
+
+
+SITE_UUIDS = [
+    'f8a1fbe1-2a87-4f17-8d1b-0d3d2f4b0c11',
+    '0b0e0e4c-7f7c-4e0f-9a0e-8e0a4d3b2c22',
+    '6c3f1b8a-5d2e-4a9b-b1c0-3f2e1d0c9b33',
+]
+
+
+class StubSiteConfigHandler(BaseHTTPRequestHandler):
+    """
+    Serve the `combined-configuration` endpoint and count the requests per site.
+    """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        site_uuid = self.path.rstrip('/').split('/')[-2]
+        with self.server.lock:
+            self.server.requests.append(site_uuid)
+        time.sleep(self.server.delay)
+
+        body = json.dumps({
+            'site': {'uuid': site_uuid, 'tier': 'trial'},
+            'configuration': {'setting': {'PLATFORM_NAME': 'Site {}'.format(site_uuid)}},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass  # Keep the test output clean
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(('127.0.0.1', 0), StubSiteConfigHandler)
+    server.requests = []
+    server.lock = threading.Lock()
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_client(stub_server, tmp_path):
+    cache.clear()
+
+    def factory():
+        client = Client(
+            base_url='http://127.0.0.1:{port}/'.format(port=stub_server.server_address[1]),
+            api_token='fake-token',
+            environment='test',
+            cache=DjangoCache(cache_name='default', cache_timeout=300),
+        )
+        return BatchedSiteConfigClient(client, snapshot_path=str(tmp_path / 'snapshot.json'))
+
+    yield factory
+    cache.clear()
+
+
+def test_prefetch_fetches_each_site_once(make_client, stub_server):
+    client = make_client()
+
+    configs = client.prefetch_backend_configs(SITE_UUIDS)
+    assert set(configs) == set(SITE_UUIDS)
+    assert sorted(stub_server.requests) == sorted(SITE_UUIDS)
+
+    client.prefetch_backend_configs(SITE_UUIDS)
+    client.get_backend_configs(SITE_UUIDS[0], 'live')
+    assert len(stub_server.requests) == len(SITE_UUIDS), 'Should be read from the shared cache'
+
+
+def test_concurrent_fetches_are_coalesced(make_client, stub_server):
+    client = make_client()
+    stub_server.delay = 0.3
+    results = []
+
+    def fetch():
+        results.append(client.get_backend_configs(SITE_UUIDS[0], 'live'))
+
+    threads = [threading.Thread(target=fetch) for _i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5
+    assert stub_server.requests == [SITE_UUIDS[0]]
+
+
+def test_cold_worker_uses_the_snapshot(make_client, stub_server):
+    make_client().prefetch_backend_configs(SITE_UUIDS)
+    cache.clear()  # Simulate a cold shared cache
+
+    cold_client = make_client()
+    config = cold_client.get_backend_configs(SITE_UUIDS[1], 'live')
+    assert config['site']['uuid'] == SITE_UUIDS[1]
+    assert len(stub_server.requests) == len(SITE_UUIDS), 'Should be read from the snapshot'
+
+    cold_client.delete_cache_for_site(SITE_UUIDS[1], 'live')
+    make_client().get_backend_configs(SITE_UUIDS[1], 'live')
+    assert len(stub_server.requests) == len(SITE_UUIDS) + 1, 'Changed sites should skip the snapshot'
+
+
+def test_draft_configs_are_not_batched(make_client, stub_server):
+    client = make_client()
+    client.get_backend_configs(SITE_UUIDS[0], 'draft')
+    client.get_backend_configs(SITE_UUIDS[0], 'draft')
+    assert len(stub_server.requests) == 2
@@ -18,11 +18,17 @@ from openedx.core.djangoapps.appsembler.api.tests.factories import (
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 from openedx.core.djangoapps.appsembler.sites.deletion_utils import (
+    claim_deletion_job_finalization,
     delete_organization_courses,
     delete_site,
     get_models_using_course_key,
     remove_stray_courses_from_mysql,
+    resume_deletion_job,
+    run_deletion_step,
+    start_deletion_job,
+    start_site_deletion,
 )
+from openedx.core.djangoapps.appsembler.sites.models import SiteDeletionJob
 
 User = get_user_model()
 
@@ -157,3 +163,54 @@ def test_mysql_remove_stray_courses(capsys):
     remove_stray_courses_from_mysql(limit=0, commit=True)
     assert course_key not in CourseOverview.get_all_course_keys(), 'Stray course is removed'
     assert str(course_key) in capsys.readouterr()[0]
+
+
+@pytest.mark.django_db
+def test_delete_site_in_background(make_site, settings):
+    """
+    Test the `start_site_deletion` celery pipeline with small batches.
+    """
+    settings.TAHOE_SITE_DELETION_BATCH_SIZE = 1
+    settings.TAHOE_SITE_DELETION_BATCHES_PER_TASK = 1
+    red_site = make_site('red')
+    make_site('blue')
+
+    organization = tahoe_sites.api.get_organization_by_site(red_site)
+    course_keys = [CourseOverviewFactory.create().id for _i in range(3)]
+    for course_key in course_keys:
+        OrganizationCourseFactory.create(organization=organization, course_id=course_key)
+
+    with patch('openedx.core.djangoapps.appsembler.sites.deletion_utils.remove_course_creator_role'):
+        job = start_site_deletion(red_site)
+        resume_deletion_job(job)  # The `on_commit` callback doesn't run in tests
+
+    job.refresh_from_db()
+    assert job.status == SiteDeletionJob.STATUS_COMPLETED
+    assert not job.steps.filter(completed=False).exists()
+    assert job.steps.get(model_label=CourseOverview._meta.label).deleted_count == len(course_keys)
+    assert not CourseOverview.objects.filter(id__in=course_keys).exists()
+    assert not Site.objects.filter(pk=red_site.pk).exists()
+
+    with pytest.raises(User.DoesNotExist):
+        User.objects.get(username='red')
+
+    assert User.objects.get(username='blue'), 'Should not delete other sites'
+
+
+@pytest.mark.django_db
+def test_resume_interrupted_deletion_job():
+    """
+    Test that a partially processed job can be resumed and is only finalized once.
+    """
+    course_key = CourseOverviewFactory.create().id
+    job = start_deletion_job([course_key])
+
+    assert run_deletion_step(job.steps.get(model_label=CourseOverview._meta.label))
+    assert not CourseOverview.objects.filter(id=course_key).exists()
+    assert not claim_deletion_job_finalization(job), 'Should wait for the other steps'
+
+    resume_deletion_job(job)
+
+    job.refresh_from_db()
+    assert job.status == SiteDeletionJob.STATUS_COMPLETED
+    assert not claim_deletion_job_finalization(job), 'Should not finalize a job twice'
@@ -34,7 +34,6 @@ from organizations.models import Organization
 from tahoe_sites.api import (
     add_user_to_organization,
     create_tahoe_site_by_link,
-    get_organization_by_site,
     get_organization_for_user,
     get_organizations_from_uuids,
     get_sites_from_organizations,
@@ -47,6 +46,7 @@ from openedx.core.djangoapps.theming.helpers import get_current_request, get_cur
 from openedx.core.djangoapps.theming.models import SiteTheme
 
 from ..tahoe_tiers.legacy_amc_helpers import get_active_tiers_uuids_from_amc_postgres
+from .organization_cache import get_organization_by_site
 from .site_config_client_helpers import get_active_site_uuids_from_site_config_service
 
 
@@ -354,27 +354,42 @@ def get_initial_sass_variables():
     return [(val[0], (val[1], lab[1])) for val, lab in zip(values, labels)]
 
 
-@beeline.traced(name="get_branding_values_from_file")
-def get_branding_values_from_file():
-    from openedx.core.djangoapps.theming.helpers import get_theme_base_dir, Theme
+def get_default_site_theme():
+    """
+    Get the `Theme` of the default site which is used to compile the sites Sass.
 
-    if not settings.ENABLE_COMPREHENSIVE_THEMING:
-        return {}
+    Returns `None` if the database isn't initialized yet. This unblocks migrations and other
+    cases before having a default site.
+    """
+    from openedx.core.djangoapps.theming.helpers import get_theme_base_dir, Theme
 
     try:
         default_site = Site.objects.get(id=settings.SITE_ID)
     except Site.DoesNotExist:
-        # Empty values dictionary if the database isn't initialized yet.
-        # This unblocks migrations and other cases before having a default site.
-        return {}
+        return None
 
     site_theme = SiteTheme(site=default_site, theme_dir_name=settings.DEFAULT_SITE_THEME)
-    theme = Theme(
+    return Theme(
         name=site_theme.theme_dir_name,
         theme_dir_name=site_theme.theme_dir_name,
         themes_base_dir=get_theme_base_dir(site_theme.theme_dir_name),
         project_root=settings.PROJECT_ROOT,
     )
+
+
+def get_sass_include_paths(theme):
+    """
+    Get the libsass include paths for compiling the sites Sass with the given theme.
+    """
+    return [os.path.join(theme.customer_specific_path, 'static', 'sass')]
+
+
+@beeline.traced(name="get_branding_values_from_file")
+def get_branding_values_from_file():
+    if not settings.ENABLE_COMPREHENSIVE_THEMING:
+        return {}
+
+    theme = get_default_site_theme()
     if theme:
         sass_var_file = os.path.join(theme.customer_specific_path, 'static',
                                      'sass', 'base', '_branding-basics.scss')
@@ -405,30 +420,19 @@ def get_branding_labels_from_file(custom_branding=None):
 
 
 @beeline.traced(name="compile_sass")
-def compile_sass(sass_file, custom_branding=None):
-    from openedx.core.djangoapps.theming.helpers import get_theme_base_dir, Theme
-    try:
-        default_site = Site.objects.get(id=settings.SITE_ID)
-    except Site.DoesNotExist:
+def compile_sass(sass_file, custom_branding=None, theme=None):
+    theme = theme or get_default_site_theme()
+    if not theme:
         # Empty CSS output if the database isn't initialized yet.
-        # This unblocks migrations and other cases before having a default site.
         return ''
 
-    site_theme = SiteTheme(site=default_site, theme_dir_name=settings.DEFAULT_SITE_THEME)
-    theme = Theme(
-        name=site_theme.theme_dir_name,
-        theme_dir_name=site_theme.theme_dir_name,
-        themes_base_dir=get_theme_base_dir(site_theme.theme_dir_name),
-        project_root=settings.PROJECT_ROOT,
-    )
     sass_var_file = os.path.join(theme.path, 'static', 'sass', sass_file)
-    customer_specific_includes = os.path.join(theme.customer_specific_path, 'static', 'sass')
     importers = None
     if custom_branding:
         importers = [(0, custom_branding)]
     css_output = sass.compile(
         filename=sass_var_file,
-        include_paths=[customer_specific_includes],
+        include_paths=get_sass_include_paths(theme),
         importers=importers
     )
     return css_output
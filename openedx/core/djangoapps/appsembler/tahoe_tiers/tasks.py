@@ -0,0 +1,38 @@
+"""
+Celery tasks to keep the TierInfo cache fresh.
+"""
+
+from celery.task import task
+from celery.utils.log import get_task_logger
+
+from ..sites.utils import get_active_organizations_uuids
+
+from .tier_cache import is_tier_info_cache_enabled, refresh_cached_tier_info
+
+log = get_task_logger(__name__)
+
+
+@task()
+def refresh_tier_info(site_uuid):
+    """
+    Refresh the cached TierInfo of a single site.
+    """
+    refresh_cached_tier_info(site_uuid)
+
+
+@task()
+def refresh_active_tier_infos():
+    """
+    Periodic task to refresh the cached TierInfo of all the active sites.
+    """
+    if not is_tier_info_cache_enabled():
+        return
+
+    site_uuids = get_active_organizations_uuids()
+    for site_uuid in site_uuids:
+        try:
+            refresh_cached_tier_info(site_uuid)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error while refreshing the TierInfo of %s', site_uuid)
+
+    log.info('Refreshed the TierInfo of %s active sites', len(site_uuids))
@@ -0,0 +1,154 @@
+"""
+Tests for the shared TierInfo cache.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_save
+from django.test import RequestFactory
+from tiers.models import Tier
+
+from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
+
+from openedx.core.djangoapps.appsembler.tahoe_tiers import tasks, tier_cache
+from openedx.core.djangoapps.appsembler.tahoe_tiers.helpers import get_tier_info
+
+from .conftest import tier_info
+
+
+SITE_UUID = 'a0bfbcbb-4c7a-4d32-8bd4-ebc3f7f3e0a6'
+TIER_CACHE_MODULE = 'openedx.core.djangoapps.appsembler.tahoe_tiers.tier_cache'
+
+
+@pytest.fixture(autouse=True)
+def tier_info_cache(settings):
+    settings.TAHOE_TIER_INFO_CACHE_ENABLED = True
+    settings.TAHOE_TIER_INFO_CACHE_TTL = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_cache_miss_fetches_once(mock_fetch_tier_info, tier_info):
+    """
+    Cold entries are fetched synchronously and then served from the cache.
+    """
+    mock_fetch_tier_info.return_value = tier_info
+
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    mock_fetch_tier_info.assert_called_once_with(SITE_UUID)
+
+
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info', return_value=None)
+def test_missing_tier_info_is_cached(mock_fetch_tier_info):
+    """
+    Sites without TierInfo should not hit AMC or the Site Configuration service on every request.
+    """
+    assert tier_cache.get_cached_tier_info(SITE_UUID) is None
+    assert tier_cache.get_cached_tier_info(SITE_UUID) is None
+    assert mock_fetch_tier_info.call_count == 1
+
+
+@patch('openedx.core.djangoapps.appsembler.tahoe_tiers.tasks.refresh_tier_info.delay')
+@patch(TIER_CACHE_MODULE + '.time.time')
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_stale_entry_is_served_while_refreshing(mock_fetch_tier_info, mock_time, mock_delay, tier_info):
+    """
+    Stale entries are returned right away and refreshed once in the background.
+    """
+    mock_fetch_tier_info.return_value = tier_info
+    mock_time.return_value = 1000
+    tier_cache.get_cached_tier_info(SITE_UUID)
+
+    mock_time.return_value = 1000 + 61
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    mock_delay.assert_called_once_with(SITE_UUID)
+    assert mock_fetch_tier_info.call_count == 1, 'Should not block on fetching the stale entry'
+
+
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_refresh_task_updates_the_entry(mock_fetch_tier_info, tier_info):
+    mock_fetch_tier_info.return_value = None
+    assert tier_cache.get_cached_tier_info(SITE_UUID) is None
+
+    mock_fetch_tier_info.return_value = tier_info
+    tasks.refresh_tier_info(SITE_UUID)
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+
+
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+@patch('openedx.core.djangoapps.appsembler.tahoe_tiers.tasks.get_active_organizations_uuids')
+def test_refresh_active_tier_infos(mock_get_uuids, mock_fetch_tier_info, tier_info):
+    """
+    The periodic task refreshes all the active sites and skips the failing ones.
+    """
+    other_site_uuid = 'f1d7c5e6-1c8e-4a4f-a0f7-6a9f3d8b1c2e'
+    mock_get_uuids.return_value = [other_site_uuid, SITE_UUID]
+    mock_fetch_tier_info.side_effect = [Exception('AMC is down'), tier_info]
+
+    tasks.refresh_active_tier_infos()
+
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    assert mock_fetch_tier_info.call_count == 2
+
+
+@patch(TIER_CACHE_MODULE + '.tahoe_sites.api.get_uuid_by_site', return_value=SITE_UUID)
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_site_configuration_save_invalidates_the_entry(mock_fetch_tier_info, mock_get_uuid, tier_info):
+    """
+    Saving the SiteConfiguration should not wait for the TTL to serve the updated tier.
+    """
+    mock_fetch_tier_info.return_value = None
+    assert tier_cache.get_cached_tier_info(SITE_UUID) is None
+
+    mock_fetch_tier_info.return_value = tier_info
+    site_configuration = Mock(site=Mock())
+    post_save.send(sender=SiteConfiguration, instance=site_configuration, created=False)
+    mock_get_uuid.assert_called_once_with(site_configuration.site)
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+
+
+@patch(TIER_CACHE_MODULE + '.tahoe_sites.api.get_uuid_by_site', side_effect=ObjectDoesNotExist)
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_site_configuration_save_without_organization(mock_fetch_tier_info, _mock_get_uuid, tier_info):
+    mock_fetch_tier_info.return_value = tier_info
+    tier_cache.get_cached_tier_info(SITE_UUID)
+
+    post_save.send(sender=SiteConfiguration, instance=Mock(site=Mock()), created=False)
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+    assert mock_fetch_tier_info.call_count == 1
+
+
+@patch(TIER_CACHE_MODULE + '.fetch_tier_info')
+def test_tier_save_invalidates_the_entry(mock_fetch_tier_info, tier_info):
+    """
+    AMC tiers are keyed by the hex `edx_uuid` of the organization, the cache by the site UUID.
+    """
+    mock_fetch_tier_info.return_value = None
+    assert tier_cache.get_cached_tier_info(SITE_UUID) is None
+
+    mock_fetch_tier_info.return_value = tier_info
+    tier = Mock(organization=Mock(edx_uuid=SITE_UUID.replace('-', '')))
+    post_save.send(sender=Tier, instance=tier, created=False)
+    assert tier_cache.get_cached_tier_info(SITE_UUID).tier == tier_info.tier
+
+
+@patch('openedx.core.djangoapps.appsembler.tahoe_tiers.helpers.get_current_site_config_tier_info')
+@patch('openedx.core.djangoapps.appsembler.tahoe_tiers.helpers.get_uuid_by_organization', return_value=SITE_UUID)
+@patch('openedx.core.djangoapps.appsembler.tahoe_tiers.helpers.get_cached_tier_info')
+def test_get_tier_info_uses_cache(mock_get_cached_tier_info, _mock_get_uuid, mock_get_site_config_tier_info):
+    """
+    The request path should only read the cache when it's enabled.
+    """
+    request = RequestFactory().get('/dashboard')
+    request.session = {'organization': 'fake-organization'}
+    mock_get_cached_tier_info.return_value = None
+
+    assert get_tier_info(request) is None
+    mock_get_cached_tier_info.assert_called_once_with(SITE_UUID)
+    assert not mock_get_site_config_tier_info.called, 'The cache covers the Site Configuration service too'
@@ -0,0 +1,146 @@
+"""
+Shared cache of the sites TierInfo.
+
+`TahoeTierMiddleware` needs the TierInfo on every request, fetching it from the AMC Postgres database or the Site
+Configuration service on each request adds a network round-trip to every page. The TierInfo of each site is stored
+in the Django cache keyed by the site UUID:
+
+ - Entries younger than `TAHOE_TIER_INFO_CACHE_TTL` seconds are used as-is.
+ - Older entries are still served (stale-while-revalidate) while the `refresh_tier_info` task fetches a new value.
+   Entries are evicted after `TAHOE_TIER_INFO_CACHE_TIMEOUT` seconds without a refresh.
+ - The `refresh_active_tier_infos` periodic task keeps the entries of the active sites fresh, so the request path only
+   fetches the TierInfo synchronously for sites which have never been cached.
+"""
+
+import logging
+import time
+from uuid import UUID
+
+import beeline
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+import tahoe_sites.api
+
+from ..sites.site_config_client_helpers import init_site_configuration_adapter, is_enabled_for_site
+
+from .legacy_amc_helpers import get_amc_tier_info
+from .tier_info import TierInfo
+
+
+log = logging.getLogger(__name__)
+
+
+def is_tier_info_cache_enabled():
+    return getattr(settings, 'TAHOE_TIER_INFO_CACHE_ENABLED', False)
+
+
+def _get_ttl():
+    return getattr(settings, 'TAHOE_TIER_INFO_CACHE_TTL', 5 * 60)
+
+
+def _cache_key(site_uuid):
+    return 'tahoe_tier_info:{site_uuid}'.format(site_uuid=site_uuid)
+
+
+def _refresh_lock_key(site_uuid):
+    return 'tahoe_tier_info_refresh:{site_uuid}'.format(site_uuid=site_uuid)
+
+
+def fetch_tier_info(site_uuid):
+    """
+    Fetch the TierInfo of a site from AMC or the Site Configuration service without relying on the current request.
+    """
+    tier_info = get_amc_tier_info(site_uuid=site_uuid)
+    if tier_info:
+        return tier_info
+
+    try:
+        site = tahoe_sites.api.get_site_by_uuid(site_uuid)
+    except ObjectDoesNotExist:
+        return None
+
+    if not is_enabled_for_site(site):
+        return None
+
+    site_info = init_site_configuration_adapter(site, status='live').get_site_info()
+    return TierInfo(
+        tier=site_info['tier'],
+        subscription_ends=site_info['subscription_ends'],
+        always_active=site_info['always_active'],
+    )
+
+
+def refresh_cached_tier_info(site_uuid):
+    """
+    Fetch the TierInfo of a site and store it in the cache, `None` is cached too to avoid re-fetching missing tiers.
+    """
+    tier_info = fetch_tier_info(site_uuid)
+    cache.set(_cache_key(site_uuid), {
+        'tier_info': tier_info,
+        'refreshed_at': time.time(),
+    }, getattr(settings, 'TAHOE_TIER_INFO_CACHE_TIMEOUT', 24 * 60 * 60))
+    cache.delete(_refresh_lock_key(site_uuid))
+    return tier_info
+
+
+def schedule_tier_info_refresh(site_uuid):
+    """
+    Refresh the TierInfo of a site in a celery task, at most once per TTL period for each site.
+    """
+    from .tasks import refresh_tier_info  # Local import to avoid circular imports
+
+    if cache.add(_refresh_lock_key(site_uuid), 'true', _get_ttl()):
+        refresh_tier_info.delay(str(site_uuid))
+        return True
+    return False
+
+
+def invalidate_cached_tier_info(site_uuid):
+    """
+    Drop the cached TierInfo of a site so the next request fetches the updated tier.
+    """
+    cache.delete_many([_cache_key(site_uuid), _refresh_lock_key(site_uuid)])
+
+
+def clear_tier_info_cache_on_site_configuration_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `SiteConfiguration` saves.
+    """
+    try:
+        site_uuid = tahoe_sites.api.get_uuid_by_site(instance.site)
+    except ObjectDoesNotExist:
+        # The main site and sites without an organization have no TierInfo
+        return
+    invalidate_cached_tier_info(site_uuid)
+
+
+def clear_tier_info_cache_on_tier_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Signal handler for `Tier` saves.
+    """
+    invalidate_cached_tier_info(UUID(str(instance.organization.edx_uuid)))
+
+
+@beeline.traced('tahoe_tiers.tier_cache.get_cached_tier_info')
+def get_cached_tier_info(site_uuid):
+    """
+    Get the cached TierInfo of a site, stale entries are returned and refreshed in the background.
+    """
+    entry = cache.get(_cache_key(site_uuid))
+    if entry is None:
+        beeline.add_context_field('tier_info_cache', 'miss')
+        return refresh_cached_tier_info(site_uuid)
+
+    if time.time() - entry['refreshed_at'] > _get_ttl():
+        beeline.add_context_field('tier_info_cache', 'stale')
+        try:
+            schedule_tier_info_refresh(site_uuid)
+        except Exception:  # pylint: disable=broad-except
+            # Serving the stale TierInfo is better than failing the request if the broker is down.
+            log.exception('Error while scheduling the TierInfo refresh of %s', site_uuid)
+    else:
+        beeline.add_context_field('tier_info_cache', 'hit')
+
+    return entry['tier_info']
@@ -11,7 +11,6 @@ The following internal data structures are implemented:
 
 
 from copy import deepcopy
-from functools import partial
 from logging import getLogger
 
 import six
@@ -208,30 +207,42 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
+        old_block_relations = self._block_relations
+        reachable = self._get_reachable_block_keys()
+        if len(reachable) == len(old_block_relations):
+            return
 
         # Create a new block relations map to store only those blocks
-        # that are still linked
+        # that are still linked, keeping the order of their relations.
         pruned_block_relations = {}
-        old_block_relations = self._block_relations
-
-        # Build the structure from the leaves up by doing a post-order
-        # traversal of the old structure, thereby encountering only
-        # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
-
-                # Add a relationship to only those old children that
-                # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
+        for block_key in reachable:
+            old_relations = old_block_relations[block_key]
+            pruned_relations = _BlockRelations()
+            pruned_relations.parents = [parent for parent in old_relations.parents if parent in reachable]
+            pruned_relations.children = [child for child in old_relations.children if child in reachable]
+            pruned_block_relations[block_key] = pruned_relations
 
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
 
+    def _get_reachable_block_keys(self):
+        """
+        Returns the set of the keys of the blocks reachable from the
+        root block.
+        """
+        block_relations = self._block_relations
+        if self.root_block_usage_key not in block_relations:
+            return set()
+
+        reachable = {self.root_block_usage_key}
+        stack = [self.root_block_usage_key]
+        while stack:
+            for child in block_relations[stack.pop()].children:
+                if child not in reachable:
+                    reachable.add(child)
+                    stack.append(child)
+        return reachable
+
     def _add_relation(self, parent_key, child_key):
         """
         Adds a parent to child relationship in this block structure.
@@ -309,14 +320,35 @@ class FieldData(object):
         if self._is_own_field(field_name):
             return super(FieldData, self).__setattr__(field_name, field_value)
         else:
+            self._unshare_fields()
             self.fields[field_name] = field_value
 
     def __delattr__(self, field_name):
         if self._is_own_field(field_name):
             return super(FieldData, self).__delattr__(field_name)
         else:
+            self._unshare_fields()
             del self.fields[field_name]
 
+    def copy_on_write(self):
+        """
+        Returns a copy of this object sharing its fields dict until either
+        of them sets or deletes a field.
+        """
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied.__dict__['_shared_fields'] = True
+        self.__dict__['_shared_fields'] = True
+        return copied
+
+    def _unshare_fields(self):
+        """
+        Makes a private copy of the fields dict if it's shared with a copy.
+        """
+        if self.__dict__.get('_shared_fields'):
+            self.__dict__['fields'] = dict(self.fields)
+            self.__dict__['_shared_fields'] = False
+
     def _is_own_field(self, field_name):
         """
         Returns whether the given field_name is the name of an
@@ -363,6 +395,15 @@ class TransformerDataMap(dict):
             self[key] = new_transformer_data
             return new_transformer_data
 
+    def copy_on_write(self):
+        """
+        Returns a copy of this map with copy-on-write copies of its TransformerData.
+        """
+        return TransformerDataMap(
+            (transformer_name, transformer_data.copy_on_write())
+            for transformer_name, transformer_data in six.iteritems(self)
+        )
+
     def _translate_key(self, key):
         """
         Allows the given key to be either the transformer's class or name,
@@ -394,6 +435,11 @@ class BlockData(FieldData):
         # Map of transformer name to its block-specific data.
         self.transformer_data = TransformerDataMap()
 
+    def copy_on_write(self):
+        copied = super(BlockData, self).copy_on_write()
+        copied.transformer_data = self.transformer_data.copy_on_write()
+        return copied
+
 
 class BlockStructureBlockData(BlockStructure):
     """
@@ -430,6 +476,33 @@ class BlockStructureBlockData(BlockStructure):
             deepcopy(self._block_data_map),
         )
 
+    def copy_on_write(self):
+        """
+        Returns a new instance of BlockStructureBlockData which shares
+        the collected data of this instance until either of them changes
+        it, which is much cheaper than a deep-copy.
+
+        Only the block relations are copied right away. The xBlock fields
+        and transformer data of each block are copied the first time they
+        are set or deleted on either instance. Values are never copied, so
+        they must not be mutated in place.
+        """
+        from .factory import BlockStructureFactory
+        block_relations = {}
+        for usage_key, relations in six.iteritems(self._block_relations):
+            block_relations[usage_key] = _BlockRelations()
+            block_relations[usage_key].parents = list(relations.parents)
+            block_relations[usage_key].children = list(relations.children)
+        return BlockStructureFactory.create_new(
+            self.root_block_usage_key,
+            block_relations,
+            self.transformer_data.copy_on_write(),
+            {
+                usage_key: block_data.copy_on_write()
+                for usage_key, block_data in six.iteritems(self._block_data_map)
+            },
+        )
+
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
@@ -646,7 +719,7 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns a filter function that always returns True for all blocks.
         """
-        return lambda block_key: True
+        return _universal_filter
 
     def create_removal_filter(self, removal_condition, keep_descendants=False):
         """
@@ -661,11 +734,7 @@ class BlockStructureBlockData(BlockStructure):
             keep_descendants (bool) - See the description in
                 remove_block.
         """
-        return partial(
-            self.retain_or_remove,
-            removal_condition=removal_condition,
-            keep_descendants=keep_descendants,
-        )
+        return _RemovalFilter(self, removal_condition, keep_descendants)
 
     def retain_or_remove(self, block_key, removal_condition, keep_descendants=False):
         """
@@ -702,11 +771,83 @@ class BlockStructureBlockData(BlockStructure):
             keep_descendants (bool) - See the description in
                 remove_block.
         """
-        self.filter_topological_traversal(
-            filter_func=self.create_removal_filter(
-                removal_condition, keep_descendants
+        self.filter_blocks([self.create_removal_filter(removal_condition, keep_descendants)])
+
+    def filter_blocks(self, filters):
+        """
+        Applies the given filters to the blocks of this structure in a
+        single topological pass, where each block is filtered by all
+        of the filters until one of them doesn't retain it.  This is
+        equivalent to filter_topological_traversal with a filter that
+        'ands' the given filters together.
+
+        When all of the filters are created by create_universal_filter
+        or create_removal_filter, their removal conditions are evaluated
+        directly, without the overhead of chaining the filters and of
+        the generic graph traversal, and the blocks are removed after
+        the traversal.  So the removal conditions must not depend on
+        the relations of the blocks, which holds for the block and
+        transformer data they are based on.
+
+        Arguments:
+            filters ([(usage_key)->bool]) - The filter functions, see
+                filter_topological_traversal.
+        """
+        filters = [filter_func for filter_func in filters if filter_func is not _universal_filter]
+        if not filters:
+            return
+        if not all(isinstance(filter_func, _RemovalFilter) for filter_func in filters):
+            self.filter_topological_traversal(
+                lambda block_key: all(filter_func(block_key) for filter_func in filters)
             )
-        )
+            return
+
+        removal_conditions = [(filter_func.removal_condition, filter_func.keep_descendants) for filter_func in filters]
+        block_relations = self._block_relations
+        root_block_usage_key = self.root_block_usage_key
+        if root_block_usage_key not in block_relations:
+            return
+
+        # Whether each visited block is retained or removed with its
+        # descendants kept, in which case its children may be visited.
+        passes = {}
+        # Number of parents of each block that are yet to be visited.
+        unvisited_parents = {}
+        removed_blocks = []
+
+        stack = [root_block_usage_key]
+        while stack:
+            block_key = stack.pop()
+            relations = block_relations[block_key]
+
+            # Blocks whose parents are all removed are left to be pruned,
+            # along with their descendants.
+            if block_key is not root_block_usage_key and not any(passes[parent] for parent in relations.parents):
+                continue
+
+            passes[block_key] = True
+            for removal_condition, keep_descendants in removal_conditions:
+                if removal_condition(block_key):
+                    removed_blocks.append((block_key, keep_descendants))
+                    passes[block_key] = keep_descendants
+                    break
+
+            # Children are visited once all of their parents are, in
+            # their original order.
+            for child in reversed(relations.children):
+                remaining = unvisited_parents.get(child)
+                if remaining is None:
+                    remaining = len(block_relations[child].parents)
+                    if remaining == 1:
+                        stack.append(child)
+                        continue
+                remaining -= 1
+                unvisited_parents[child] = remaining
+                if not remaining:
+                    stack.append(child)
+
+        for block_key, keep_descendants in removed_blocks:
+            self.remove_block(block_key, keep_descendants)
 
     def filter_topological_traversal(self, filter_func, **kwargs):
         """
@@ -861,3 +1002,25 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         if hasattr(xblock, field_name):
             setattr(block_data, field_name, getattr(xblock, field_name))
+
+
+def _universal_filter(block_key):  # pylint: disable=unused-argument
+    """
+    A filter function that retains all blocks.
+    """
+    return True
+
+
+class _RemovalFilter(object):
+    """
+    A filter function that removes the blocks of a block structure
+    satisfying a removal condition, see
+    BlockStructureBlockData.create_removal_filter.
+    """
+    def __init__(self, block_structure, removal_condition, keep_descendants):
+        self.block_structure = block_structure
+        self.removal_condition = removal_condition
+        self.keep_descendants = keep_descendants
+
+    def __call__(self, block_key):
+        return self.block_structure.retain_or_remove(block_key, self.removal_condition, self.keep_descendants)
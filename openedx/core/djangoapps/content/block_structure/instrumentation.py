@@ -0,0 +1,127 @@
+"""
+Instrumentation of the cost of each Block Structure Transformer, for
+the collect and transform phases.
+
+Enabled by the block_structure.instrument_transformers waffle switch,
+which also sends the measurements to the monitoring custom metrics and
+to the beeline trace of the request or task.
+"""
+
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import beeline
+import six
+from edx_django_utils.monitoring import set_custom_metric
+
+from openedx.core.lib.cache_utils import zpickle
+
+from . import config
+
+# Names of the measured values.
+DURATION = u'duration'
+BLOCKS_REMOVED = u'blocks_removed'
+COLLECTED_BYTES = u'collected_bytes'
+
+
+def is_instrumentation_enabled():
+    """
+    Returns whether the transformers' collect and transform phases
+    are to be instrumented.
+    """
+    return config.waffle().is_enabled(config.INSTRUMENT_TRANSFORMERS)
+
+
+class TransformerMetrics(object):
+    """
+    Accumulates the measurements of each transformer for a phase
+    (collect or transform) of one or more block structures.
+    """
+    def __init__(self, phase):
+        """
+        Arguments:
+            phase (string) - The name of the measured phase, either
+                'collect' or 'transform'.
+        """
+        self.phase = phase
+
+        # Map of a transformer's name to its measurements.
+        # OrderedDict {string: {string: number}}
+        self.transformers = OrderedDict()
+
+    def record(self, transformer_name, **values):
+        """
+        Adds the given values to the measurements of the transformer
+        with the given name.
+        """
+        measurements = self.transformers.setdefault(transformer_name, OrderedDict())
+        for name, value in six.iteritems(values):
+            measurements[name] = measurements.get(name, 0) + value
+
+    def update(self, other):
+        """
+        Adds the measurements of the given TransformerMetrics to this one.
+        """
+        for transformer_name, measurements in six.iteritems(other.transformers):
+            self.record(transformer_name, **measurements)
+
+    @contextmanager
+    def measure(self, transformer_name, block_structure):
+        """
+        A context manager that records the wall time spent in it and
+        the number of blocks removed from the given block_structure
+        while in it, for the transformer with the given name.
+        """
+        num_blocks = len(block_structure)
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.record(
+                transformer_name,
+                **{
+                    DURATION: time.time() - start_time,
+                    BLOCKS_REMOVED: num_blocks - len(block_structure),
+                }
+            )
+
+    def measure_filter(self, transformer_name, block_structure, filter_func):
+        """
+        Returns a wrapper of the given block filter function of the
+        transformer with the given name, which measures each call.
+        """
+        def _measured_filter(block_key):
+            with self.measure(transformer_name, block_structure):
+                return filter_func(block_key)
+        return _measured_filter
+
+    def record_collected_size(self, transformer_name, block_structure):
+        """
+        Records the size of the data collected by the transformer with
+        the given name, as it is serialized in the store.
+        """
+        block_data = {
+            block_key: data.transformer_data.get(transformer_name)
+            for block_key, data in block_structure.iteritems()
+        }
+        collected_data = (block_structure.transformer_data.get(transformer_name), block_data)
+        self.record(transformer_name, **{COLLECTED_BYTES: len(zpickle(collected_data))})
+
+    def publish(self):
+        """
+        Sends the measurements to the custom metrics of the monitoring
+        transaction and to the current beeline trace.
+        """
+        for transformer_name, measurements in six.iteritems(self.transformers):
+            for name, value in six.iteritems(measurements):
+                metric_name = u'block_structure.{}.{}.{}'.format(self.phase, transformer_name, name)
+                set_custom_metric(metric_name, value)
+                beeline.add_context_field(metric_name, value)
+
+    def __str__(self):
+        return u', '.join(
+            u'{}: {:.3f}s'.format(transformer_name, measurements.get(DURATION, 0))
+            for transformer_name, measurements in six.iteritems(self.transformers)
+        )
@@ -4,13 +4,16 @@ Command to load course blocks.
 
 
 import logging
+import time
 
 import six
 from django.core.management.base import BaseCommand
+from django.db.models import Count
 import six
 from six import text_type
 
 import openedx.core.djangoapps.content.block_structure.api as api
+import openedx.core.djangoapps.content.block_structure.manager as manager
 import openedx.core.djangoapps.content.block_structure.store as store
 import openedx.core.djangoapps.content.block_structure.tasks as tasks
 from openedx.core.djangoapps.content.block_structure.config import STORAGE_BACKING_FOR_CACHE, waffle
@@ -19,6 +22,7 @@ from openedx.core.lib.command_utils import (
     parse_course_keys,
     validate_dependent_option
 )
+from student.models import CourseEnrollment
 from xmodule.modulestore.django import modulestore
 
 log = logging.getLogger(__name__)
@@ -29,6 +33,7 @@ class Command(BaseCommand):
     Example usage:
         $ ./manage.py lms generate_course_blocks --all_courses --settings=devstack
         $ ./manage.py lms generate_course_blocks 'edX/DemoX/Demo_Course' --settings=devstack
+        $ ./manage.py lms generate_course_blocks --all_courses --order_by_enrollment --enqueue_task --settings=devstack
     """
     args = u'<course_id course_id ...>'
     help = u'Generates and stores course blocks for one or more courses.'
@@ -78,6 +83,13 @@ class Command(BaseCommand):
             default=0,
             type=int,
         )
+        parser.add_argument(
+            '--order_by_enrollment',
+            help=u'Generate course blocks for the courses with the most active enrollments first, '
+                 u'e.g. to warm up the cache after it was flushed.',
+            action='store_true',
+            default=False,
+        )
         parser.add_argument(
             '--with_storage',
             help=u'Store the course blocks in Storage, overriding value of the storage_backing_for_cache waffle switch',
@@ -94,11 +106,15 @@ class Command(BaseCommand):
 
         if courses_mode == 'all_courses':
             course_keys = [course.id for course in modulestore().get_course_summaries()]
+            if options.get('order_by_enrollment'):
+                course_keys = self._order_by_enrollment(course_keys)
             if options.get('start_index'):
                 end = options.get('end_index') or len(course_keys)
                 course_keys = course_keys[options['start_index']:end]
         else:
             course_keys = parse_course_keys(options['courses'])
+            if options.get('order_by_enrollment'):
+                course_keys = self._order_by_enrollment(course_keys)
 
         self._set_log_levels(options)
 
@@ -126,8 +142,22 @@ class Command(BaseCommand):
             cache_log_level = logging.INFO
 
         log.setLevel(log_level)
+        manager.logger.setLevel(log_level)
         store.logger.setLevel(cache_log_level)
 
+    def _order_by_enrollment(self, course_keys):
+        """
+        Returns the given course_keys ordered by their number of active
+        enrollments, in decreasing order.
+        """
+        enrollment_counts = dict(
+            CourseEnrollment.objects.filter(
+                course_id__in=course_keys,
+                is_active=True,
+            ).values_list('course_id').annotate(count=Count('id')).order_by()
+        )
+        return sorted(course_keys, key=lambda course_key: enrollment_counts.get(course_key, 0), reverse=True)
+
     def _generate_course_blocks(self, options, course_keys):
         """
         Generates course blocks for the given course_keys per the given options.
@@ -159,6 +189,11 @@ class Command(BaseCommand):
             log.info(u'BlockStructure: ENQUEUED generating for course: %s, task_id: %s.', course_key, result.id)
         else:
             log.info(u'BlockStructure: STARTED generating for course: %s.', course_key)
+            start_time = time.time()
             action = api.update_course_in_cache if options.get('force_update') else api.get_course_in_cache
             action(course_key)
-            log.info(u'BlockStructure: FINISHED generating for course: %s.', course_key)
+            log.info(
+                u'BlockStructure: FINISHED generating for course: %s in %.3f seconds.',
+                course_key,
+                time.time() - start_time,
+            )
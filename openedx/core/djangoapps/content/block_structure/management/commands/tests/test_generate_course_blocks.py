@@ -15,6 +15,7 @@ from openedx.core.djangoapps.content.block_structure.tests.helpers import (
     is_course_in_block_structure_cache,
     is_course_in_block_structure_storage
 )
+from student.tests.factories import CourseEnrollmentFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
@@ -150,6 +151,28 @@ class TestGenerateCourseBlocks(ModuleStoreTestCase):
                     else:
                         self.assertNotIn('routing_key', task_options)
 
+    @ddt.data('all_courses', 'courses')
+    def test_order_by_enrollment(self, courses_mode):
+        CourseEnrollmentFactory.create(course_id=self.course_keys[1])
+        CourseEnrollmentFactory.create(course_id=self.course_keys[1])
+        CourseEnrollmentFactory.create(course_id=self.course_keys[0])
+        CourseEnrollmentFactory.create(course_id=self.course_keys[0], is_active=False)
+        if courses_mode == 'all_courses':
+            command_options = dict(all_courses=True)
+        else:
+            command_options = dict(courses=[six.text_type(course_key) for course_key in self.course_keys])
+
+        with patch(
+            'openedx.core.djangoapps.content.block_structure.management.commands.generate_course_blocks.tasks'
+        ) as mock_tasks:
+            self.command.handle(enqueue_task=True, order_by_enrollment=True, **command_options)
+            enqueued_course_ids = [
+                call_args[1]['kwargs']['course_id']
+                for call_args in mock_tasks.get_course_in_cache_v2.apply_async.call_args_list
+            ]
+            expected_course_ids = [six.text_type(self.course_keys[1]), six.text_type(self.course_keys[0])]
+            self.assertEqual(enqueued_course_ids, expected_course_ids)
+
     @patch('openedx.core.djangoapps.content.block_structure.management.commands.generate_course_blocks.log')
     def test_not_found_key(self, mock_log):
         self.command.handle(courses=['fake/course/id'])
@@ -4,9 +4,16 @@ BlockStructures.
 """
 
 
+import time
 from contextlib import contextmanager
+from logging import getLogger
+from uuid import uuid4
 
 import six
+from django.conf import settings
+
+from openedx.core.lib.cache_utils import ProcessLRUCache
+from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
@@ -14,6 +21,34 @@ from .factory import BlockStructureFactory
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Seconds between checks for a block structure collected by another process.
+COLLECT_WAIT_INTERVAL = 0.5
+
+# The fields of the root block which version the content of a block structure.
+CONTENT_VERSION_FIELDS = ('course_version', 'subtree_edited_on')
+
+# In-process cache of collected block structures, see _get_in_process_cache.
+_IN_PROCESS_CACHE = None
+
+
+def _get_in_process_cache():
+    """
+    Returns the per-process LRU cache of collected block structures, keyed by
+    their root usage key and content version, or None if it's disabled.
+
+    The cache is bounded by the total number of blocks of the cached
+    structures, since their memory footprint is proportional to it.
+    """
+    global _IN_PROCESS_CACHE  # pylint: disable=global-statement
+    max_blocks = settings.BLOCK_STRUCTURES_SETTINGS.get('IN_PROCESS_CACHE_MAX_BLOCKS', 0)
+    if not max_blocks:
+        return None
+    if _IN_PROCESS_CACHE is None or _IN_PROCESS_CACHE.max_weight != max_blocks:
+        _IN_PROCESS_CACHE = ProcessLRUCache(maxsize=max_blocks, max_weight=max_blocks)
+    return _IN_PROCESS_CACHE
+
 
 class BlockStructureManager(object):
     """
@@ -37,6 +72,8 @@ class BlockStructureManager(object):
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
         self.store = BlockStructureStore(cache)
+        self._cache = cache
+        self._collect_lock_token = None
 
     def get_transformed(self, transformers, starting_block_usage_key=None, collected_block_structure=None):
         """
@@ -94,6 +131,13 @@ class BlockStructureManager(object):
                 starting at root_block_usage_key, with collected data
                 from each registered transformer.
         """
+        in_process_cache = _get_in_process_cache()
+        cache_key = self._get_in_process_cache_key() if in_process_cache is not None else None
+        if cache_key is not None:
+            cached_response = in_process_cache.get_cached_response(cache_key)
+            if cached_response.is_found:
+                return cached_response.value.copy_on_write()
+
         try:
             block_structure = BlockStructureFactory.create_from_store(
                 self.root_block_usage_key,
@@ -101,12 +145,26 @@ class BlockStructureManager(object):
             )
             BlockStructureTransformers.verify_versions(block_structure)
 
+            # The stored data may be older than the content until it's
+            # updated by the course publish task, don't cache it if so.
+            if cache_key is not None and self.store.get_collected_content_version(block_structure) != cache_key[1]:
+                cache_key = None
+
         except (BlockStructureNotFound, TransformerDataIncompatible):
             if config.waffle().is_enabled(config.RAISE_ERROR_WHEN_NOT_FOUND):
                 raise
+            elif config.waffle().is_enabled(config.SINGLE_FLIGHT_COLLECTION):
+                block_structure, collected = self._update_collected_single_flight()
+                if not collected:
+                    cache_key = None
             else:
                 block_structure = self._update_collected()
 
+        if cache_key is not None:
+            # Cache a copy since the caller may transform the returned structure.
+            in_process_cache.set(cache_key, block_structure.copy_on_write(), weight=len(block_structure))
+            # Remember the latest version, to serve it while the next one is collected.
+            in_process_cache.set(cache_key[0], cache_key)
         return block_structure
 
     def update_collected_if_needed(self):
@@ -116,7 +174,10 @@ class BlockStructureManager(object):
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                if config.waffle().is_enabled(config.SINGLE_FLIGHT_COLLECTION):
+                    self._update_collected_if_needed_single_flight()
+                else:
+                    self._update_collected()
 
     def _update_collected(self):
         """
@@ -124,20 +185,173 @@ class BlockStructureManager(object):
         the modulestore.
         """
         with self._bulk_operations():
+            start_time = time.time()
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
             )
-            BlockStructureTransformers.collect(block_structure)
+            load_time = time.time() - start_time
+            # Collect the content version with the data, to tell which
+            # version of the content the stored data was collected from.
+            block_structure.request_xblock_fields(*CONTENT_VERSION_FIELDS)
+            collect_metrics = BlockStructureTransformers.collect(block_structure)
             self.store.add(block_structure)
+            logger.info(
+                u"BlockStructure: Collected %s in %.3f seconds; modulestore: %.3f, transformers: %s.",
+                self.root_block_usage_key,
+                time.time() - start_time,
+                load_time,
+                collect_metrics,
+            )
             return block_structure
 
+    def _update_collected_single_flight(self):
+        """
+        Updates the store like _update_collected, unless another process
+        is already doing so for the same root block key, in which case
+        its result is awaited instead of collecting the data again.
+
+        While waiting, the previous version of the block structure is
+        returned if this process still has it in its in-process cache.
+
+        Returns:
+            (BlockStructureBlockData, bool) - The collected block
+                structure and whether it was collected by this call.
+        """
+        if self._acquire_collect_lock():
+            try:
+                return self._update_collected(), True
+            finally:
+                self._release_collect_lock()
+
+        previous_version = self._get_previous_version_in_process()
+        if previous_version is not None:
+            logger.info(
+                u"BlockStructure: Serving previous version while collected by another process; %s.",
+                self.root_block_usage_key,
+            )
+            return previous_version, False
+
+        deadline = time.time() + settings.BLOCK_STRUCTURES_SETTINGS.get('COLLECT_WAIT_TIMEOUT', 10)
+        while time.time() < deadline:
+            time.sleep(COLLECT_WAIT_INTERVAL)
+            try:
+                block_structure = BlockStructureFactory.create_from_store(self.root_block_usage_key, self.store)
+                BlockStructureTransformers.verify_versions(block_structure)
+                return block_structure, False
+            except (BlockStructureNotFound, TransformerDataIncompatible):
+                if self._cache.get(self._get_collect_lock_key()) is None:
+                    # The other process failed or was cleared
+                    break
+
+        logger.warning(
+            u"BlockStructure: Collecting after waiting for another process; %s.",
+            self.root_block_usage_key,
+        )
+        return self._update_collected(), True
+
+    def _update_collected_if_needed_single_flight(self):
+        """
+        Updates the store like update_collected_if_needed, holding the
+        same lock as _update_collected_single_flight so that a rebuild
+        and a concurrent cache miss collect the data only once.
+
+        If another process is already collecting, it's awaited and the
+        data is collected again only if it's still outdated.
+        """
+        is_locked = self._acquire_collect_lock()
+        deadline = time.time() + settings.BLOCK_STRUCTURES_SETTINGS.get('COLLECT_WAIT_TIMEOUT', 10)
+        while not is_locked and time.time() < deadline:
+            time.sleep(COLLECT_WAIT_INTERVAL)
+            is_locked = self._acquire_collect_lock()
+
+        if not is_locked:
+            logger.warning(
+                u"BlockStructure: Collecting after waiting for another process; %s.",
+                self.root_block_usage_key,
+            )
+        try:
+            if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
+                self._update_collected()
+        finally:
+            if is_locked:
+                self._release_collect_lock()
+
+    def _get_collect_lock_key(self):
+        """
+        Returns the cache key of the lock held while collecting the
+        block structure.
+        """
+        return u'block_structure.collect_lock.{}'.format(self.root_block_usage_key)
+
+    def _acquire_collect_lock(self):
+        """
+        Acquires the collection lock of the block structure, returns
+        whether it was acquired.
+
+        The lock holds a token unique to this acquisition, so that it's
+        not released by this process once it expired and was acquired
+        by another process.
+        """
+        lock_timeout = settings.BLOCK_STRUCTURES_SETTINGS.get('COLLECT_LOCK_TIMEOUT', 300)
+        self._collect_lock_token = uuid4().hex
+        return self._cache.add(self._get_collect_lock_key(), self._collect_lock_token, lock_timeout)
+
+    def _release_collect_lock(self):
+        """
+        Releases the collection lock of the block structure, unless it
+        was acquired by another process after it expired.
+        """
+        lock_key = self._get_collect_lock_key()
+        if self._cache.get(lock_key) == self._collect_lock_token:
+            self._cache.delete(lock_key)
+        else:
+            logger.warning(
+                u"BlockStructure: Collect lock expired before the collection finished; %s.",
+                self.root_block_usage_key,
+            )
+
+    def _get_previous_version_in_process(self):
+        """
+        Returns a copy of the latest version of the block structure
+        in the in-process cache, if any.
+        """
+        in_process_cache = _get_in_process_cache()
+        if in_process_cache is None:
+            return None
+        latest_cache_key = in_process_cache.get_cached_response(six.text_type(self.root_block_usage_key))
+        if not latest_cache_key.is_found:
+            return None
+        cached_response = in_process_cache.get_cached_response(latest_cache_key.value)
+        if not cached_response.is_found:
+            return None
+        return cached_response.value.copy_on_write()
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
         root block key.
         """
         self.store.delete(self.root_block_usage_key)
+        in_process_cache = _get_in_process_cache()
+        if in_process_cache is not None:
+            in_process_cache.delete(six.text_type(self.root_block_usage_key))
+            cache_key = self._get_in_process_cache_key()
+            if cache_key is not None:
+                in_process_cache.delete(cache_key)
+
+    def _get_in_process_cache_key(self):
+        """
+        Returns the key of the block structure in the in-process cache,
+        or None if its content version isn't known.
+        """
+        try:
+            content_version = self.store.get_content_version(self.root_block_usage_key, self.modulestore)
+        except ItemNotFoundError:
+            return None
+        if content_version is None:
+            return None
+        return (six.text_type(self.root_block_usage_key), content_version)
 
     @contextmanager
     def _bulk_operations(self):
@@ -0,0 +1,432 @@
+"""
+Columnar serialization format for collected BlockStructures.
+
+The default format of the BlockStructureStore zpickles the whole structure, so
+every cache hit unpickles all the collected data even if the request needs only
+a few fields. This format splits the structure into separately compressed
+sections:
+
+    keys - The usage keys of all the blocks, as text. Blocks are referred to by
+        their index in this list in the other sections.
+    relations - The children and parents of each block as integer adjacency
+        arrays.
+    transformer_data - The non-block-specific data of all the transformers.
+    field:<name> - The collected values of an xBlock field for all the blocks.
+    transformer:<name> - The block-specific data of a transformer for all the
+        blocks.
+
+The keys, relations and transformer_data sections are decoded right away. The
+field and transformer sections are only decoded the first time one of their
+values is accessed on any block of the structure.
+
+The serialized data starts with MAGIC and FORMAT_VERSION so it can be told
+apart from the zpickle format, and so that data written with an unknown
+version is rejected rather than misread.
+"""
+
+
+import json
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+import six
+from opaque_keys.edx.keys import UsageKey
+
+from .block_structure import BlockData, BlockStructureBlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+MAGIC = b'BSCF'
+
+# Increment this whenever the layout of the sections changes.
+FORMAT_VERSION = 1
+
+# Magic, format version and length of the JSON table of contents.
+_HEADER = struct.Struct('>4sHI')
+
+_KEYS_SECTION = u'keys'
+_RELATIONS_SECTION = u'relations'
+_TRANSFORMER_DATA_SECTION = u'transformer_data'
+_FIELD_SECTION_PREFIX = u'field:'
+_TRANSFORMER_SECTION_PREFIX = u'transformer:'
+
+_PICKLE_PROTOCOL = 4
+
+
+class ColumnarFormatError(Exception):
+    """
+    Raised when the given data can't be decoded with this format.
+    """
+    pass
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data uses this format.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Returns the columnar serialization of the given BlockStructureBlockData.
+    """
+    # pylint: disable=protected-access
+    # Blocks with relations come first, followed by the ones that only have block data.
+    related_keys = list(block_structure._block_relations)
+    block_keys = related_keys + [
+        block_key for block_key in block_structure._block_data_map if block_key not in block_structure._block_relations
+    ]
+    indices = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    children_offsets, children = _adjacency_arrays(related_keys, indices, block_structure._block_relations, 'children')
+    parents_offsets, parents = _adjacency_arrays(related_keys, indices, block_structure._block_relations, 'parents')
+
+    field_columns = {}
+    transformer_columns = {}
+    blocks_with_data = array('I')
+    for block_key, block_data in six.iteritems(block_structure._block_data_map):
+        index = indices[block_key]
+        blocks_with_data.append(index)
+        for field_name, value in six.iteritems(block_data.fields):
+            column_indices, column_values = field_columns.setdefault(field_name, (array('I'), []))
+            column_indices.append(index)
+            column_values.append(value)
+        for transformer_name, transformer_block_data in six.iteritems(block_data.transformer_data):
+            transformer_columns.setdefault(transformer_name, {})[index] = dict(transformer_block_data.fields)
+
+    sections = [
+        (_KEYS_SECTION, u'\n'.join(six.text_type(block_key) for block_key in block_keys).encode('utf-8')),
+        (_RELATIONS_SECTION, b''.join(_to_bytes(arr) for arr in (
+            array('I', [len(block_keys), len(related_keys), len(children), len(parents), len(blocks_with_data)]),
+            children_offsets, children, parents_offsets, parents, blocks_with_data,
+        ))),
+        (_TRANSFORMER_DATA_SECTION, pickle.dumps({
+            name: dict(transformer_data.fields)
+            for name, transformer_data in six.iteritems(block_structure.transformer_data)
+        }, _PICKLE_PROTOCOL)),
+    ]
+    sections.extend(
+        (_FIELD_SECTION_PREFIX + field_name, pickle.dumps((_to_bytes(column_indices), values), _PICKLE_PROTOCOL))
+        for field_name, (column_indices, values) in sorted(six.iteritems(field_columns))
+    )
+    sections.extend(
+        (_TRANSFORMER_SECTION_PREFIX + transformer_name, pickle.dumps(column, _PICKLE_PROTOCOL))
+        for transformer_name, column in sorted(six.iteritems(transformer_columns))
+    )
+
+    table_of_contents = []
+    body = []
+    offset = 0
+    for name, data in sections:
+        compressed = zlib.compress(data)
+        table_of_contents.append([name, offset, len(compressed)])
+        body.append(compressed)
+        offset += len(compressed)
+
+    table_of_contents = json.dumps(table_of_contents).encode('utf-8')
+    return b''.join([_HEADER.pack(MAGIC, FORMAT_VERSION, len(table_of_contents)), table_of_contents] + body)
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Returns the BlockStructureBlockData for the given columnar serialization.
+
+    Raises:
+        ColumnarFormatError if the data is not in a supported version of the format.
+    """
+    try:
+        magic, version, table_of_contents_length = _HEADER.unpack_from(serialized_data)
+    except struct.error:
+        raise ColumnarFormatError(u'Truncated header')
+    if magic != MAGIC:
+        raise ColumnarFormatError(u'Not a columnar block structure')
+    if version != FORMAT_VERSION:
+        raise ColumnarFormatError(u'Unsupported format version {}'.format(version))
+
+    body_offset = _HEADER.size + table_of_contents_length
+    table_of_contents = json.loads(serialized_data[_HEADER.size:body_offset].decode('utf-8'))
+    sections = {
+        name: serialized_data[body_offset + offset:body_offset + offset + length]
+        for name, offset, length in table_of_contents
+    }
+
+    try:
+        block_keys = _decode_keys(_decompress(sections.pop(_KEYS_SECTION)), root_block_usage_key)
+        relations = _decompress(sections.pop(_RELATIONS_SECTION))
+        transformer_data = pickle.loads(_decompress(sections.pop(_TRANSFORMER_DATA_SECTION)))
+    except KeyError as error:
+        raise ColumnarFormatError(u'Missing section {}'.format(error))
+
+    block_relations, blocks_with_data = _decode_relations(relations, block_keys)
+    block_structure = BlockStructureBlockData(root_block_usage_key)
+    block_structure._block_relations = block_relations  # pylint: disable=protected-access
+
+    block_structure.transformer_data = TransformerDataMap()
+    for transformer_name, fields in six.iteritems(transformer_data):
+        block_structure.transformer_data[transformer_name] = _transformer_data(fields)
+
+    blocks = [None] * len(block_keys)
+    loader = _LazySectionLoader(sections, blocks)
+    block_data_map = {}
+    for index in blocks_with_data:
+        block_data = BlockData(block_keys[index])
+        block_data.fields = _LazyFields(loader)
+        block_data.transformer_data = _LazyTransformerDataMap(loader)
+        blocks[index] = block_data
+        block_data_map[block_keys[index]] = block_data
+    block_structure._block_data_map = block_data_map  # pylint: disable=protected-access
+    return block_structure
+
+
+def _adjacency_arrays(related_keys, indices, block_relations, relation_name):
+    """
+    Returns the (offsets, targets) integer arrays of the given relation, where the
+    targets of the block at index i are targets[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array('I', [0])
+    targets = array('I')
+    for block_key in related_keys:
+        targets.extend(indices[target] for target in getattr(block_relations[block_key], relation_name))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _to_bytes(arr):
+    """
+    Returns the little-endian bytes of the given integer array.
+    """
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_bytes(data, start=0, count=None):
+    """
+    Returns the integer array stored in the given little-endian bytes.
+    """
+    arr = array('I')
+    end = len(data) if count is None else start + count * arr.itemsize
+    arr.frombytes(data[start:end])
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _decompress(data):
+    try:
+        return zlib.decompress(data)
+    except zlib.error as error:
+        raise ColumnarFormatError(six.text_type(error))
+
+
+def _decode_keys(data, root_block_usage_key):
+    """
+    Returns the list of usage keys stored in the keys section.
+    """
+    block_keys = [UsageKey.from_string(key) for key in data.decode('utf-8').split(u'\n')]
+    if root_block_usage_key.deprecated:
+        # Old Mongo keys don't include the course run, so add it back in.
+        block_keys = [block_key.map_into_course(root_block_usage_key.course_key) for block_key in block_keys]
+    return block_keys
+
+
+def _decode_relations(data, block_keys):
+    """
+    Returns the block relations map and the indices of the blocks with block
+    data stored in the relations section.
+    """
+    item_size = array('I').itemsize
+    num_blocks, num_related, num_children, num_parents, num_blocks_with_data = _from_bytes(data, 0, 5)
+    if num_blocks != len(block_keys):
+        raise ColumnarFormatError(u'Mismatched number of blocks')
+
+    arrays = []
+    start = 5 * item_size
+    for count in (num_related + 1, num_children, num_related + 1, num_parents, num_blocks_with_data):
+        arrays.append(_from_bytes(data, start, count))
+        start += count * item_size
+    children_offsets, children, parents_offsets, parents, blocks_with_data = arrays
+
+    block_relations = {}
+    for index in range(num_related):
+        relations = _BlockRelations()
+        relations.children = [block_keys[i] for i in children[children_offsets[index]:children_offsets[index + 1]]]
+        relations.parents = [block_keys[i] for i in parents[parents_offsets[index]:parents_offsets[index + 1]]]
+        block_relations[block_keys[index]] = relations
+    return block_relations, blocks_with_data
+
+
+def _transformer_data(fields):
+    transformer_data = TransformerData()
+    transformer_data.fields = fields
+    return transformer_data
+
+
+class _LazySectionLoader(object):
+    """
+    Decodes the field and transformer sections of a structure on demand and
+    stores their values on all the blocks of the structure.
+    """
+    def __init__(self, sections, blocks):
+        self._sections = sections
+        self._blocks = blocks
+
+    def load_field(self, field_name):
+        data = self._sections.pop(_FIELD_SECTION_PREFIX + field_name, None)
+        if data is None:
+            return
+        column_indices, values = pickle.loads(_decompress(data))
+        for index, value in zip(_from_bytes(column_indices), values):
+            dict.__setitem__(self._blocks[index].fields, field_name, value)
+
+    def load_transformer(self, transformer_name):
+        data = self._sections.pop(_TRANSFORMER_SECTION_PREFIX + transformer_name, None)
+        if data is None:
+            return
+        for index, fields in six.iteritems(pickle.loads(_decompress(data))):
+            dict.__setitem__(self._blocks[index].transformer_data, transformer_name, _transformer_data(fields))
+
+    def load_all_fields(self):
+        for section_name in list(self._sections):
+            if section_name.startswith(_FIELD_SECTION_PREFIX):
+                self.load_field(section_name[len(_FIELD_SECTION_PREFIX):])
+
+    def load_all_transformers(self):
+        for section_name in list(self._sections):
+            if section_name.startswith(_TRANSFORMER_SECTION_PREFIX):
+                self.load_transformer(section_name[len(_TRANSFORMER_SECTION_PREFIX):])
+
+
+class _LazySectionDict(dict):
+    """
+    Base class for the dicts of a block whose entries are decoded from a section
+    the first time they are accessed. Accessing all the entries, copying or
+    pickling decodes all the pending sections and behaves like a plain dict.
+    """
+    def __init__(self, loader):
+        super(_LazySectionDict, self).__init__()
+        self._loader = loader
+
+    def _section_name(self, key):
+        return key
+
+    def _load(self, name):
+        raise NotImplementedError
+
+    def _load_all(self):
+        raise NotImplementedError
+
+    def _plain_dict(self):
+        self._load_all()
+        return {key: dict.__getitem__(self, key) for key in dict.keys(self)}
+
+    def __missing__(self, key):
+        self._load(key)
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        key = self._section_name(key)
+        self._load(key)
+        return dict.__contains__(self, key)
+
+    def __setitem__(self, key, value):
+        key = self._section_name(key)
+        self._load(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        key = self._section_name(key)
+        self._load(key)
+        dict.__delitem__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        key = self._section_name(key)
+        self._load(key)
+        return dict.pop(self, key, *args)
+
+    def setdefault(self, key, default=None):
+        key = self._section_name(key)
+        self._load(key)
+        return dict.setdefault(self, key, default)
+
+    def __iter__(self):
+        self._load_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._load_all()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        if isinstance(other, _LazySectionDict):
+            other = other._plain_dict()  # pylint: disable=protected-access
+        return self._plain_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._plain_dict())
+
+    def keys(self):
+        self._load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._load_all()
+        return dict.values(self)
+
+    def items(self):
+        self._load_all()
+        return dict.items(self)
+
+    def update(self, *args, **kwargs):
+        for key, value in six.iteritems(dict(*args, **kwargs)):
+            self[key] = value
+
+    def copy(self):
+        return self._plain_dict()
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (self._plain_dict(),))
+
+
+class _LazyFields(_LazySectionDict):
+    """
+    The xBlock fields of a block, decoded per field.
+    """
+    def _load(self, name):
+        self._loader.load_field(name)
+
+    def _load_all(self):
+        self._loader.load_all_fields()
+
+
+class _LazyTransformerDataMap(_LazySectionDict, TransformerDataMap):
+    """
+    The transformer data of a block, decoded per transformer.
+    """
+    def _section_name(self, key):
+        return self._translate_key(key)
+
+    def _load(self, name):
+        self._loader.load_transformer(self._translate_key(name))
+
+    def _load_all(self):
+        self._loader.load_all_transformers()
+
+    def __reduce_ex__(self, protocol):
+        return (TransformerDataMap, (self._plain_dict(),))
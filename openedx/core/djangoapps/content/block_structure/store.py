@@ -11,7 +11,7 @@ import six
 from django.utils.encoding import python_2_unicode_compatible
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -131,6 +131,33 @@ class BlockStructureStore(object):
 
         return False
 
+    def get_content_version(self, root_block_usage_key, modulestore):
+        """
+        Returns a hashable version of the content of the block structure
+        for the given key in the given modulestore, including the current
+        schema state of the Transformers and BlockStructure classes.
+        Returns None if the modulestore doesn't version the content.
+        """
+        return self._content_version_of_block(modulestore.get_item(root_block_usage_key))
+
+    def get_collected_content_version(self, block_structure):
+        """
+        Returns the version of the content the given block structure was
+        collected from, in the format of get_content_version, or None if
+        the version wasn't collected along with the block structure.
+        """
+        return self._content_version_of_block(block_structure[block_structure.root_block_usage_key])
+
+    def _content_version_of_block(self, root_block):
+        """
+        Returns a hashable version of the content of the given root block,
+        or None if it isn't versioned.
+        """
+        version_data = self._version_data_of_block(root_block)
+        if version_data['data_version'] is None and version_data['data_edit_timestamp'] is None:
+            return None
+        return tuple(sorted(six.iteritems(version_data)))
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -196,6 +223,9 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        if config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION):
+            return serialization.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -206,7 +236,16 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+        Both the zpickled and the columnar formats are supported, so the
+        cached data stays readable when switching between them.
         """
+        if serialization.is_columnar(serialized_data):
+            try:
+                return serialization.deserialize(serialized_data, root_block_usage_key)
+            except Exception:
+                bs_model = self._get_model(root_block_usage_key)
+                logger.exception(u"BlockStructure: Failed to load columnar data from cache for %s", bs_model)
+                raise BlockStructureNotFound(bs_model.data_usage_key)
 
         try:
             block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
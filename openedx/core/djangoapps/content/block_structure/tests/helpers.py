@@ -131,6 +131,18 @@ class MockCache(object):
         self.map[key] = val
         self.timeout_from_last_call = timeout
 
+    def add(self, key, val, timeout):
+        """
+        Associates the given key with the given value in the cache,
+        only if the key isn't already in the cache.
+
+        Returns whether the value was added.
+        """
+        if key in self.map:
+            return False
+        self.map[key] = val
+        return True
+
     def get(self, key, default=None):
         """
         Returns the value associated with the given key in the cache;
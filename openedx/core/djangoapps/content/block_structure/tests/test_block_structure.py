@@ -268,6 +268,61 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            [{1}, {2}, {3}, {1, 4}, {2, 3}],
+            [
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+        )
+    )
+    @ddt.unpack
+    def test_filter_blocks(self, keep_descendants, blocks_to_remove, children_map):
+        def _create_filters(block_structure):
+            """
+            Returns the filters to apply to the given block structure.
+            """
+            return [
+                block_structure.create_universal_filter(),
+                block_structure.create_removal_filter(lambda block: block in blocks_to_remove, keep_descendants),
+                block_structure.create_removal_filter(lambda block: block == 5),
+            ]
+
+        # The blocks filtered by a topological traversal with the combined filters
+        expected_structure = self.create_block_structure(children_map)
+        expected_filters = _create_filters(expected_structure)
+        expected_structure.filter_topological_traversal(
+            lambda block: all(filter_func(block) for filter_func in expected_filters)
+        )
+        expected_structure._prune_unreachable()
+
+        block_structure = self.create_block_structure(children_map)
+        block_structure.filter_blocks(_create_filters(block_structure))
+        block_structure._prune_unreachable()
+
+        self.assertEqual(set(block_structure), set(expected_structure))
+        for block in expected_structure:
+            self.assertEqual(block_structure.get_children(block), expected_structure.get_children(block))
+            self.assertEqual(set(block_structure.get_parents(block)), set(expected_structure.get_parents(block)))
+
+    def test_filter_blocks_with_other_filters(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        filtered_blocks = []
+
+        def _filter(block):
+            """
+            A filter that records the filtered blocks.
+            """
+            filtered_blocks.append(block)
+            return True
+
+        block_structure.filter_blocks([_filter, block_structure.create_removal_filter(lambda block: block == 1)])
+        self.assertEqual(filtered_blocks, [0, 1, 2])
+        block_structure._prune_unreachable()
+        self.assert_block_structure(block_structure, [[2], [], [], [], []], missing_blocks=[1, 3, 4])
+
     def test_copy(self):
         def _set_value(structure, value):
             """
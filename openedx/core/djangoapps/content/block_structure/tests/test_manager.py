@@ -5,10 +5,13 @@ Tests for manager.py
 
 import ddt
 import six
+from django.conf import settings
 from django.test import TestCase
+from mock import patch
 
+from .. import manager
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import RAISE_ERROR_WHEN_NOT_FOUND, SINGLE_FLIGHT_COLLECTION, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -226,3 +229,148 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         assert TestTransformer1.collect_call_count == 2
+
+    @patch.object(manager, '_IN_PROCESS_CACHE', None)
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'IN_PROCESS_CACHE_MAX_BLOCKS': 100})
+    def test_get_collected_in_process(self):
+        root_block = self.modulestore.blocks[self.block_key_factory(0)]
+        root_block.field_map['course_version'] = 'version1'
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+
+        # served from the process even when the shared cache is emptied
+        self.cache.map.clear()
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_collected()
+        self.assert_block_structure(block_structure, self.children_map)
+        TestTransformer1.assert_collected(block_structure)
+        assert TestTransformer1.collect_call_count == 1
+
+        # changes to the returned structure don't affect the cached one
+        block_structure.remove_block(self.block_key_factory(1), keep_descendants=False)
+        block_structure.override_xblock_field(self.block_key_factory(2), 'display_name', 'changed')
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_collected()
+        self.assert_block_structure(block_structure, self.children_map)
+        assert block_structure.get_xblock_field(self.block_key_factory(2), 'display_name') is None
+
+        # new content versions are re-collected
+        root_block.field_map['course_version'] = 'version2'
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        assert TestTransformer1.collect_call_count == 2
+
+    @patch.object(manager, '_IN_PROCESS_CACHE', None)
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'IN_PROCESS_CACHE_MAX_BLOCKS': 100})
+    def test_get_collected_in_process_from_store(self):
+        root_block = self.modulestore.blocks[self.block_key_factory(0)]
+        root_block.field_map['course_version'] = 'version1'
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+            # store hits are cached in the process, even without storage backing
+            self.bs_manager.get_collected()
+            self.cache.map.clear()
+            block_structure = self.bs_manager.get_collected()
+        self.assert_block_structure(block_structure, self.children_map)
+        TestTransformer1.assert_collected(block_structure)
+        assert TestTransformer1.collect_call_count == 1
+
+        # but not when the stored data is older than the content
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+            root_block.field_map['course_version'] = 'version2'
+            self.bs_manager.get_collected()
+            self.cache.map.clear()
+            self.bs_manager.get_collected()
+        assert TestTransformer1.collect_call_count == 3
+
+    @patch.object(manager, '_IN_PROCESS_CACHE', None)
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'IN_PROCESS_CACHE_MAX_BLOCKS': 100})
+    def test_clear_in_process(self):
+        self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'version1'
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.bs_manager.clear()
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        assert TestTransformer1.collect_call_count == 2
+
+    def lock_collection_in_other_process(self):
+        """
+        Acquires the collection lock of the block structure, as if
+        another process was collecting it.
+        """
+        self.cache.add(u'block_structure.collect_lock.{}'.format(self.block_key_factory(0)), u'true', 300)
+
+    def test_single_flight_collect(self):
+        with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+            self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+            self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        assert not any(u'collect_lock' in key for key in self.cache.map)
+        assert TestTransformer1.collect_call_count == 1
+
+    @patch.object(manager.time, 'sleep')
+    def test_single_flight_waits_for_other_process(self, mock_sleep):
+        other_process_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, self.cache)
+        # pylint: disable=protected-access
+        mock_sleep.side_effect = lambda seconds: other_process_manager._update_collected()
+        self.lock_collection_in_other_process()
+
+        with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                block_structure = self.bs_manager.get_collected()
+        self.assert_block_structure(block_structure, self.children_map)
+        TestTransformer1.assert_collected(block_structure)
+        assert mock_sleep.call_count == 1
+        assert TestTransformer1.collect_call_count == 1
+
+    @patch.object(manager.time, 'sleep')
+    def test_single_flight_update_waits_for_other_process(self, mock_sleep):
+        other_process_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, self.cache)
+
+        def collect_in_other_process(seconds):  # pylint: disable=unused-argument
+            other_process_manager._update_collected()  # pylint: disable=protected-access
+            self.cache.delete(u'block_structure.collect_lock.{}'.format(self.block_key_factory(0)))
+
+        mock_sleep.side_effect = collect_in_other_process
+        self.lock_collection_in_other_process()
+
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+                with mock_registered_transformers(self.registered_transformers):
+                    self.bs_manager.update_collected_if_needed()
+        assert mock_sleep.call_count == 1
+        assert TestTransformer1.collect_call_count == 1
+        assert not any(u'collect_lock' in key for key in self.cache.map)
+
+    def test_single_flight_keeps_lock_of_other_process(self):
+        lock_key = u'block_structure.collect_lock.{}'.format(self.block_key_factory(0))
+        collect = TestTransformer1.collect
+
+        def lock_expired_during_collect(block_structure):
+            # Another process acquired the lock after it expired
+            self.cache.delete(lock_key)
+            self.lock_collection_in_other_process()
+            collect(block_structure)
+
+        with patch.object(TestTransformer1, 'collect', side_effect=lock_expired_during_collect):
+            with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+                self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        assert self.cache.get(lock_key) == u'true'
+
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'COLLECT_WAIT_TIMEOUT': 0})
+    def test_single_flight_wait_timeout(self):
+        self.lock_collection_in_other_process()
+        with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+            self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        assert TestTransformer1.collect_call_count == 1
+
+    @patch.object(manager, '_IN_PROCESS_CACHE', None)
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'IN_PROCESS_CACHE_MAX_BLOCKS': 100})
+    def test_single_flight_serves_previous_version(self):
+        root_block = self.modulestore.blocks[self.block_key_factory(0)]
+        root_block.field_map['course_version'] = 'version1'
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+
+        root_block.field_map['course_version'] = 'version2'
+        self.cache.map.clear()
+        self.lock_collection_in_other_process()
+        with waffle().override(SINGLE_FLIGHT_COLLECTION, active=True):
+            self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=False)
+        assert TestTransformer1.collect_call_count == 1
@@ -0,0 +1,122 @@
+"""
+Tests for serialization.py
+"""
+# pylint: disable=protected-access
+
+
+import pickle
+import struct
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+from mock import patch
+
+from .. import serialization
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization of BlockStructures.
+    """
+    def create_collected_structure(self, children_map):
+        """
+        Returns a block structure for the children_map with collected
+        xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)
+            block_data.display_name = u'Block {}'.format(block_id)
+            if block_id % 2:
+                block_data.due = datetime(2020, 1, block_id + 1)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id)
+        return block_structure
+
+    def assert_same_block_data(self, block_structure, expected_structure):
+        """
+        Verifies that the block and transformer data of the given structures match.
+        """
+        self.assertEqual(
+            block_structure.get_transformer_data(MockTransformer, '_version'),
+            expected_structure.get_transformer_data(MockTransformer, '_version'),
+        )
+        self.assertEqual(set(block_structure._block_data_map), set(expected_structure._block_data_map))
+        for block_key, expected_block_data in expected_structure.iteritems():
+            self.assertEqual(dict(block_structure[block_key].fields), expected_block_data.fields)
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                expected_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_structure(children_map)
+        serialized_data = serialization.serialize(block_structure)
+        self.assertTrue(serialization.is_columnar(serialized_data))
+
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_block_structure(deserialized, children_map)
+        self.assert_same_block_data(deserialized, block_structure)
+
+    def test_fields_are_decoded_on_access(self):
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = serialization.serialize(block_structure)
+
+        with patch.object(serialization.pickle, 'loads', wraps=pickle.loads) as mock_loads:
+            deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+            self.assertEqual(mock_loads.call_count, 1)  # Only the structure-level transformer data
+
+            for block_key in deserialized:
+                deserialized.get_xblock_field(block_key, 'display_name')
+            self.assertEqual(mock_loads.call_count, 2)
+
+            block_key = self.block_key_factory(3)
+            self.assertEqual(deserialized.get_transformer_block_field(block_key, MockTransformer, 'test'), 3)
+            self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(0), 'due', 'missing'), 'missing')
+            self.assertEqual(mock_loads.call_count, 4)
+
+    def test_changes_before_decoding(self):
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serialization.deserialize(
+            serialization.serialize(block_structure), block_structure.root_block_usage_key,
+        )
+
+        deserialized.override_xblock_field(self.block_key_factory(1), 'display_name', u'Overridden')
+        deserialized.remove_transformer_block_field(self.block_key_factory(2), MockTransformer, 'test')
+        self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(1), 'display_name'), u'Overridden')
+        self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(2), 'display_name'), u'Block 2')
+        self.assertIsNone(deserialized.get_transformer_block_field(self.block_key_factory(2), MockTransformer, 'test'))
+
+    def test_copy_and_reserialize(self):
+        block_structure = self.create_collected_structure(self.DAG_CHILDREN_MAP)
+        deserialized = serialization.deserialize(
+            serialization.serialize(block_structure), block_structure.root_block_usage_key,
+        )
+
+        copied = deserialized.copy()
+        self.assertIs(type(copied[self.block_key_factory(1)].fields), dict)
+        self.assert_same_block_data(copied, block_structure)
+
+        reserialized = serialization.deserialize(
+            serialization.serialize(deserialized), block_structure.root_block_usage_key,
+        )
+        self.assert_block_structure(reserialized, self.DAG_CHILDREN_MAP)
+        self.assert_same_block_data(reserialized, block_structure)
+
+    def test_unsupported_version(self):
+        block_structure = self.create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = serialization.serialize(block_structure)
+        unsupported_version = struct.pack('>H', serialization.FORMAT_VERSION + 1)
+        serialized_data = serialized_data[:4] + unsupported_version + serialized_data[6:]
+
+        with self.assertRaises(serialization.ColumnarFormatError):
+            serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
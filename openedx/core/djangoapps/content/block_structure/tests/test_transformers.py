@@ -3,11 +3,11 @@ Tests for transformers.py
 """
 
 
-from unittest import TestCase
-
+from django.test import TestCase
 from mock import MagicMock, patch
 
 from ..block_structure import BlockStructureModulestoreData
+from ..config import INSTRUMENT_TRANSFORMERS, waffle
 from ..exceptions import TransformerDataIncompatible, TransformerException
 from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
@@ -82,3 +82,47 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             self.assertTrue(self.transformers.verify_versions(block_structure))
+
+    def test_transform_not_instrumented(self):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.assertIsNone(self.transformers.transform(block_structure))
+
+    @patch('openedx.core.djangoapps.content.block_structure.instrumentation.beeline')
+    @patch('openedx.core.djangoapps.content.block_structure.instrumentation.set_custom_metric')
+    def test_transform_instrumented(self, mock_set_custom_metric, mock_beeline):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+
+        with waffle().override(INSTRUMENT_TRANSFORMERS, active=True):
+            with patch.object(
+                MockFilteringTransformer,
+                'transform_block_filters',
+                lambda self, usage_info, block_structure: [
+                    block_structure.create_removal_filter(lambda block_key: block_key == 2)
+                ],
+            ):
+                metrics = self.transformers.transform(block_structure)
+
+        self.assertEqual(metrics.transformers['MockFilteringTransformer']['blocks_removed'], 1)
+        self.assertEqual(metrics.transformers['MockTransformer']['blocks_removed'], 0)
+        mock_set_custom_metric.assert_any_call('block_structure.transform.MockFilteringTransformer.blocks_removed', 1)
+        mock_beeline.add_context_field.assert_any_call(
+            'block_structure.transform.MockFilteringTransformer.blocks_removed', 1,
+        )
+
+    @patch('openedx.core.djangoapps.content.block_structure.instrumentation.beeline')
+    @patch('openedx.core.djangoapps.content.block_structure.instrumentation.set_custom_metric')
+    def test_collect_instrumented(self, mock_set_custom_metric, mock_beeline):  # pylint: disable=unused-argument
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+
+        with waffle().override(INSTRUMENT_TRANSFORMERS, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                metrics = self.transformers.collect(block_structure)
+
+        self.assertEqual(set(metrics.transformers), {'MockTransformer', 'MockFilteringTransformer'})
+        self.assertGreater(metrics.transformers['MockTransformer']['collected_bytes'], 0)
+        mock_set_custom_metric.assert_any_call(
+            'block_structure.collect.MockTransformer.collected_bytes',
+            metrics.transformers['MockTransformer']['collected_bytes'],
+        )
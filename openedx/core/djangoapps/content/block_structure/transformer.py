@@ -139,6 +139,7 @@ class BlockStructureTransformer(object):
             get_transformer_block_field
             remove_block_traversal
             filter_with_removal
+            filter_blocks
             filter_topological_traversal
             topological_traversal
             post_order_traversal
@@ -177,7 +178,7 @@ class FilteringTransformerMixin(BlockStructureTransformer):
         transform_block_filters calls will be combined and used in a single
         tree traversal.
         """
-        block_structure.filter_topological_traversal(self.transform_block_filters(usage_info, block_structure))
+        block_structure.filter_blocks(self.transform_block_filters(usage_info, block_structure))
 
     @abstractmethod
     def transform_block_filters(self, usage_info, block_structure):
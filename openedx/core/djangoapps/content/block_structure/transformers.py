@@ -3,10 +3,10 @@ Module for a collection of BlockStructureTransformers.
 """
 
 
-import functools
 from logging import getLogger
 
 from .exceptions import TransformerDataIncompatible, TransformerException
+from .instrumentation import TransformerMetrics, is_instrumentation_enabled
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
 
@@ -75,14 +75,28 @@ class BlockStructureTransformers(object):
     def collect(cls, block_structure):
         """
         Collects data for each registered transformer.
+
+        Returns:
+            TransformerMetrics - The time taken by each transformer's
+                collect method and, if instrumentation is enabled, the
+                size of its collected data.
         """
+        instrumented = is_instrumentation_enabled()
+        metrics = TransformerMetrics(u'collect')
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+            with metrics.measure(transformer.name(), block_structure):
+                transformer.collect(block_structure)
+            if instrumented:
+                metrics.record_collected_size(transformer.name(), block_structure)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+        if instrumented:
+            metrics.publish()
+        return metrics
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -112,14 +126,25 @@ class BlockStructureTransformers(object):
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        Returns:
+            TransformerMetrics - The time taken by and the number of blocks
+                removed by each transformer, if instrumentation is enabled.
+                None otherwise.
         """
-        self._transform_with_filters(block_structure)
-        self._transform_without_filters(block_structure)
+        metrics = TransformerMetrics(u'transform') if is_instrumentation_enabled() else None
+
+        self._transform_with_filters(block_structure, metrics)
+        self._transform_without_filters(block_structure, metrics)
 
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
-    def _transform_with_filters(self, block_structure):
+        if metrics is not None:
+            metrics.publish()
+        return metrics
+
+    def _transform_with_filters(self, block_structure, metrics=None):
         """
         Transforms the given block_structure using the transform_block_filters
         method from the given transformers.
@@ -129,26 +154,26 @@ class BlockStructureTransformers(object):
 
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            if metrics is None:
+                filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            else:
+                with metrics.measure(transformer.name(), block_structure):
+                    transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+                filters.extend(
+                    metrics.measure_filter(transformer.name(), block_structure, filter_func)
+                    for filter_func in transformer_filters
+                )
 
-        combined_filters = functools.reduce(
-            self._filter_chain,
-            filters,
-            block_structure.create_universal_filter()
-        )
-        block_structure.filter_topological_traversal(combined_filters)
+        block_structure.filter_blocks(filters)
 
-    def _filter_chain(self, accumulated, additional):
-        """
-        Given two functions that take a block_key and return a boolean, yield
-        a function that takes a block key, and 'ands' the functions together
-        """
-        return lambda block_key: accumulated(block_key) and additional(block_key)
-
-    def _transform_without_filters(self, block_structure):
+    def _transform_without_filters(self, block_structure, metrics=None):
         """
         Transforms the given block_structure using the transform
         method from the given transformers.
         """
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            if metrics is None:
+                transformer.transform(self.usage_info, block_structure)
+            else:
+                with metrics.measure(transformer.name(), block_structure):
+                    transformer.transform(self.usage_info, block_structure)
@@ -1,15 +1,27 @@
 """
 Helper functions for caching course assets.
+
+Small assets are cached whole in the "course_assets" cache.  Larger assets can
+be cached on the local disk of each node, in the directory of the
+COURSE_ASSETS_DISK_CACHE setting: the "course_assets" cache then only holds
+their metadata, including their digest, which names their file on disk.
 """
 
 
-import six
+import hashlib
+import logging
+import os
+from uuid import uuid4
 
+import six
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, STREAM_DATA_CHUNK_SIZE, StaticContentStream
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -19,6 +31,58 @@ except InvalidCacheBackendError:
     pass
 
 
+# Prefix of the keys of the metadata of the assets cached on disk.
+DISK_METADATA_KEY_PREFIX = b'disk:'
+
+# The size of the chunks in which assets are written to disk.
+DISK_WRITE_CHUNK_SIZE = 1024 * 1024
+
+# Estimated total size of the files of the local disk cache, by directory, see `_track_disk_cached_file`.
+_disk_cache_sizes = {}
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    A piece of content streamed from its file in the local disk cache.
+
+    The file is only opened while the data is streamed, so that responses which don't send
+    the data, like "304 Not Modified" ones, don't leave it open.
+    """
+    def __init__(self, file_path, loc, name, content_type, **kwargs):
+        super(DiskCachedContent, self).__init__(loc, name, content_type, None, **kwargs)
+        self.file_path = file_path
+
+    @property
+    def file(self):
+        """
+        A newly opened file of the content, for file responses, which close it once sent.
+        """
+        return open(self.file_path, 'rb')
+
+    def stream_data(self, chunk_size=STREAM_DATA_CHUNK_SIZE):
+        # The file is closed when the response closes the generator, even if it isn't exhausted.
+        with self.file as stream:
+            for chunk in iter(lambda: stream.read(chunk_size), b''):
+                yield chunk
+
+    def stream_data_in_range(self, first_byte, last_byte, chunk_size=STREAM_DATA_CHUNK_SIZE):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        with self.file as stream:
+            stream.seek(first_byte)
+            remaining = last_byte - first_byte + 1
+            while remaining > 0:
+                chunk = stream.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def close(self):
+        pass
+
+
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
@@ -44,11 +108,194 @@ def del_cached_content(location):
         """Force the location to a Unicode string."""
         return six.text_type(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    # Deleting the metadata of the assets cached on disk invalidates their files on every node,
+    # since they can only be found by the digest it holds.
+    keys = [location_str(loc) for loc in locations] + [_disk_metadata_key(loc) for loc in locations]
+    CONTENT_CACHE.delete_many(keys, version=STATIC_CONTENT_VERSION)
+
+    if get_disk_cache_directory():
+        for loc in locations:
+            _delete_disk_cached_files(loc)
+
+
+def get_disk_cache_directory():
+    """
+    Returns the directory of the local disk cache of assets, or None if it is disabled.
+    """
+    return settings.COURSE_ASSETS_DISK_CACHE.get('DIRECTORY')
+
+
+def get_disk_cached_content(location):
+    """
+    Retrieves the given piece of content by its location if cached on the local disk.
+    """
+    if not get_disk_cache_directory():
+        return None
+
+    metadata = CONTENT_CACHE.get(_disk_metadata_key(location), version=STATIC_CONTENT_VERSION)
+    if metadata is None:
+        return None
+
+    file_path = _get_disk_cache_file_path(location, metadata['content_digest'])
+    try:
+        # Mark the file as recently used, for the eviction of the least recently used files.
+        os.utime(file_path, None)
+    except OSError:
+        # The file was evicted, or was never written on this node.
+        return None
+    return DiskCachedContent(file_path, location, **metadata)
+
+
+def set_disk_cached_content(content):
+    """
+    Writes the given streamed piece of content to the local disk cache, and stores its
+    metadata in the cache, using its location as the key.
+
+    Returns the content as read from the disk, or None if it cannot be cached on disk,
+    in which case the stream of the given content may have been partially read.
+    """
+    directory = get_disk_cache_directory()
+    max_size = settings.COURSE_ASSETS_DISK_CACHE['MAX_SIZE']
+    content_digest = getattr(content, 'content_digest', None)
+    if not directory or not content_digest or content.length is None or content.length > max_size:
+        return None
+
+    file_path = _get_disk_cache_file_path(content.location, content_digest)
+    if not os.path.exists(file_path):
+        try:
+            _write_disk_cached_file(file_path, content)
+        except (IOError, OSError):
+            log.exception(u'Could not cache %s on disk in %s', content.location, file_path)
+            return None
+        _track_disk_cached_file(directory, max_size, content.length)
+
+    metadata = {
+        'name': content.name,
+        'content_type': content.content_type,
+        'last_modified_at': content.last_modified_at,
+        'thumbnail_location': content.thumbnail_location,
+        'import_path': content.import_path,
+        'length': content.length,
+        'locked': getattr(content, 'locked', False),
+        'content_digest': content_digest,
+    }
+    CONTENT_CACHE.set(_disk_metadata_key(content.location), metadata, version=STATIC_CONTENT_VERSION)
+    return DiskCachedContent(file_path, content.location, **metadata)
+
+
+def _disk_metadata_key(location):
+    """
+    Returns the cache key of the metadata of the asset at the given location.
+    """
+    return DISK_METADATA_KEY_PREFIX + six.text_type(location).encode("utf-8")
+
+
+def _get_disk_cache_file_prefix(location):
+    """
+    Returns the path prefix of the files of the asset at the given location in the
+    local disk cache, which are spread over subdirectories to keep them small.
+    """
+    location_hash = hashlib.sha1(six.text_type(location).encode("utf-8")).hexdigest()
+    return os.path.join(get_disk_cache_directory(), location_hash[:2], location_hash)
+
+
+def _get_disk_cache_file_path(location, content_digest):
+    """
+    Returns the path of the file of the given version of the asset at the given location.
+    """
+    return u'{}-{}'.format(_get_disk_cache_file_prefix(location), content_digest)
+
+
+def _write_disk_cached_file(file_path, content):
+    """
+    Writes the data of the given streamed content to the given path, atomically so that
+    concurrent readers never see a partial file.
+    """
+    directory = os.path.dirname(file_path)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Created by a concurrent writer
+            if not os.path.isdir(directory):
+                raise
+
+    temp_file_path = u'{}.{}.tmp'.format(file_path, uuid4().hex)
+    try:
+        with open(temp_file_path, 'wb') as temp_file:
+            for chunk in content.stream_data(DISK_WRITE_CHUNK_SIZE):
+                temp_file.write(chunk)
+        os.rename(temp_file_path, file_path)
+    finally:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+
+def _delete_disk_cached_files(location):
+    """
+    Deletes the files of all the versions of the asset at the given location from the local disk cache.
+    """
+    file_prefix = _get_disk_cache_file_prefix(location)
+    directory, file_name_prefix = os.path.split(file_prefix)
+    try:
+        file_names = os.listdir(directory)
+    except OSError:
+        return
+    for file_name in file_names:
+        if file_name.startswith(file_name_prefix):
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+
+def _track_disk_cached_file(directory, max_size, file_size):
+    """
+    Adds the size of a newly written file to the estimated size of the local disk cache in the
+    given directory, and only scans the directory to evict files when it goes over max_size.
+
+    The estimate only counts the files written by this process since its last scan: the files
+    written by the other processes of the node are accounted for by the next scan.
+    """
+    total_size = _disk_cache_sizes.get(directory)
+    if total_size is not None and total_size + file_size <= max_size:
+        _disk_cache_sizes[directory] = total_size + file_size
+        return
+    _disk_cache_sizes[directory] = _evict_disk_cached_files(directory, max_size)
+
+
+def _evict_disk_cached_files(directory, max_size):
+    """
+    Deletes the least recently used files of the local disk cache in the given directory
+    until their total size is under the given max_size, and returns their remaining total size.
+    """
+    files = []
+    for subdirectory in os.listdir(directory):
+        subdirectory_path = os.path.join(directory, subdirectory)
+        if not os.path.isdir(subdirectory_path):
+            continue
+        for file_name in os.listdir(subdirectory_path):
+            file_path = os.path.join(subdirectory_path, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file_path))
+
+    total_size = sum(size for _, size, _ in files)
+    for _, size, file_path in sorted(files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        total_size -= size
+    return total_size
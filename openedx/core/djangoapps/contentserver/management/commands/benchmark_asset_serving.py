@@ -0,0 +1,181 @@
+"""
+Benchmark the memory and throughput of the StaticContentServer middleware.
+
+Stores a temporary asset of the given size in the contentstore, under the
+given course, and serves it concurrently through the middleware, reading
+each response to the end as a client would. Reports the resident memory
+of the process and the throughput, then deletes the asset.
+
+Example usage:
+    $ ./manage.py lms benchmark_asset_serving 'course-v1:edX+DemoX+Demo_Course' --size-mb=100 --concurrency=8 \
+        --settings=devstack
+"""
+
+
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+from uuid import uuid4
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from six.moves import range
+
+from openedx.core.djangoapps.contentserver.middleware import StaticContentServer
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
+
+MEGABYTE = 1024 * 1024
+
+# How often the resident memory of the process is sampled, in seconds.
+RSS_SAMPLING_INTERVAL = 0.05
+
+
+def get_rss():
+    """
+    Returns the current resident memory of the process in bytes, or its peak
+    resident memory where the current one is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Command(BaseCommand):
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id',
+                            help=u'the course to store the temporary asset in')
+        parser.add_argument('--size-mb',
+                            default=100,
+                            type=int,
+                            help=u'the size of the asset, in megabytes')
+        parser.add_argument('--concurrency',
+                            default=8,
+                            type=int,
+                            help=u'the number of requests served at the same time')
+        parser.add_argument('--requests',
+                            default=32,
+                            type=int,
+                            help=u'the total number of requests to serve')
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            help=u'the size of the streamed chunks, instead of CONTENTSERVER_STREAM_CHUNK_SIZE')
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            raise CommandError(u'Invalid course_id')
+        for option in ('size_mb', 'concurrency', 'requests', 'chunk_size'):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(u'--{} must be a positive number'.format(option.replace('_', '-')))
+
+        size = options['size_mb'] * MEGABYTE
+        location = self._save_asset(course_key, size)
+        try:
+            if options['chunk_size']:
+                with override_settings(CONTENTSERVER_STREAM_CHUNK_SIZE=options['chunk_size']):
+                    results = self._serve_asset(location, options['concurrency'], options['requests'])
+            else:
+                results = self._serve_asset(location, options['concurrency'], options['requests'])
+        finally:
+            contentstore().delete(location)
+
+        elapsed, latencies, sizes, baseline_rss, peak_rss = results
+        if any(served_size != size for served_size in sizes):
+            raise CommandError(u'Some responses did not contain the whole asset')
+
+        served_mb = float(sum(sizes)) / MEGABYTE
+        self.stdout.write(u'Asset size:        {} MB'.format(options['size_mb']))
+        self.stdout.write(u'Requests:          {} ({} concurrent)'.format(len(sizes), options['concurrency']))
+        self.stdout.write(u'Elapsed:           {:.2f} s'.format(elapsed))
+        self.stdout.write(u'Throughput:        {:.1f} MB/s, {:.2f} requests/s'.format(
+            served_mb / elapsed, len(sizes) / elapsed,
+        ))
+        self.stdout.write(u'Average latency:   {:.1f} ms'.format(1000 * sum(latencies) / len(latencies)))
+        self.stdout.write(u'Baseline RSS:      {:.1f} MB'.format(float(baseline_rss) / MEGABYTE))
+        self.stdout.write(u'Peak RSS:          {:.1f} MB'.format(float(peak_rss) / MEGABYTE))
+        self.stdout.write(u'Peak RSS growth:   {:.1f} MB'.format(float(peak_rss - baseline_rss) / MEGABYTE))
+
+    def _save_asset(self, course_key, size):
+        """
+        Saves an asset of the given size in the contentstore and returns its location.
+        """
+        name = u'benchmark_asset_serving_{}.bin'.format(uuid4().hex)
+        location = StaticContent.compute_location(course_key, name)
+        block = os.urandom(MEGABYTE)
+
+        def generate_data():
+            """
+            Yields the data of the asset one block at a time, so it is never held in memory.
+            """
+            for offset in range(0, size, MEGABYTE):
+                yield block[:min(MEGABYTE, size - offset)]
+
+        contentstore().save(
+            StaticContent(location, name, 'application/octet-stream', generate_data(), length=size)
+        )
+        return location
+
+    def _serve_asset(self, location, concurrency, num_requests):
+        """
+        Serves the asset at the given location the given number of times,
+        with the given number of concurrent requests.
+
+        Returns the elapsed time, the latencies and the sizes of the
+        responses, and the baseline and peak resident memory.
+        """
+        middleware = StaticContentServer()
+        url = StaticContent.serialize_asset_key_with_slash(location)
+
+        def serve():
+            """
+            Serves a request for the asset and reads its response to the end.
+            """
+            start_time = time.time()
+            request = RequestFactory().get(url)
+            request.user = AnonymousUser()
+            response = middleware.process_request(request)
+            served_size = sum(len(chunk) for chunk in response)
+            response.close()
+            return time.time() - start_time, served_size
+
+        baseline_rss = get_rss()
+        peak_rss = [baseline_rss]
+        serving = threading.Event()
+        serving.set()
+
+        def sample_rss():
+            """
+            Records the peak resident memory while the requests are served.
+            """
+            while serving.is_set():
+                peak_rss[0] = max(peak_rss[0], get_rss())
+                time.sleep(RSS_SAMPLING_INTERVAL)
+
+        sampler = threading.Thread(target=sample_rss)
+        sampler.start()
+        start_time = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                responses = list(executor.map(lambda _: serve(), range(num_requests)))
+        finally:
+            elapsed = time.time() - start_time
+            serving.clear()
+            sampler.join()
+        peak_rss[0] = max(peak_rss[0], get_rss())
+
+        latencies = [latency for latency, _ in responses]
+        sizes = [served_size for _, served_size in responses]
+        return elapsed, latencies, sizes, baseline_rss, peak_rss[0]
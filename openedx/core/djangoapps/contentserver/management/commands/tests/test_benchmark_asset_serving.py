@@ -0,0 +1,40 @@
+"""
+Tests for the benchmark_asset_serving management command.
+"""
+
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from six import StringIO, text_type
+
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+class TestBenchmarkAssetServing(ModuleStoreTestCase):
+    """
+    Tests for the benchmark_asset_serving management command.
+    """
+    def setUp(self):
+        super(TestBenchmarkAssetServing, self).setUp()
+        self.course = CourseFactory.create()
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_asset_serving', text_type(self.course.id),
+            size_mb=2, concurrency=2, requests=3, chunk_size=65536, stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn(u'Requests:          3 (2 concurrent)', output)
+        self.assertIn(u'Throughput:', output)
+        self.assertIn(u'Peak RSS growth:', output)
+
+        # The temporary asset is deleted
+        assets, count = contentstore().get_all_content_for_course(self.course.id)
+        self.assertEqual((assets, count), ([], 0))
+
+    def test_invalid_concurrency(self):
+        with self.assertRaisesMessage(CommandError, u'--concurrency must be a positive number'):
+            call_command('benchmark_asset_serving', text_type(self.course.id), concurrency=0)
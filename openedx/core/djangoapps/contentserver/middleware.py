@@ -3,19 +3,25 @@ Middleware to serve assets.
 """
 
 
+import calendar
 import datetime
 import logging
+from uuid import uuid4
 
 import six
+from django.conf import settings
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotFound,
     HttpResponseNotModified,
-    HttpResponsePermanentRedirect
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse
 )
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_etags, parse_http_date_safe, quote_etag
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from six import text_type
@@ -23,12 +29,19 @@ from six import text_type
 from openedx.core.djangoapps.header_control import force_header_for_response
 from student.models import CourseEnrollment
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent
+from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    DiskCachedContent,
+    get_cached_content,
+    get_disk_cache_directory,
+    get_disk_cached_content,
+    set_cached_content,
+    set_disk_cached_content
+)
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 log = logging.getLogger(__name__)
@@ -43,6 +56,10 @@ except ImportError:
 
 HTTP_DATE_FORMAT = u"%a, %d %b %Y %H:%M:%S GMT"
 
+# Range requests with more ranges than this, once overlapping ranges are coalesced,
+# are answered with the full content rather than with a multipart response.
+MAX_BYTE_RANGES = 16
+
 
 class StaticContentServer(MiddlewareMixin):
     """
@@ -120,24 +137,21 @@ class StaticContentServer(MiddlewareMixin):
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            etag = self.get_etag(content)
+            if self.is_not_modified(request, content, etag):
+                response = HttpResponseNotModified()
+                self.set_caching_headers(content, response)
+                return response
 
-            # *** File streaming within a byte range ***
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes first-[last][, first-[last]...]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
-            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
+            # Several ranges are sent back as a multipart/byteranges message.
+            # https://tools.ietf.org/html/rfc7233
             response = None
-            if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
+            if request.META.get('HTTP_RANGE') and self.is_range_fresh(request, content, etag):
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -151,37 +165,53 @@ class StaticContentServer(MiddlewareMixin):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, text_type(loc)
-                        )
                     else:
-                        first, last = ranges[0]
+                        ranges = coalesce_ranges([
+                            (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                        ])
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s",
+                                header_value, text_type(loc)
+                            )
+                            # Requested Range Not Satisfiable
+                            response = HttpResponse(status=416)
+                            response['Content-Range'] = u'bytes */{length}'.format(length=content.length)
+                            return response
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if len(ranges) > MAX_BYTE_RANGES:
+                            # We send back the full content rather than many small parts.
+                            log.warning(
+                                u"More than %d ranges in Range header: %s for content: %s",
+                                MAX_BYTE_RANGES, header_value, text_type(loc)
+                            )
+                        elif len(ranges) > 1:
+                            response = self.make_multipart_response(content, ranges)
+                        else:
+                            first, last = ranges[0]
+                            response = self.make_response(
+                                content, content.stream_data_in_range(first, last, self.get_chunk_size())
+                            )
                             response['Content-Range'] = u'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
 
+                        if response is not None:
+                            response.status_code = 206  # Partial Content
                             if newrelic:
                                 newrelic.agent.add_custom_parameter('contentserver.ranged', True)
-                        else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s",
-                                header_value, text_type(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # Let the server send the file with sendfile, when it supports it.
+                    response = FileResponse(content.file, content_type=content.content_type)
+                    response.block_size = self.get_chunk_size()
+                    # FileResponse names the file after the cache's own file name
+                    del response['Content-Disposition']
+                else:
+                    response = self.make_response(content, content.stream_data(self.get_chunk_size()))
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -190,7 +220,6 @@ class StaticContentServer(MiddlewareMixin):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -227,12 +256,124 @@ class StaticContentServer(MiddlewareMixin):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        etag = self.get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
         force_header_for_response(response, 'Vary', 'Origin')
 
+    @staticmethod
+    def get_etag(content):
+        """
+        Returns the strong entity tag of the given content, derived from its digest,
+        or None if the content has no digest.
+        """
+        content_digest = getattr(content, "content_digest", None)
+        if not content_digest:
+            return None
+        return quote_etag(content_digest)
+
+    @staticmethod
+    def is_not_modified(request, content, etag):
+        """
+        Determines whether the conditional headers of the given request validate the
+        client's cached copy of the given content, whose entity tag is `etag`.
+
+        If-None-Match takes precedence over If-Modified-Since, and uses the weak comparison.
+        https://tools.ietf.org/html/rfc7232#section-6
+        """
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            if_none_match = parse_etags(request.META['HTTP_IF_NONE_MATCH'])
+            if if_none_match == ['*']:
+                return True
+            return etag is not None and any(
+                candidate.replace('W/', '', 1) == etag for candidate in if_none_match
+            )
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and get_last_modified_timestamp(content) <= if_modified_since
+
+    @staticmethod
+    def is_range_fresh(request, content, etag):
+        """
+        Determines whether the Range header of the given request applies to the given
+        content, whose entity tag is `etag`: that is when the request has no If-Range
+        header, or when it matches the content.
+        https://tools.ietf.org/html/rfc7233#section-3.2
+        """
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            # Entity tags must be strong to match.
+            return if_range == etag
+        return parse_http_date_safe(if_range) == get_last_modified_timestamp(content)
+
+    @staticmethod
+    def get_chunk_size():
+        """
+        Returns the size of the chunks in which the assets are streamed to the client.
+        """
+        return settings.CONTENTSERVER_STREAM_CHUNK_SIZE
+
+    @staticmethod
+    def make_response(content, data, content_type=None):
+        """
+        Returns a response with the given iterator of the given content's data, of the
+        given content_type, which defaults to the content's.
+
+        Content held in memory is sent at once, while content read from the contentstore
+        is streamed, so that the whole asset is never buffered in the worker.
+        """
+        content_type = content_type or content.content_type
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(data, content_type=content_type)
+        return HttpResponse(data, content_type=content_type)
+
+    def make_multipart_response(self, content, ranges):
+        """
+        Returns a multipart/byteranges response with a part for each of the given
+        non-overlapping (first, last) ranges of the given content.
+        https://tools.ietf.org/html/rfc7233#appendix-A
+        """
+        boundary = uuid4().hex
+        part_header_format = (
+            u'--{boundary}\r\n'
+            u'Content-Type: {content_type}\r\n'
+            u'Content-Range: bytes {first}-{last}/{length}\r\n'
+            u'\r\n'
+        )
+        part_headers = [
+            part_header_format.format(
+                boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length,
+            ).encode('utf-8')
+            for first, last in ranges
+        ]
+        closing_boundary = u'--{boundary}--\r\n'.format(boundary=boundary).encode('utf-8')
+
+        def stream_parts():
+            """
+            Streams the parts of the response.
+            """
+            for part_header, (first, last) in zip(part_headers, ranges):
+                yield part_header
+                for chunk in content.stream_data_in_range(first, last, self.get_chunk_size()):
+                    yield chunk
+                yield b'\r\n'
+            yield closing_boundary
+
+        response = self.make_response(
+            content, stream_parts(), u'multipart/byteranges; boundary={boundary}'.format(boundary=boundary)
+        )
+        response['Content-Length'] = str(
+            sum(len(part_header) + last - first + 1 + 2 for part_header, (first, last) in zip(part_headers, ranges)) +
+            len(closing_boundary)
+        )
+        return response
+
     @staticmethod
     def is_cdn_request(request):
         """
@@ -286,8 +427,8 @@ class StaticContentServer(MiddlewareMixin):
         or loading it directly from the contentstore.
         """
 
-        # See if we can load this item from cache.
-        content = get_cached_content(location)
+        # See if we can load this item from cache, or from the local disk cache.
+        content = get_cached_content(location) or get_disk_cached_content(location)
         if content is None:
             # Not in cache, so just try and load it from the asset manager.
             try:
@@ -297,14 +438,26 @@ class StaticContentServer(MiddlewareMixin):
 
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
+            # buffering in memory when we're serving an actual request.  Larger assets go
+            # to the local disk cache, if it is enabled.
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            elif get_disk_cache_directory():
+                # The stream is read again from the contentstore if it could not be cached.
+                content = set_disk_cached_content(content) or AssetManager.find(location, as_stream=True)
 
         return content
 
 
+def get_last_modified_timestamp(content):
+    """
+    Returns the last modified time of the given content as a POSIX timestamp,
+    truncated to the precision of HTTP dates.
+    """
+    return calendar.timegm(content.last_modified_at.utctimetuple())
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -346,3 +499,19 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def coalesce_ranges(ranges):
+    """
+    Returns the given list of (start, end) tuples of ranges sorted, with the
+    overlapping and adjacent ranges merged.
+
+    See spec for details: https://tools.ietf.org/html/rfc7233#section-4.1
+    """
+    coalesced = []
+    for first, last in sorted(ranges):
+        if coalesced and first <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(last, coalesced[-1][1]))
+        else:
+            coalesced.append((first, last))
+    return coalesced
@@ -0,0 +1,146 @@
+"""
+Tests for the local disk cache of course assets.
+"""
+
+
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import BytesIO
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.keys import CourseKey
+
+from xmodule.contentstore.content import StaticContent, StaticContentStream
+
+from .. import caching
+
+
+class DiskCacheTestCase(TestCase):
+    """
+    Tests for the local disk cache of course assets.
+    """
+    def setUp(self):
+        super(DiskCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.disk_cache_settings = override_settings(COURSE_ASSETS_DISK_CACHE={
+            'DIRECTORY': self.directory,
+            'MAX_SIZE': 1000,
+        })
+        self.disk_cache_settings.enable()
+        self.addCleanup(self.disk_cache_settings.disable)
+        self.addCleanup(caching.CONTENT_CACHE.clear)
+
+        self.course_key = CourseKey.from_string('course-v1:org+course+run')
+
+    def make_content(self, name, data, content_digest):
+        """
+        Returns a streamed content with the given name, data and digest.
+        """
+        return StaticContentStream(
+            StaticContent.compute_location(self.course_key, name), name, 'application/octet-stream', BytesIO(data),
+            last_modified_at=datetime(2020, 1, 1), length=len(data), content_digest=content_digest,
+        )
+
+    def test_round_trip(self):
+        content = self.make_content('asset.bin', b'0123456789' * 30, 'digest')
+
+        cached_content = caching.set_disk_cached_content(content)
+        self.assertIsInstance(cached_content, caching.DiskCachedContent)
+        self.assertEqual(b''.join(cached_content.stream_data()), b'0123456789' * 30)
+
+        cached_content = caching.get_disk_cached_content(content.location)
+        self.assertIsInstance(cached_content, caching.DiskCachedContent)
+        self.assertEqual(b''.join(cached_content.stream_data_in_range(10, 19)), b'0123456789')
+        self.assertEqual(cached_content.content_digest, 'digest')
+        self.assertEqual(cached_content.length, 300)
+        self.assertEqual(cached_content.last_modified_at, datetime(2020, 1, 1))
+        self.assertTrue(cached_content.file_path.endswith('-digest'))
+
+    def test_del_cached_content(self):
+        content = self.make_content('asset.bin', b'data', 'digest')
+        file_path = caching.set_disk_cached_content(content).file_path
+
+        caching.del_cached_content(content.location)
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_new_version(self):
+        content = self.make_content('asset.bin', b'old data', 'old_digest')
+        old_file_path = caching.set_disk_cached_content(content).file_path
+        content = self.make_content('asset.bin', b'new data', 'new_digest')
+        caching.set_disk_cached_content(content)
+
+        cached_content = caching.get_disk_cached_content(content.location)
+        self.assertEqual(b''.join(cached_content.stream_data()), b'new data')
+        self.assertNotEqual(cached_content.file_path, old_file_path)
+
+    def test_file_evicted_on_another_node(self):
+        content = self.make_content('asset.bin', b'data', 'digest')
+        os.remove(caching.set_disk_cached_content(content).file_path)
+
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+
+    def test_least_recently_used_eviction(self):
+        contents = [self.make_content(u'asset{}.bin'.format(index), b'x' * 400, 'digest') for index in range(3)]
+        file_paths = []
+        for index, content in enumerate(contents[:2]):
+            file_path = caching.set_disk_cached_content(content).file_path
+            os.utime(file_path, (index, index))
+            file_paths.append(file_path)
+        # Reading the first asset makes the second one the least recently used.
+        caching.get_disk_cached_content(contents[0].location)
+
+        caching.set_disk_cached_content(contents[2])
+        self.assertTrue(os.path.exists(file_paths[0]))
+        self.assertFalse(os.path.exists(file_paths[1]))
+        self.assertIsNone(caching.get_disk_cached_content(contents[1].location))
+
+    def test_file_only_opened_while_streamed(self):
+        content = self.make_content('asset.bin', b'0123456789', 'digest')
+        caching.set_disk_cached_content(content)
+        opened_files = []
+
+        def open_file(*args):
+            opened_files.append(open(*args))
+            return opened_files[-1]
+
+        with patch.object(caching, 'open', side_effect=open_file, create=True):
+            cached_content = caching.get_disk_cached_content(content.location)
+            self.assertEqual(opened_files, [], 'Responses which do not send the data should not open the file')
+
+            self.assertEqual(b''.join(cached_content.stream_data()), b'0123456789')
+            stream = cached_content.stream_data_in_range(2, 7, chunk_size=4)
+            self.assertEqual(next(stream), b'2345')
+            # Closed by the response, without being exhausted
+            stream.close()
+
+        self.assertEqual(len(opened_files), 2)
+        self.assertTrue(all(opened_file.closed for opened_file in opened_files))
+
+    def test_eviction_only_scans_over_max_size(self):
+        contents = [self.make_content(u'asset{}.bin'.format(index), b'x' * 400, 'digest') for index in range(3)]
+        with patch.object(caching, '_evict_disk_cached_files', wraps=caching._evict_disk_cached_files) as mock_evict:
+            caching.set_disk_cached_content(contents[0])
+            caching.set_disk_cached_content(contents[1])
+            # Only the first write scans the directory, to initialize its total size.
+            self.assertEqual(mock_evict.call_count, 1)
+
+            caching.set_disk_cached_content(contents[2])
+            self.assertEqual(mock_evict.call_count, 2)
+        self.assertEqual(caching._disk_cache_sizes[self.directory], 800)  # pylint: disable=protected-access
+
+    def test_too_large(self):
+        content = self.make_content('asset.bin', b'x' * 1001, 'digest')
+        self.assertIsNone(caching.set_disk_cached_content(content))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_disabled(self):
+        content = self.make_content('asset.bin', b'data', 'digest')
+        with override_settings(COURSE_ASSETS_DISK_CACHE={'DIRECTORY': None, 'MAX_SIZE': 1000}):
+            self.assertIsNone(caching.set_disk_cached_content(content))
+            self.assertIsNone(caching.get_disk_cached_content(content.location))
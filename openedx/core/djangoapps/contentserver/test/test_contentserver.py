@@ -30,7 +30,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..middleware import coalesce_ranges, parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -240,17 +240,53 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with a part per range.
         """
-        first_byte = self.length_unlocked / 4
-        last_byte = self.length_unlocked / 2
-        # pylint: disable=unicode-format-string
+        first_byte = self.length_unlocked // 4
+        last_byte = self.length_unlocked // 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1].encode('utf-8')
+        content = b''.join(resp.streaming_content) if resp.streaming else resp.content
+        self.assertEqual(resp['Content-Length'], str(len(content)))
+
+        full_content = self.client.get(self.url_unlocked).content
+        parts = content.split(b'--' + boundary)
+        self.assertEqual(parts[0], b'')
+        self.assertEqual(parts[-1], b'--\r\n')
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, data = part.split(b'\r\n\r\n', 1)
+            self.assertIn(
+                u'Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked).encode('utf-8'), headers
+            )
+            self.assertEqual(data, full_content[first:last + 1] + b'\r\n')
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping ranges are coalesced in a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-99, 50-149, 150-199')
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], u'bytes 0-199/{}'.format(self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '200')
+
+    def test_range_request_with_stale_if_range(self):
+        """
+        Test that a range request whose If-Range does not match the asset outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='"{}"'.format(FAKE_MD5_HASH))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
-        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE=resp['ETag'])
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
 
     @ddt.data(
         'bytes 0-',
@@ -283,6 +319,79 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], u'bytes */{}'.format(self.length_unlocked))
+
+    def test_streamed_asset(self):
+        """
+        Test that assets read from the contentstore are streamed in chunks of the configured size.
+        """
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load_asset:
+            mock_load_asset.return_value = AssetManager.find(self.unlocked_asset, as_stream=True)
+            with override_settings(CONTENTSERVER_STREAM_CHUNK_SIZE=100):
+                resp = self.client.get(self.url_unlocked)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        chunks = list(resp.streaming_content)
+        self.assertEqual([len(chunk) for chunk in chunks[:-1]], [100] * (len(chunks) - 1))
+        self.assertEqual(len(b''.join(chunks)), self.length_unlocked)
+        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+
+    def test_etag_header_sent(self):
+        """
+        Test that the strong entity tag of an asset is its digest.
+        """
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp['ETag'], '"{}"'.format(content.content_digest))
+
+    @ddt.data(
+        (u'"{digest}"', 304),
+        (u'W/"{digest}"', 304),
+        (u'"{fake}", "{digest}"', 304),
+        (u'*', 304),
+        (u'"{fake}"', 200),
+    )
+    @ddt.unpack
+    def test_if_none_match(self, if_none_match, expected_status_code):
+        """
+        Test that conditional requests with If-None-Match are validated against the entity tag.
+        """
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        if_none_match = if_none_match.format(digest=content.content_digest, fake=FAKE_MD5_HASH)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=if_none_match)
+        self.assertEqual(resp.status_code, expected_status_code)
+        self.assertEqual(resp['ETag'], '"{}"'.format(content.content_digest))
+
+    def test_if_none_match_takes_precedence(self):
+        """
+        Test that If-Modified-Since is ignored when If-None-Match is sent.
+        """
+        resp = self.client.get(
+            self.url_unlocked,
+            HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH),
+            HTTP_IF_MODIFIED_SINCE=self.client.get(self.url_unlocked)['Last-Modified'],
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (datetime.timedelta(seconds=0), 304),
+        (datetime.timedelta(days=1), 304),
+        (datetime.timedelta(days=-1), 200),
+    )
+    @ddt.unpack
+    def test_if_modified_since(self, delta, expected_status_code):
+        """
+        Test that conditional requests with If-Modified-Since are validated against the modification date.
+        """
+        last_modified = datetime.datetime.strptime(
+            self.client.get(self.url_unlocked)['Last-Modified'], HTTP_DATE_FORMAT
+        )
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_MODIFIED_SINCE=(last_modified + delta).strftime(HTTP_DATE_FORMAT)
+        )
+        self.assertEqual(resp.status_code, expected_status_code)
 
     def test_vary_header_sent(self):
         """
@@ -446,3 +555,14 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegex(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+    @ddt.data(
+        ([(100, 199), (200, 499)], [(100, 499)]),
+        ([(9900, 9999), (9800, 9999)], [(9800, 9999)]),
+        ([(0, 10), (5, 7), (12, 20)], [(0, 10), (12, 20)]),
+        ([(500, 600), (0, 99)], [(0, 99), (500, 600)]),
+        ([], []),
+    )
+    @ddt.unpack
+    def test_coalesce_ranges(self, ranges, expected_ranges):
+        self.assertEqual(coalesce_ranges(ranges), expected_ranges)
@@ -3,9 +3,102 @@ Helpers methods for site configuration.
 """
 
 
+from logging import getLogger
+
 from django.conf import settings
+from edx_django_utils.cache import RequestCache
+
 from openedx.core.lib.cache_utils import request_cached
 
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+SNAPSHOT_CACHE_NAMESPACE = 'site_config_snapshot'
+
+
+class SiteConfigurationSnapshot(object):
+    """
+    Tahoe: Frozen copy of the effective values of a `SiteConfiguration` for the current request.
+
+    Templates read dozens of values per page, so all the settings (from `site_values` or the Site Configuration
+    service) are copied once into a `dict` and the Tahoe value modifiers are memoized per key.
+    `lookups` counts the reads for the `SiteConfigurationLookupCounterMiddleware`.
+    """
+
+    def __init__(self, configuration):
+        self.enabled = configuration.enabled
+        self.lookups = 0
+        self._modifier = configuration.tahoe_config_modifier
+        self._overrides = {}
+        self._override_names = getattr(self._modifier, 'FIELD_OVERRIDERS', {})
+        self._site_values_names = frozenset(configuration.site_values or {})
+        self._values = {}
+        if self.enabled:
+            try:
+                self._values = configuration.get_setting_values()
+            except (AttributeError, TypeError, ValueError) as error:
+                logger.exception(u'Invalid JSON data. \n [%s]', error)
+
+    def get_value(self, name, default=None):
+        """
+        Same as `SiteConfiguration.get_value` with dict lookups.
+        """
+        self.lookups += 1
+        if not self.enabled:
+            return default
+
+        if self._modifier:
+            name, default = self._modifier.normalize_get_value_params(name, default)
+            if name in self._override_names:
+                if name not in self._overrides:
+                    self._overrides[name] = self._modifier.override_value(name)
+                should_override, overridden_value = self._overrides[name]
+                if should_override:
+                    return overridden_value
+
+        return self._values.get(name, default)
+
+    def has_override(self, name):
+        self.lookups += 1
+        return name in self._site_values_names
+
+
+def is_site_configuration_snapshot_enabled():
+    return getattr(settings, 'TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED', False)
+
+
+def get_current_site_configuration_snapshot():
+    """
+    Tahoe: Get the `SiteConfigurationSnapshot` of the current site, built on first access in the request.
+
+    Returns `None` if the snapshots are disabled or the site has no configuration.
+    """
+    if not is_site_configuration_snapshot_enabled():
+        return None
+
+    configuration = get_current_site_configuration()
+    if not configuration:
+        return None
+
+    request_cache = RequestCache(SNAPSHOT_CACHE_NAMESPACE)
+    cached_response = request_cache.get_cached_response(configuration.pk)
+    if cached_response.is_found:
+        return cached_response.value
+
+    snapshot = SiteConfigurationSnapshot(configuration)
+    request_cache.set(configuration.pk, snapshot)
+    return snapshot
+
+
+def get_site_configuration_lookups_count():
+    """
+    Tahoe: Count the `get_value`/`has_override_value` calls served by the snapshots of the current request.
+    """
+    return sum(snapshot.lookups for snapshot in RequestCache(SNAPSHOT_CACHE_NAMESPACE).data.values())
+
+
+def clear_site_configuration_snapshots():
+    RequestCache(SNAPSHOT_CACHE_NAMESPACE).clear()
+
 
 @request_cached("site_config")
 def get_current_site_configuration():
@@ -54,6 +147,10 @@ def has_configuration_override(name):
     Returns:
         (bool): True if given key is present in the configuration.
     """
+    snapshot = get_current_site_configuration_snapshot()
+    if snapshot:
+        return snapshot.has_override(name)
+
     configuration = get_current_site_configuration()
     if configuration and name in configuration.site_values:
         return True
@@ -71,6 +168,10 @@ def get_configuration_value(name, default=None):
     Returns:
         Configuration value for the given key or returns `None` if configuration is not enabled.
     """
+    snapshot = get_current_site_configuration_snapshot()
+    if snapshot:
+        return snapshot.get_value(name, default)
+
     configuration = get_current_site_configuration()
     return configuration.get_value(name, default)
 
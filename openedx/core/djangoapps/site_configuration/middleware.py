@@ -2,6 +2,7 @@
 This file contains Django middleware related to the site_configuration app.
 """
 
+import beeline
 import django
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
@@ -59,3 +60,23 @@ class SessionCookieDomainOverrideMiddleware(MiddlewareMixin):
             response.set_cookie = _set_cookie_wrapper
 
         return response
+
+
+class SiteConfigurationLookupCounterMiddleware(MiddlewareMixin):
+    """
+    Tahoe: Report how many site configuration lookups the request made.
+
+    Adds the `site_config.lookups` trace field and, in DEBUG mode, the `X-Site-Config-Lookups` response header.
+    Only the lookups served by the `SiteConfigurationSnapshot` are counted. This middleware should be placed right
+    after the `RequestCacheMiddleware` so it runs before the request cache is cleared.
+    """
+
+    def process_response(self, __, response):
+        """
+        Django middleware hook for process responses
+        """
+        lookups = configuration_helpers.get_site_configuration_lookups_count()
+        beeline.add_trace_field('site_config.lookups', lookups)
+        if settings.DEBUG:
+            response['X-Site-Config-Lookups'] = str(lookups)
+        return response
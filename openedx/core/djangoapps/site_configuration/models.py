@@ -19,6 +19,7 @@ from jsonfield.fields import JSONField
 from model_utils.models import TimeStampedModel
 
 from ..appsembler.preview.helpers import is_preview_mode
+from .helpers import clear_site_configuration_snapshots
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -136,6 +137,18 @@ class SiteConfiguration(models.Model):
 
         return default
 
+    def get_setting_values(self):
+        """
+        Tahoe: Get all the settings read by `get_value` as a new `dict`.
+
+        Used to build the per-request `SiteConfigurationSnapshot`, the Tahoe value modifiers are not applied.
+        """
+        if self.api_adapter:
+            # Tahoe: Use `SiteConfigAdapter` if available.
+            all_configs = self.api_adapter.get_backend_configs()['configuration']
+            return dict(all_configs[self.api_adapter.TYPE_SETTING])
+        return dict(self.site_values or {})
+
     @beeline.traced('site_config.get_page_content')
     def get_page_content(self, name, default=None):
         """
@@ -309,10 +322,15 @@ class SiteConfiguration(models.Model):
     def get_theme_version(self):
         return self.get_value('THEME_VERSION', THEME_AMC_V1)
 
-    def compile_microsite_sass(self):
+    def compile_microsite_sass(self, force=False, preview=None):
         """
         Compiles the microsite sass and save it into the storage bucket.
 
+        The compilation is skipped if the stored CSS has the same Sass fingerprint, and reuses the CSS of other sites
+        with the same fingerprint unless `force` is used. See the `appsembler.sites.sass_cache` module.
+
+        `preview` selects the preview CSS file, see `get_css_overrides_file`.
+
         :return dict {
           "successful_sass_compile": boolean: whether the CSS was compiled successfully
           "sass_compile_message": string: Status message that's safe to show for customers.
@@ -320,11 +338,31 @@ class SiteConfiguration(models.Model):
           "site_css_file": string: The stored file in the customer theme storage.
           "theme_version": string: Theme version.
           "configuration_source": string: "site_config_service_client" or "openedx_site_configuration_model".
+          "sass_compile_cache": string: "compiled", "shared" (reused CSS of another site) or "skipped" (up to date).
+          "sass_fingerprint": string: The Sass fingerprint or `None` if the Sass compile cache is disabled.
         }
         """
+        storage = get_customer_themes_storage()
+        sass_status, css_output = self.compile_microsite_css(storage, force=force, preview=preview)
+        if css_output is not None:
+            self.store_microsite_css(storage, css_output, sass_status)
+        return sass_status
+
+    def compile_microsite_css(self, storage, force=False, theme=None, preview=None):
+        """
+        Compiles the microsite sass without storing the site CSS file.
+
+        This is useful for bulk compilations that store the CSS files in batches, see `compile_microsite_sass`.
+
+        :param storage: The customer themes storage.
+        :param force: Compile even if the stored CSS is up to date.
+        :param theme: Optional pre-loaded default site `Theme`.
+        :param preview: Compile the preview CSS file, defaults to the current request's preview mode.
+        :return (sass_status, css_output): `css_output` is `None` if the compilation was skipped or failed.
+        """
         # Importing `sites.utils` locally to avoid test-time Django errors.
         # TODO: Fix Site Configuration and Organizations hacks. https://github.com/appsembler/edx-platform/issues/329
-        from openedx.core.djangoapps.appsembler.sites import utils as sites_utils
+        from openedx.core.djangoapps.appsembler.sites import sass_cache, utils as sites_utils
 
         if self.api_adapter:
             configuration_source = 'site_config_service_client'
@@ -333,8 +371,7 @@ class SiteConfiguration(models.Model):
         else:
             configuration_source = 'openedx_site_configuration_model'
 
-        storage = get_customer_themes_storage()
-        css_file_name = self.get_css_overrides_file()
+        css_file_name = self.get_css_overrides_file(preview=preview)
         theme_version = self.get_theme_version()
         if theme_version == THEME_TAHOE_V2:
             scss_file = '_main-v2.scss'
@@ -342,13 +379,37 @@ class SiteConfiguration(models.Model):
             # TODO: Deprecated. Remove once all sites are migrated to Tahoe 2.0 structure.
             scss_file = 'main.scss'
 
+        sass_compile_cache = 'compiled'
+        fingerprint = None
+        css_output = None
         try:
-            css_output = sites_utils.compile_sass(scss_file, custom_branding=self._sass_var_override)
-            with storage.open(css_file_name, 'w') as f:
-                f.write(css_output)
+            if sass_cache.is_sass_cache_enabled():
+                fingerprint = sass_cache.get_sass_fingerprint(scss_file, self._get_sass_variables_overrides())
+                if not force:
+                    is_up_to_date = sass_cache.get_site_css_fingerprint(css_file_name) == fingerprint
+                    if is_up_to_date and storage.exists(css_file_name):
+                        sass_compile_cache = 'skipped'
+                    else:
+                        css_output = sass_cache.get_shared_css(storage, fingerprint)
+                        if css_output is not None:
+                            sass_compile_cache = 'shared'
+
+            if sass_compile_cache == 'compiled':
+                css_output = sites_utils.compile_sass(scss_file, custom_branding=self._sass_var_override, theme=theme)
+                if fingerprint:
+                    sass_cache.save_shared_css(storage, fingerprint, css_output)
+
             successful_sass_compile = True
-            sass_compile_message = 'Sass compile finished successfully for site {site}'.format(site=self.site.domain)
+            if sass_compile_cache == 'skipped':
+                sass_compile_message = 'Sass compile skipped for site {site}, the CSS is up to date'.format(
+                    site=self.site.domain,
+                )
+            else:
+                sass_compile_message = 'Sass compile finished successfully for site {site}'.format(
+                    site=self.site.domain,
+                )
         except CompileError as exc:
+            css_output = None
             successful_sass_compile = False
             sass_compile_message = 'Sass compile failed for site {site} with the error: {message}'.format(
                 site=self.site.domain,
@@ -356,14 +417,31 @@ class SiteConfiguration(models.Model):
             )
             logger.warning(sass_compile_message, exc_info=True)
 
-        return {
+        beeline.add_context_field('sass_compile_cache', sass_compile_cache)
+        sass_status = {
             'successful_sass_compile': successful_sass_compile,
             'sass_compile_message': sass_compile_message,
             'scss_file_used': scss_file,
             'site_css_file': css_file_name,
             'theme_version': theme_version,
             'configuration_source': configuration_source,
+            'sass_compile_cache': sass_compile_cache,
+            'sass_fingerprint': fingerprint,
         }
+        return sass_status, css_output
+
+    @staticmethod
+    def store_microsite_css(storage, css_output, sass_status):
+        """
+        Store the CSS returned by `compile_microsite_css` into the customer themes storage.
+        """
+        from openedx.core.djangoapps.appsembler.sites import sass_cache
+
+        with storage.open(sass_status['site_css_file'], 'w') as f:
+            f.write(css_output)
+
+        if sass_status['sass_fingerprint']:
+            sass_cache.set_site_css_fingerprint(sass_status['site_css_file'], sass_status['sass_fingerprint'])
 
     def get_css_url(self, preview=None):
         """
@@ -439,6 +517,16 @@ class SiteConfiguration(models.Model):
 
         return " ".join(["${}: {};".format(var, val) for var, val in css_variables_dict.items()])
 
+    def _get_sass_variables_overrides(self):
+        """
+        Get the Sass strings that `_sass_var_override` injects into the theme for the current theme version.
+        """
+        if self.get_theme_version() == THEME_TAHOE_V2:
+            variables_overrides = self._get_theme_v2_variables_overrides()
+        else:
+            variables_overrides = self._get_theme_v1_variables_overrides()
+        return [variables_overrides, self.get_value('customer_sass_input', '')]
+
     def _sass_var_override(self, path):
         if 'branding-basics' in path:
             # TODO: Remove once AMC is shut down.
@@ -450,6 +538,14 @@ class SiteConfiguration(models.Model):
         return None
 
 
+@receiver(post_save, sender=SiteConfiguration)
+def clear_site_configuration_snapshots_on_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Tahoe: Avoid reading stale values later in the same request.
+    """
+    clear_site_configuration_snapshots()
+
+
 @receiver(post_save, sender=SiteConfiguration)
 def compile_tahoe_microsite_sass_on_site_config_save(sender, instance, created, **kwargs):
     """
@@ -458,8 +554,16 @@ def compile_tahoe_microsite_sass_on_site_config_save(sender, instance, created,
     This signal receiver maintains backward compatibility with existing sites and the Appsembler Management
     Console (AMC).
 
+    When `TAHOE_SASS_COMPILE_ASYNC` is enabled the compilation runs in a Celery task after the transaction commits.
+    The task has no request, so the preview mode of the current request is passed along to it.
+
     # TODO: RED-2847 - Remove this signal receiver after all Tahoe sites switch to Dashboard.
     """
+    if getattr(settings, 'TAHOE_SASS_COMPILE_ASYNC', False):
+        from openedx.core.djangoapps.appsembler.sites.tasks import compile_site_sass_after_transaction
+        compile_site_sass_after_transaction(instance, preview=is_preview_mode())
+        return
+
     sass_status = instance.compile_microsite_sass()
     if sass_status['successful_sass_compile']:
         logger.info('tahoe sass compiled successfully: %s', sass_status['sass_compile_message'])
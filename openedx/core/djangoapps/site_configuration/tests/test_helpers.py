@@ -4,7 +4,8 @@ Tests for helper function provided by site_configuration app.
 
 
 import six
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from mock import patch
 
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.site_configuration.tests.test_util import (
@@ -195,3 +196,50 @@ class TestHelpers(TestCase):
             list(configuration_helpers.get_current_site_orgs()),
             test_orgs
         )
+
+
+@override_settings(TAHOE_SITE_CONFIGURATION_SNAPSHOT_ENABLED=True)
+class TestSiteConfigurationSnapshot(TestCase):
+    """
+    Tests for the per-request `SiteConfigurationSnapshot`.
+    """
+
+    def setUp(self):
+        super(TestSiteConfigurationSnapshot, self).setUp()
+        configuration_helpers.clear_site_configuration_snapshots()
+        self.addCleanup(configuration_helpers.clear_site_configuration_snapshots)
+
+    def test_same_values_as_site_configuration(self):
+        with with_site_configuration_context(configuration=test_config) as site:
+            configuration = site.configuration
+            for name in ['university', 'PLATFORM_NAME', 'SITE_NAME', 'LANGUAGE_CODE', 'css_overrides_file', 'spam']:
+                assert configuration_helpers.get_value(name) == configuration.get_value(name), name
+            assert configuration_helpers.get_value('spam', 'default') == 'default'
+            assert configuration_helpers.get_dict('REGISTRATION_EXTRA_FIELDS', {'city': 'hidden'}) == dict(
+                test_config['REGISTRATION_EXTRA_FIELDS'], city='hidden',
+            )
+            assert configuration_helpers.has_override_value('university')
+            assert not configuration_helpers.has_override_value('spam')
+
+    def test_lookups_are_memoized(self):
+        with with_site_configuration_context(configuration=test_config) as site:
+            configuration_helpers.get_value('university')
+            with patch.object(type(site.configuration), 'get_value') as mock_get_value:
+                with self.assertNumQueries(0):
+                    for _i in range(10):
+                        assert configuration_helpers.get_value('university') == test_config['university']
+            assert not mock_get_value.called
+            assert configuration_helpers.get_site_configuration_lookups_count() == 11
+
+    def test_snapshot_cleared_on_save(self):
+        with with_site_configuration_context(configuration=test_config) as site:
+            assert configuration_helpers.get_value('university') == test_config['university']
+            site.configuration.site_values['university'] = 'Changed University'
+            site.configuration.save()
+            assert configuration_helpers.get_value('university') == 'Changed University'
+
+    def test_disabled_configuration(self):
+        with with_site_configuration_context(configuration=test_config) as site:
+            site.configuration.enabled = False
+            site.configuration.save()
+            assert configuration_helpers.get_value('university', 'default') == 'default'
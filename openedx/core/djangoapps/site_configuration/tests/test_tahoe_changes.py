@@ -16,12 +16,15 @@ from organizations.tests.factories import OrganizationFactory
 
 from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import FileSystemStorage
 from django.test import TestCase
 from django.test.utils import override_settings
 
 from site_config_client.openedx.adapter import SiteConfigAdapter
 
 from openedx.core.djangoapps.appsembler.multi_tenant_emails.tests.test_utils import with_organization_context
+from openedx.core.djangoapps.appsembler.sites.tasks import compile_site_sass
 from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
 from openedx.core.djangoapps.site_configuration.tests.factories import SiteConfigurationFactory
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
@@ -234,6 +237,116 @@ def test_site_configuration_compile_sass_success(caplog, clean_site_configuratio
     assert '_main-v2.scss' not in sass_status['scss_file_used']
 
 
+@pytest.fixture
+def sass_cache_storage(tmpdir, settings):
+    """
+    Enable the Sass compile cache with a temporary customer themes storage and a working Django cache.
+    """
+    settings.TAHOE_SASS_COMPILE_CACHE_ENABLED = True
+    storage = FileSystemStorage(location=str(tmpdir))
+    with patch('openedx.core.djangoapps.site_configuration.models.get_customer_themes_storage',
+               Mock(return_value=storage)), \
+            patch('openedx.core.djangoapps.appsembler.sites.sass_cache.cache', LocMemCache('sass-cache-tests', {})):
+        yield storage
+
+
+@pytest.mark.django_db
+def test_compile_sass_skipped_when_css_is_up_to_date(sass_cache_storage, clean_site_configuration_factory):
+    """
+    Test that an unchanged site isn't compiled twice.
+    """
+    site_configuration = clean_site_configuration_factory(site_values={})
+    with patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass',
+               Mock(return_value='I am working CSS')) as mock_compile_sass:
+        assert site_configuration.compile_microsite_sass()['sass_compile_cache'] == 'compiled'
+        sass_status = site_configuration.compile_microsite_sass()
+        assert sass_status['successful_sass_compile']
+        assert sass_status['sass_compile_cache'] == 'skipped'
+        assert mock_compile_sass.call_count == 1
+
+        site_configuration.site_values['customer_sass_input'] = '.a { color: red; }'
+        assert site_configuration.compile_microsite_sass()['sass_compile_cache'] == 'compiled'
+        assert mock_compile_sass.call_count == 2
+
+        assert site_configuration.compile_microsite_sass(force=True)['sass_compile_cache'] == 'compiled'
+        assert mock_compile_sass.call_count == 3
+
+
+@pytest.mark.django_db
+def test_compile_sass_shared_between_sites(sass_cache_storage, clean_site_configuration_factory):
+    """
+    Test that sites with the same branding reuse the same compiled CSS.
+    """
+    site_config_1 = clean_site_configuration_factory(site=Site.objects.create(domain='one.test'), site_values={})
+    site_config_2 = clean_site_configuration_factory(site=Site.objects.create(domain='two.test'), site_values={})
+    with patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass',
+               Mock(return_value='I am working CSS')) as mock_compile_sass:
+        assert site_config_1.compile_microsite_sass()['sass_compile_cache'] == 'compiled'
+        sass_status = site_config_2.compile_microsite_sass()
+
+    assert mock_compile_sass.call_count == 1
+    assert sass_status['sass_compile_cache'] == 'shared'
+    assert 'Sass compile finished successfully' in sass_status['sass_compile_message']
+    with sass_cache_storage.open('two.test.css') as css_file:
+        assert css_file.read() == b'I am working CSS'
+
+
+@pytest.mark.django_db
+@patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(return_value='I am working CSS'))
+@patch('openedx.core.djangoapps.appsembler.sites.tasks.compile_site_sass_after_transaction')
+def test_compile_sass_on_save_async(mock_compile_after_transaction, settings):
+    """
+    Test that the post_save signal schedules the Celery task instead of compiling in-process.
+    """
+    settings.TAHOE_SASS_COMPILE_ASYNC = True
+    site_configuration = SiteConfigurationFactory.create(site_values={})
+    mock_compile_after_transaction.assert_called_once_with(site_configuration, preview=False)
+
+
+@pytest.mark.django_db
+@patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(return_value='I am working CSS'))
+@patch('openedx.core.djangoapps.site_configuration.models.is_preview_mode', Mock(return_value=True))
+@patch('openedx.core.djangoapps.appsembler.sites.tasks.transaction.on_commit', lambda func: func())
+@patch('openedx.core.djangoapps.appsembler.sites.tasks.compile_site_sass.apply_async')
+def test_compile_sass_on_save_async_preview(mock_apply_async, settings):
+    """
+    Test that the preview mode of the saving request is passed to the Celery task.
+    """
+    settings.TAHOE_SASS_COMPILE_ASYNC = True
+    site_configuration = SiteConfigurationFactory.create(site_values={})
+    mock_apply_async.assert_called_once_with(kwargs={
+        'site_configuration_id': site_configuration.id,
+        'preview': True,
+    })
+
+
+@pytest.mark.django_db
+@patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(return_value='I am working CSS'))
+def test_compile_site_sass_task_preview(sass_cache_storage, settings):
+    """
+    Test that the `compile_site_sass` task stores the preview CSS without overwriting the live CSS.
+    """
+    settings.TAHOE_SASS_COMPILE_ASYNC = True  # The `on_commit` callback doesn't run in tests
+    site_configuration = SiteConfigurationFactory.create(site=Site.objects.create(domain='preview.test'))
+    sass_status = compile_site_sass(site_configuration_id=site_configuration.id, preview=True)
+    assert sass_status['site_css_file'] == 'preview-preview.test.css'
+    assert sass_cache_storage.exists('preview-preview.test.css')
+    assert not sass_cache_storage.exists('preview.test.css')
+
+
+@pytest.mark.django_db
+@patch('openedx.core.djangoapps.appsembler.sites.utils.compile_sass', Mock(return_value='I am working CSS'))
+def test_compile_site_sass_task(caplog):
+    """
+    Test the `compile_site_sass` Celery task.
+    """
+    caplog.set_level(logging.INFO)
+    site_configuration = SiteConfigurationFactory.create(site_values={})
+    sass_status = compile_site_sass(site_configuration_id=site_configuration.id)
+    assert sass_status['successful_sass_compile']
+    assert 'tahoe sass compiled successfully' in caplog.text
+
+
 @override_settings(
     ENABLE_COMPREHENSIVE_THEMING=True,
 )
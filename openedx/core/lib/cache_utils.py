@@ -6,6 +6,8 @@ Utilities related to caching.
 import collections
 import functools
 import itertools
+import threading
+import time
 import zlib
 
 import six
@@ -13,7 +15,7 @@ import wrapt
 from django.db.models.signals import post_save, post_delete
 from django.utils.encoding import force_text
 
-from edx_django_utils.cache import RequestCache, TieredCache
+from edx_django_utils.cache import CachedResponse, RequestCache, TieredCache
 from six import iteritems
 from six.moves import cPickle as pickle
 from six.moves import map
@@ -205,6 +207,90 @@ class CacheInvalidationManager:
         return decorator
 
 
+class ProcessLRUCache(object):
+    """
+    A bounded least-recently-used cache that lives for the life of a process.
+
+    Unlike ``process_cached``, entries are evicted once ``maxsize`` is reached and
+    expire after ``timeout`` seconds (if set), so it is safe to use for data that
+    changes in other processes as long as some staleness is acceptable.
+
+    If ``max_weight`` is set, entries are also evicted once the sum of the
+    ``weight`` passed to ``set`` for all the entries exceeds it, e.g. to bound
+    the memory used by entries of very different sizes.
+
+    The ``hits`` and ``misses`` attributes count lookups for instrumentation.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None, max_weight=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.max_weight = max_weight
+        self.hits = 0
+        self.misses = 0
+        self.total_weight = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def get_cached_response(self, key):
+        """
+        Return a ``CachedResponse`` for ``key``, refreshing its recency on a hit.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value, _weight = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return CachedResponse(is_found=True, key=key, value=value)
+                self._pop(key)
+            self.misses += 1
+            return CachedResponse(is_found=False, key=key, value=None)
+
+    def set(self, key, value, weight=1):
+        """
+        Store ``value`` under ``key``, evicting the least recently used entries if needed.
+
+        Values heavier than ``max_weight`` on their own are not stored.
+        """
+        expires_at = time.time() + self.timeout if self.timeout else None
+        with self._lock:
+            self._pop(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._data[key] = (expires_at, value, weight)
+            self.total_weight += weight
+            while len(self._data) > self.maxsize or (
+                self.max_weight is not None and self.total_weight > self.max_weight
+            ):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.total_weight -= entry[2]
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, 4))  # Keep this constant as we upgrade from python 2 to 3.
@@ -8,9 +8,9 @@ from unittest import TestCase
 import ddt
 import six
 from edx_django_utils.cache import RequestCache
-from mock import Mock
+from mock import Mock, patch
 
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import ProcessLRUCache, request_cached
 
 
 @ddt.ddt
@@ -297,3 +297,61 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestProcessLRUCache(TestCase):
+    """
+    Test the ProcessLRUCache class.
+    """
+    def test_miss_and_then_hit(self):
+        cache = ProcessLRUCache(maxsize=2)
+        self.assertFalse(cache.get_cached_response('a').is_found)
+        cache.set('a', None)
+        response = cache.get_cached_response('a')
+        self.assertTrue(response.is_found)
+        self.assertIsNone(response.value)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = ProcessLRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get_cached_response('a')  # `b` is now the least recently used entry
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.get_cached_response('a').is_found)
+        self.assertFalse(cache.get_cached_response('b').is_found)
+        self.assertTrue(cache.get_cached_response('c').is_found)
+
+    def test_expired_entries(self):
+        cache = ProcessLRUCache(maxsize=2, timeout=10)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=100):
+            cache.set('a', 1)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=105):
+            self.assertTrue(cache.get_cached_response('a').is_found)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=111):
+            self.assertFalse(cache.get_cached_response('a').is_found)
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_by_weight(self):
+        cache = ProcessLRUCache(max_weight=10)
+        cache.set('a', 1, weight=4)
+        cache.set('b', 2, weight=4)
+        cache.set('c', 3, weight=4)
+        self.assertFalse(cache.get_cached_response('a').is_found)
+        self.assertEqual((len(cache), cache.total_weight), (2, 8))
+
+        cache.set('b', 2, weight=1)
+        self.assertEqual(cache.total_weight, 5)
+
+        cache.set('d', 4, weight=11)
+        self.assertFalse(cache.get_cached_response('d').is_found)
+        self.assertEqual(len(cache), 2)
+
+    def test_delete(self):
+        cache = ProcessLRUCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.delete('a')
+        cache.delete_many(['b', 'missing'])
+        self.assertEqual(len(cache), 0)
@@ -60,9 +60,8 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
             weight_not_zero = block_structure.get_xblock_field(block_key, 'weight') != 0
             problem_eligible_for_content_gating = graded and has_score and weight_not_zero
             if problem_eligible_for_content_gating:
-                current_access = block_structure.get_xblock_field(block_key, 'group_access')
-                if current_access is None:
-                    current_access = {}
+                # Copy the collected value, which may be shared with other requests.
+                current_access = dict(block_structure.get_xblock_field(block_key, 'group_access') or {})
                 current_access.setdefault(
                     CONTENT_GATING_PARTITION_ID,
                     [settings.CONTENT_TYPE_GATE_GROUP_IDS['full_access']]
@@ -0,0 +1,64 @@
+"""
+Test the ContentTypeGateTransformer.
+"""
+
+
+from datetime import datetime
+
+from django.conf import settings
+from mock import patch
+
+from course_modes.tests.factories import CourseModeFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.content.block_structure import manager as block_structure_manager
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
+from openedx.features.content_type_gating.helpers import CONTENT_GATING_PARTITION_ID
+from openedx.features.content_type_gating.models import ContentTypeGatingConfig
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.partitions.partitions import ENROLLMENT_TRACK_PARTITION_ID
+
+
+class ContentTypeGateTransformerTestCase(ModuleStoreTestCase):
+    """
+    Tests for the ContentTypeGateTransformer.
+    """
+    def setUp(self):
+        super(ContentTypeGateTransformerTestCase, self).setUp()
+        ContentTypeGatingConfig.objects.create(enabled=True, enabled_as_of=datetime(2018, 1, 1))
+        self.course = CourseFactory.create()
+        CourseModeFactory.create(course_id=self.course.id, mode_slug='audit')
+        CourseModeFactory.create(course_id=self.course.id, mode_slug='verified')
+        with self.store.bulk_operations(self.course.id):
+            chapter = ItemFactory.create(parent=self.course, category='chapter')
+            sequential = ItemFactory.create(parent=chapter, category='sequential')
+            vertical = ItemFactory.create(parent=sequential, category='vertical')
+            self.problem = ItemFactory.create(
+                parent=vertical,
+                category='problem',
+                graded=True,
+                metadata={'group_access': {ENROLLMENT_TRACK_PARTITION_ID: [
+                    settings.COURSE_ENROLLMENT_MODES['audit']['id'],
+                    settings.COURSE_ENROLLMENT_MODES['verified']['id'],
+                ]}},
+            )
+        self.transformers = BlockStructureTransformers([ContentTypeGateTransformer()])
+
+    def get_group_access(self, mode):
+        """
+        Returns the group access of the problem transformed for a learner
+        enrolled in the given mode.
+        """
+        user = UserFactory.create()
+        CourseEnrollmentFactory.create(user=user, course_id=self.course.id, mode=mode)
+        block_structure = get_course_blocks(user, self.course.location, self.transformers)
+        return block_structure.get_xblock_field(self.problem.location, 'group_access')
+
+    @patch.object(block_structure_manager, '_IN_PROCESS_CACHE', None)
+    @patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'IN_PROCESS_CACHE_MAX_BLOCKS': 1000})
+    def test_cached_group_access_not_changed(self):
+        self.assertIn(CONTENT_GATING_PARTITION_ID, self.get_group_access('audit'))
+        self.assertNotIn(CONTENT_GATING_PARTITION_ID, self.get_group_access('verified'))
+        self.assertNotIn(CONTENT_GATING_PARTITION_ID, self.get_group_access('verified'))